@@ -1,5 +1,5 @@
 """Agent Runtime Package"""
 
-from .executor import Executor
+from .executor import Executor, get_executor
 
-__all__ = ["Executor"]
+__all__ = ["Executor", "get_executor"]
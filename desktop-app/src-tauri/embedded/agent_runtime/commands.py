@@ -0,0 +1,97 @@
+"""
+Command Registry
+Maps command names to Executor handlers with argument schemas
+"""
+
+import copy
+import json
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+class CommandError(Exception):
+    """Raised when command arguments do not match the schema"""
+
+    pass
+
+
+class Param:
+    """Schema for a single command argument"""
+
+    def __init__(self, type_: type = str, required: bool = False, default: Any = None):
+        self.type = type_
+        self.required = required
+        self.default = default
+
+    def coerce(self, name: str, value: Any) -> Any:
+        """Convert a JSON value to the declared type"""
+        if value is None or isinstance(value, self.type):
+            return value
+        try:
+            if self.type in (dict, list) and isinstance(value, str):
+                return json.loads(value) if value else self.type()
+            if self.type is bool and isinstance(value, str):
+                return value.lower() in ("1", "true", "yes")
+            return self.type(value)
+        except (TypeError, ValueError) as e:
+            raise CommandError(f"Invalid {name}: expected {self.type.__name__}") from e
+
+
+class CommandSpec:
+    """A registered command: handler plus its parsed argument schema"""
+
+    def __init__(
+        self, name: str, handler: Callable, schema: Optional[Dict[str, Param]] = None
+    ):
+        self.name = name
+        self.handler = handler
+        self.schema = schema or {}
+        self.required = [key for key, param in self.schema.items() if param.required]
+
+    def bind(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply the schema to raw params
+
+        Unknown keys pass through untouched so handlers can accept
+        free-form extras.
+
+        Raises:
+            CommandError: If a required argument is missing or malformed
+        """
+        bound = dict(params)
+        for key in self.required:
+            if bound.get(key) in (None, ""):
+                raise CommandError(f"{key} required")
+        for key, param in self.schema.items():
+            if bound.get(key) is None:
+                # Copy so handlers never share a mutable default
+                bound[key] = copy.copy(param.default)
+            else:
+                bound[key] = param.coerce(key, bound[key])
+        return bound
+
+
+# Command name (and alias) -> spec, filled in at class definition time
+COMMANDS: Dict[str, CommandSpec] = {}
+
+
+def command(
+    name: str, schema: Optional[Dict[str, Param]] = None, aliases: Iterable[str] = ()
+):
+    """
+    Register an Executor method as a command handler
+
+    Args:
+        name: Command name sent by the frontend
+        schema: Argument name -> Param
+        aliases: Extra names dispatching to the same handler
+    """
+
+    def decorator(func: Callable) -> Callable:
+        spec = CommandSpec(name, func, schema)
+        for key in (name, *aliases):
+            if key in COMMANDS:
+                raise ValueError(f"Command registered twice: {key}")
+            COMMANDS[key] = spec
+        return func
+
+    return decorator
@@ -0,0 +1,237 @@
+"""
+Embedding Worker Pool
+Local embedding models in worker processes, fed through shared memory
+"""
+
+import logging
+import math
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# Texts per task; smaller tasks balance better, larger ones amortize dispatch
+MIN_TASK_SIZE = 16
+MAX_TASK_SIZE = 512
+
+# Batcher counters summed over workers (see TokenBudgetBatcher.stats)
+STAT_KEYS = (
+    "texts",
+    "over_window",
+    "split",
+    "truncated",
+    "windows",
+    "batches",
+    "tokens",
+    "padded_tokens",
+)
+
+# The embedding generator of a worker process, see _init_worker()
+_generator = None
+
+
+def _init_worker(settings: Dict[str, Any], threads: int):
+    """Load the model once per worker, limited to `threads` compute threads"""
+    global _generator
+
+    # Read by PyTorch and BLAS when they are first imported, which is below
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+
+    from prefabs.embedding_generator.embedding_generator import EmbeddingGenerator
+
+    # Workers only encode: the parent process owns the cache
+    settings = dict(settings, embedding_cache_enabled=False, onnx_threads=threads)
+    _generator = EmbeddingGenerator(settings=settings)
+    _generator.batcher
+
+
+def _worker_dimensions() -> int:
+    return int(_generator.batcher.encode(["dimensions"]).shape[1])
+
+
+def _embed_range(
+    texts_name: str, out_name: str, count: int, dimensions: int, start: int, end: int
+) -> Dict[str, int]:
+    """
+    Embed texts[start:end] of a shared text block into the shared matrix
+
+    Layout of the text block: (count + 1) int64 byte offsets, then the
+    UTF-8 bytes of all texts back to back.
+
+    Returns:
+        Batcher counters for this range
+    """
+    import numpy as np
+    from multiprocessing.shared_memory import SharedMemory
+
+    texts_block = SharedMemory(name=texts_name)
+    out_block = SharedMemory(name=out_name)
+    try:
+        offsets = np.ndarray((count + 1,), dtype=np.int64, buffer=texts_block.buf)
+        base = (count + 1) * 8
+        texts = [
+            bytes(texts_block.buf[base + offsets[i] : base + offsets[i + 1]]).decode(
+                "utf-8"
+            )
+            for i in range(start, end)
+        ]
+        del offsets
+
+        batcher = _generator.batcher
+        before = dict(batcher.stats)
+        vectors = batcher.encode(texts)
+
+        out = np.ndarray((count, dimensions), dtype=np.float32, buffer=out_block.buf)
+        out[start:end] = vectors
+        del out
+        return {key: batcher.stats[key] - before[key] for key in STAT_KEYS}
+    finally:
+        texts_block.close()
+        out_block.close()
+
+
+class EmbeddingWorkerPool:
+    """
+    Embed with N worker processes, each holding its own model
+
+    A call packs its texts into one shared-memory block and preallocates
+    one shared float32 matrix for the result. Workers receive only
+    (start, end) ranges, read their texts from the block and write vectors
+    straight into their rows of the matrix, so no per-text or per-vector
+    Python objects cross the process boundary.
+
+    Each worker is limited to cpu_count // workers compute threads, so
+    the models do not compete for cores and throughput grows with the
+    number of workers up to the number of physical cores.
+    """
+
+    def __init__(self, settings: Dict[str, Any], workers: int):
+        """
+        Args:
+            settings: Embedding settings passed to each worker's generator
+            workers: Number of worker processes
+
+        Raises:
+            Exception: When the workers cannot start or load the model
+        """
+        from .parallel import process_context
+
+        self.workers = max(1, workers)
+        self.threads = max(1, (os.cpu_count() or 1) // self.workers)
+        self._lock = threading.Lock()
+        self.stats = {key: 0 for key in STAT_KEYS}
+        self.calls = 0
+
+        logger.info(
+            f"🚀 Starting {self.workers} embedding workers "
+            f"({self.threads} threads each)..."
+        )
+        # Spawn, not fork: forking a process with model threads running is unsafe
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=process_context(),
+            initializer=_init_worker,
+            initargs=(dict(settings), self.threads),
+        )
+        try:
+            self.dimensions = self._executor.submit(_worker_dimensions).result()
+        except BaseException:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        logger.info("✅ Embedding workers ready")
+
+    @property
+    def min_texts(self) -> int:
+        """Smallest call worth splitting across workers"""
+        return self.workers * MIN_TASK_SIZE
+
+    def encode(self, texts: List[str]) -> "np.ndarray":
+        """
+        Embed texts across the workers
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            float32 array, one normalized row per text in input order
+        """
+        import numpy as np
+        from multiprocessing.shared_memory import SharedMemory
+
+        count = len(texts)
+        if not count:
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+
+        encoded = [text.encode("utf-8") for text in texts]
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum([len(data) for data in encoded], out=offsets[1:])
+        base = (count + 1) * 8
+        task_size = max(
+            MIN_TASK_SIZE, min(MAX_TASK_SIZE, math.ceil(count / (self.workers * 4)))
+        )
+
+        texts_block = SharedMemory(create=True, size=base + max(1, int(offsets[-1])))
+        out_block = SharedMemory(create=True, size=count * self.dimensions * 4)
+        try:
+            texts_block.buf[:base] = offsets.tobytes()
+            texts_block.buf[base : base + int(offsets[-1])] = b"".join(encoded)
+            del encoded
+
+            futures = [
+                self._executor.submit(
+                    _embed_range,
+                    texts_block.name,
+                    out_block.name,
+                    count,
+                    self.dimensions,
+                    start,
+                    min(start + task_size, count),
+                )
+                for start in range(0, count, task_size)
+            ]
+            try:
+                counters = [future.result() for future in futures]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+            shared = np.ndarray(
+                (count, self.dimensions), dtype=np.float32, buffer=out_block.buf
+            )
+            embeddings = shared.copy()
+            del shared
+        finally:
+            texts_block.close()
+            texts_block.unlink()
+            out_block.close()
+            out_block.unlink()
+
+        with self._lock:
+            self.calls += 1
+            for counter in counters:
+                for key, value in counter.items():
+                    self.stats[key] += value
+        return embeddings
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        padded = stats["padded_tokens"]
+        stats["padding_ratio"] = (
+            round(1 - stats["tokens"] / padded, 4) if padded else 0.0
+        )
+        stats.update(workers=self.workers, threads=self.threads, calls=self.calls)
+        return stats
+
+    def shutdown(self):
+        """Stop the workers (their models are freed with them)"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("🛑 Embedding workers stopped")
@@ -4,26 +4,109 @@ Routes commands to appropriate modules
 """
 
 import json
+import logging
+import os
 import sys
+import threading
+import time
 from pathlib import Path
 from typing import Dict, Any, Optional
 import subprocess
-from prefabs.embedding_generator.embedding_generator import EmbeddingGenerator
-from prefabs.document_processor.document_processor import DocumentProcessor
-from prefabs.vector_store.vector_store import VectorStore
-from prefabs.rag_chain.rag_chain import RAGChain
+from prefabs.embedding_generator.embedding_generator import (
+    EmbeddingGenerator,
+    embedding_config,
+    release_model,
+    shared_model_key,
+)
+from prefabs.document_processor.document_processor import (
+    SUPPORTED_EXTENSIONS,
+    DocumentProcessor,
+)
+from prefabs.vector_store.vector_store import EXACT_SEARCH_MAX_CHUNKS, VectorStore
+from prefabs.rag_chain.rag_chain import RAGChain, compiled_question_improvements
 from prefabs.settings.settings_manager import SettingsManager
+from prefabs.tracing import (
+    clear_traces,
+    configure_logging,
+    configure_tracing,
+    export_chrome_trace,
+    recent_traces,
+    start_trace,
+)
+
+from .commands import COMMANDS, CommandError, Param, command
+from .jobs import (
+    JobCancelled,
+    JobManager,
+    check_cancelled,
+    is_cancel_requested,
+    report_progress,
+)
+from .metrics import RuntimeMetrics
+from .embedding_pool import EmbeddingWorkerPool
+from .folder_watch import (
+    DEBOUNCE_SECONDS,
+    POLL_SECONDS,
+    FolderWatcher,
+    watchdog_available,
+)
+from .parallel import default_workers, process_context, processes_available
+from .pipeline import BulkIngest, StreamingIngest
+from .workflow import WorkflowError, WorkflowRunner
+
+logger = logging.getLogger(__name__)
 
 
 # Add parent directory to path for absolute imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+SETTINGS_PATH = Path.home() / ".giggliagents" / "rag_settings.json"
+
+# Folders to watch again on the next launch (kept out of the settings file,
+# which save_ai_settings overwrites as a whole)
+WATCHED_FOLDERS_PATH = Path.home() / ".giggliagents" / "watched_folders.json"
+
+# Commands that manage jobs themselves and must not be queued as jobs
+JOB_COMMANDS = {"submit_job", "job_status", "cancel_job", "list_jobs"}
+
+# Process-wide executor, see get_executor()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> "Executor":
+    """
+    Get the process-resident executor
+
+    The embedded interpreter lives as long as the app, so a single Executor
+    keeps the vector store client, embedding model and RAG chain warm across
+    commands instead of rebuilding them for every call.
+
+    Returns:
+        Shared Executor instance
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = Executor()
+    return _executor
+
 
 class Executor:
     """Execute RAG commands"""
 
     def __init__(self):
         self.base_dir = Path(__file__).parent.parent
+        self.started_at = time.time()
+        self.commands_executed = 0
+        # Commands run on several threads (IPC, jobs, folder watchers)
+        self._count_lock = threading.Lock()
+        self.metrics = RuntimeMetrics()
+
+        # Guards lazy module creation and reloads; re-entrant because
+        # rag_chain builds vector_store while holding it
+        self._lock = threading.RLock()
 
         # Lazy load modules
         self._document_processor = None
@@ -31,155 +114,572 @@ class Executor:
         self._vector_store = None
         self._rag_chain = None
         self._settings_manager = None
+        self._jobs = None
+        self._workflows = None
+
+        # Watched folders by directory; _watch_lock lets one folder's batch
+        # index at a time
+        self._watchers: Dict[str, FolderWatcher] = {}
+        self._watch_lock = threading.Lock()
+
+        self._settings_mtime = self._get_settings_mtime()
+        self._configure_observability()
+
+        # Background warm-up state, see warmup(); the status is written by
+        # the warm-up thread and read by commands, under _warmup_lock
+        self._warmup_thread = None
+        self._warmup_status = {"state": "idle", "stages": []}
+        self._warmup_lock = threading.Lock()
 
-        print("✅ RAG Executor initialized")
+        logger.info("✅ RAG Executor initialized")
 
     @property
     def document_processor(self):
         if self._document_processor is None:
-            self._document_processor = DocumentProcessor()
+            with self._lock:
+                if self._document_processor is None:
+                    settings = self.settings_manager.get_settings()
+                    options = {}
+                    if processes_available():
+                        options = {
+                            "pdf_workers": int(
+                                settings.get("pdf_workers", default_workers())
+                            ),
+                            "mp_context": process_context(),
+                        }
+                    self._document_processor = DocumentProcessor(**options)
         return self._document_processor
 
     @property
     def embedding_generator(self):
         if self._embedding_generator is None:
-            self._embedding_generator = EmbeddingGenerator()
+            with self._lock:
+                if self._embedding_generator is None:
+                    self._embedding_generator = EmbeddingGenerator()
         return self._embedding_generator
 
     @property
     def vector_store(self):
         if self._vector_store is None:
-            self._vector_store = VectorStore()
+            with self._lock:
+                if self._vector_store is None:
+                    settings = self.settings_manager.get_settings()
+                    self._vector_store = VectorStore(
+                        embedding_generator=self.embedding_generator,
+                        **_exact_search_options(settings),
+                    )
         return self._vector_store
 
     @property
     def rag_chain(self):
         """Lazy load RAG chain"""
         if self._rag_chain is None:
-            # Load settings
-            from prefabs.settings.settings_manager import SettingsManager
-
-            settings_manager = SettingsManager()
-            settings = settings_manager.get_settings()
-
-            # Pass vector_store, llm_provider, and settings
-            self._rag_chain = RAGChain(
-                vector_store=self.vector_store,
-                llm_provider=settings.get("llm_provider", "openai"),
-                settings=settings,
-            )
+            with self._lock:
+                if self._rag_chain is None:
+                    settings = self.settings_manager.get_settings()
+
+                    # Pass vector_store, llm_provider, and settings
+                    self._rag_chain = RAGChain(
+                        vector_store=self.vector_store,
+                        llm_provider=settings.get("llm_provider", "openai"),
+                        settings=settings,
+                        embedding_generator=self.embedding_generator,
+                    )
         return self._rag_chain
 
     @property
     def settings_manager(self):
         if self._settings_manager is None:
-            self._settings_manager = SettingsManager()
+            with self._lock:
+                if self._settings_manager is None:
+                    self._settings_manager = SettingsManager()
         return self._settings_manager
 
+    @property
+    def jobs(self) -> JobManager:
+        if self._jobs is None:
+            with self._lock:
+                if self._jobs is None:
+                    settings = self.settings_manager.get_settings()
+                    self._jobs = JobManager(
+                        self.execute, max_workers=int(settings.get("job_workers", 2))
+                    )
+        return self._jobs
+
+    @property
+    def workflows(self) -> WorkflowRunner:
+        """Lazy load the workflow runner (parses config_rag.g once)"""
+        if self._workflows is None:
+            with self._lock:
+                if self._workflows is None:
+                    self._workflows = WorkflowRunner(self._resolve_module)
+        return self._workflows
+
+    def _resolve_module(self, module_id: str):
+        """Map workflow module ids to the executor's shared instances"""
+        modules = {
+            "dp": lambda: self.document_processor,
+            "eg": lambda: self.embedding_generator,
+            "vs": lambda: self.vector_store,
+            "rc": lambda: self.rag_chain,
+        }
+        loader = modules.get(module_id)
+        return loader() if loader else None
+
+    # ============================================
+    # LIFECYCLE
+    # ============================================
+
+    def _get_settings_mtime(self) -> Optional[float]:
+        """Modification time of the settings file, None if missing"""
+        try:
+            return os.stat(SETTINGS_PATH).st_mtime
+        except OSError:
+            return None
+
+    def _configure_observability(self):
+        """Apply log level and tracing settings"""
+        settings = self.settings_manager.get_settings()
+        configure_logging(settings.get("log_level"))
+        configure_tracing(
+            enabled=bool(settings.get("tracing_enabled", True)),
+            buffer_size=int(settings.get("trace_buffer_size", 200)),
+        )
+
+    def reload(self) -> Dict[str, Any]:
+        """
+        Drop module instances that depend on settings
+
+        The vector store only depends on the data directory, so its open
+        ChromaDB client survives. The embedding model is kept unless the
+        embedding settings changed.
+
+        Returns:
+            Names of the modules that were dropped
+        """
+        with self._lock:
+            dropped = []
+            settings = SettingsManager().get_settings()
+
+            old_generator = self._embedding_generator
+            if old_generator is not None and (
+                old_generator.config != embedding_config(settings)
+            ):
+                old_generator.close()
+                old_model = shared_model_key(old_generator.settings)
+                if old_model is not None and old_model != shared_model_key(settings):
+                    # Nothing else loads it once the settings moved on
+                    release_model(old_model)
+                self._embedding_generator = None
+                dropped.append("embedding_generator")
+                if self._vector_store is not None:
+                    # The model itself is shared, so this is cheap
+                    self._vector_store.embedding_generator = self.embedding_generator
+
+            if self._vector_store is not None:
+                self._vector_store.configure_exact_search(
+                    **_exact_search_options(settings)
+                )
+
+            if self._rag_chain is not None:
+                self._rag_chain = None
+                dropped.append("rag_chain")
+
+            if self._document_processor is not None:
+                self._document_processor = None
+                dropped.append("document_processor")
+
+            if self._workflows is not None:
+                # Cached step outputs may come from the old provider
+                self._workflows = None
+                dropped.append("workflows")
+
+            self._settings_manager = None
+            self._settings_mtime = self._get_settings_mtime()
+            self._configure_observability()
+
+        logger.info(f"🔄 Executor reloaded (dropped: {', '.join(dropped) or 'nothing'})")
+        return {"success": True, "reloaded": dropped}
+
+    def warmup(self) -> Dict[str, Any]:
+        """
+        Preload heavy modules on a background thread
+
+        Loads settings, opens the vector store collection, compiles the
+        question rewrite patterns and loads the embedding model so the first
+        question after launch does not pay for them. Safe to call repeatedly;
+        a running warm-up is not restarted.
+
+        Returns:
+            Current warm-up status (see warmup_status())
+        """
+        with self._lock:
+            if self._warmup_thread is None or not self._warmup_thread.is_alive():
+                if self.warmup_status()["state"] != "ready":
+                    with self._warmup_lock:
+                        self._warmup_status = {
+                            "state": "running",
+                            "stages": [],
+                            "started_at": time.time(),
+                        }
+                    self._warmup_thread = threading.Thread(
+                        target=self._run_warmup, name="executor-warmup", daemon=True
+                    )
+                    self._warmup_thread.start()
+        return self.warmup_status()
+
+    def warmup_status(self) -> Dict[str, Any]:
+        """Snapshot of warm-up progress with per-stage timings"""
+        with self._warmup_lock:
+            status = dict(self._warmup_status)
+            status["stages"] = [dict(stage) for stage in status["stages"]]
+        status["ready"] = status["state"] == "ready"
+        return status
+
+    def _run_warmup(self):
+        """Run each warm-up stage, recording its duration"""
+        stages = [
+            ("settings", lambda: self.settings_manager.get_settings()),
+            ("vector_store", lambda: self.vector_store.collection.count()),
+            ("question_patterns", compiled_question_improvements),
+            ("embedding_model", self._warmup_embedding_model),
+            ("rag_chain", lambda: self.rag_chain),
+            ("watched_folders", self._restore_watched_folders),
+        ]
+
+        failed = False
+        for name, stage in stages:
+            entry = {"name": name, "status": "running"}
+            with self._warmup_lock:
+                self._warmup_status["stages"].append(entry)
+            start = time.perf_counter()
+            update = {"status": "done"}
+            try:
+                stage()
+            except Exception as e:
+                logger.warning(f"⚠️ Warm-up stage {name} failed: {e}")
+                update = {"status": "failed", "error": str(e)}
+                failed = True
+            update["seconds"] = round(time.perf_counter() - start, 4)
+            with self._warmup_lock:
+                entry.update(update)
+
+        state = "failed" if failed else "ready"
+        with self._warmup_lock:
+            finished_at = time.time()
+            self._warmup_status["finished_at"] = finished_at
+            self._warmup_status["total_seconds"] = round(
+                finished_at - self._warmup_status["started_at"], 4
+            )
+            self._warmup_status["state"] = state
+        logger.info(f"🔥 Warm-up {state}")
+
+    def _warmup_embedding_model(self):
+        """Load the embedding model and run one tiny local encode"""
+        generator = self.embedding_generator
+        generator.model
+        if generator.provider != "openai":
+            # Every other provider (Claude has no embeddings API) encodes
+            # locally; the first encode allocates tokenizer and inference
+            # buffers
+            generator.batcher.encode(["warmup"])
+
+    def _reload_if_settings_changed(self):
+        """Reload when the settings file was modified outside save_ai_settings"""
+        if self._get_settings_mtime() != self._settings_mtime:
+            self.reload()
+
     def execute(self, command: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a command"""
+        start = time.perf_counter()
+        result = None
         try:
-            print(f"▶️  Executing: {command}")
+            logger.debug("▶️  Executing: %s", command)
+            with self._count_lock:
+                self.commands_executed += 1
+            self._reload_if_settings_changed()
 
             # Handle case where params is a JSON string
             if isinstance(params, str):
-                import json
-
                 params = json.loads(params) if params else {}
-            elif params is None:
+            elif not isinstance(params, dict):
                 params = {}
 
-            # Handle command aliases
-            if command == "get_documents":
-                command = "get_all_documents"
-
-            if command == "process_document":
-                return self._handle_process_document(params)
-            elif command == "answer_question":
-                return self._handle_answer_question(params)
-            elif command == "get_vector_stats":
-                return self._handle_get_vector_stats(params)
-            elif command == "get_all_documents":
-                return self._handle_get_all_documents(params)
-            elif command == "get_chat_history":
-                return self._handle_get_chat_history(params)
-            elif command == "clear_chat_history":
-                return self._handle_clear_chat_history(params)
-            elif command == "delete_document":
-                return self._handle_delete_document(params)
-            elif command == "save_ai_settings":  # ← ADD
-                return self._handle_save_ai_settings(params)
-            elif command == "get_ai_settings":  # ← ADD
-                return self._handle_get_ai_settings(params)
-            elif command == "check_ollama_installed":  # ← ADD
-                return self._handle_check_ollama_installed(params)
-            elif command == "get_ollama_models":  # ← ADD
-                return self._handle_get_ollama_models(params)
-            else:
-                return {"error": f"Unknown command: {command}"}
-
+            spec = COMMANDS.get(command)
+            if spec is None:
+                result = {"error": f"Unknown command: {command}"}
+                return result
+
+            with start_trace(spec.name):
+                result = spec.handler(self, spec.bind(params))
+            return result
+
+        except JobCancelled:
+            # Let the job worker record the cancellation
+            raise
+        except CommandError as e:
+            result = {"error": str(e)}
+            return result
         except Exception as e:
-            print(f"❌ Command failed: {e}")
-            import traceback
-
-            traceback.print_exc()
-            return {"error": str(e)}
-
-    def _handle_delete_document(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Delete a document and all its chunks"""
-        document_name = params.get("document_name")
-
-        if not document_name:
-            return {"error": "No document_name provided"}
-
-        try:
-            # Delete all chunks from this document
-            self.vector_store.collection.delete(where={"doc_name": document_name})
-
-            print(f"✅ Deleted document: {document_name}")
-            return {"success": True, "message": f"Deleted {document_name}"}
-
-        except Exception as e:
-            print(f"❌ Failed to delete document: {e}")
-            return {"error": str(e)}
+            logger.exception(f"❌ Command failed: {e}")
+            result = {"error": str(e)}
+            return result
+        finally:
+            if command in COMMANDS:
+                self.metrics.record(
+                    COMMANDS[command].name,
+                    time.perf_counter() - start,
+                    failed=not isinstance(result, dict) or "error" in result,
+                )
 
     # ============================================
     # DOCUMENT HANDLERS
     # ============================================
 
+    @command("process_document", {"file_path": Param(str, required=True)})
     def _handle_process_document(self, params: Dict) -> Dict:
         """Process and add document"""
-        file_path = params.get("file_path")
-        if not file_path:
-            return {"error": "file_path required"}
-
-        # 1. Extract text and chunk
-        chunks = self.document_processor.extract_text(file_path)
+        file_path = params["file_path"]
+
+        # Extract → embed → store run as overlapping stages over micro-batches
+        settings = self.settings_manager.get_settings()
+        ingest = StreamingIngest(
+            self.document_processor,
+            self.embedding_generator,
+            self.vector_store,
+            batch_size=int(settings.get("ingest_batch_size", 64)),
+            queue_size=int(settings.get("ingest_queue_size", 4)),
+            on_progress=lambda stored: report_progress(0.0, f"{stored} chunks stored"),
+        )
+        result = ingest.run(file_path)
+
+        return {"success": True, **result}
+
+    @command("process_documents", {"file_paths": Param(list, required=True)})
+    def _handle_process_documents(self, params: Dict) -> Dict:
+        """Process and add many documents in one pass"""
+        return self._ingest_many([str(path) for path in params["file_paths"]])
+
+    @command(
+        "process_directory",
+        {
+            "directory": Param(str, required=True),
+            "recursive": Param(bool, default=True),
+        },
+    )
+    def _handle_process_directory(self, params: Dict) -> Dict:
+        """Process and add every supported document in a folder"""
+        directory = Path(params["directory"]).expanduser()
+        if not directory.is_dir():
+            return {"error": f"Not a directory: {directory}"}
+
+        pattern = "**/*" if params["recursive"] else "*"
+        file_paths = sorted(
+            str(path)
+            for path in directory.glob(pattern)
+            if path.is_file()
+            and path.suffix.lower() in SUPPORTED_EXTENSIONS
+            and not any(
+                part.startswith(".") for part in path.relative_to(directory).parts
+            )
+        )
+        if not file_paths:
+            return {"error": f"No supported documents in {directory}"}
+        return self._ingest_many(file_paths)
+
+    def _ingest_many(self, file_paths: list) -> Dict:
+        """Bulk ingest with parallel extraction and shared embedding batches"""
+        settings = self.settings_manager.get_settings()
+        batch_size = int(settings.get("ingest_batch_size", 64))
+        pool = self._start_embedding_pool()
+        if pool is not None:
+            # Each batch is split over the workers, so it must be large
+            # enough to keep all of them busy
+            batch_size = max(batch_size, pool.min_texts * 4)
+
+        ingest = BulkIngest(
+            self.document_processor,
+            self.embedding_generator,
+            self.vector_store,
+            batch_size=batch_size,
+            max_workers=int(settings.get("ingest_workers", default_workers())),
+            use_processes=bool(settings.get("ingest_use_processes", True)),
+            on_progress=lambda done, total: report_progress(
+                done / total, f"{done}/{total} documents"
+            ),
+        )
+        result = ingest.run(file_paths)
+
+        return {"success": True, **result}
+
+    def _start_embedding_pool(self) -> Optional[EmbeddingWorkerPool]:
+        """
+        Attach the embedding worker pool to the generator when configured
+
+        Needs embed_workers > 1, a local model and an interpreter that can
+        start worker processes (see processes_available()). The pool stays
+        up for later ingests until the embedding settings change.
+
+        Returns:
+            The running pool, or None to embed in-process
+        """
+        generator = self.embedding_generator
+        workers = int(generator.settings.get("embed_workers", 0) or 0)
+        if workers < 2 or generator.provider == "openai":
+            return None
+        if not processes_available():
+            logger.debug("Embedding workers need a Python executable, skipping")
+            return None
+
+        with self._lock:
+            if generator.worker_pool is None:
+                try:
+                    generator.worker_pool = EmbeddingWorkerPool(
+                        generator.settings, workers
+                    )
+                except Exception as e:
+                    logger.warning(f"⚠️ Embedding workers unavailable: {e}")
+        return generator.worker_pool
 
-        # 2. Generate embeddings
-        embeddings = self.embedding_generator.generate_embeddings(chunks)
+    # ============================================
+    # FOLDER WATCHING
+    # ============================================
 
-        # 3. Store in vector DB
-        doc_id = self.vector_store.add_document(
-            file_path=file_path, chunks=chunks, embeddings=embeddings
+    @command(
+        "watch_folder",
+        {
+            "directory": Param(str, required=True),
+            "recursive": Param(bool, default=True),
+        },
+    )
+    def _handle_watch_folder(self, params: Dict) -> Dict:
+        """Keep the index in step with a folder's documents"""
+        directory = Path(params["directory"]).expanduser()
+        if not directory.is_dir():
+            return {"error": f"Not a directory: {directory}"}
+
+        watcher = self._start_watcher(str(directory), params["recursive"])
+        self._save_watched_folders()
+        return {"success": True, **watcher.describe()}
+
+    @command(
+        "unwatch_folder",
+        {
+            "directory": Param(str, required=True),
+            "remove_documents": Param(bool, default=False),
+        },
+    )
+    def _handle_unwatch_folder(self, params: Dict) -> Dict:
+        """Stop watching a folder, optionally removing its documents"""
+        directory = str(Path(params["directory"]).expanduser().resolve())
+        with self._lock:
+            watcher = self._watchers.pop(directory, None)
+        if watcher is None:
+            return {"error": f"Not watching {directory}"}
+        watcher.stop()
+        self._save_watched_folders()
+
+        removed = 0
+        if params["remove_documents"]:
+            with self._watch_lock:
+                removed = self.vector_store.delete_documents_under(directory)
+        return {"success": True, "documents_removed": removed}
+
+    @command("list_watched_folders")
+    def _handle_list_watched_folders(self, params: Dict) -> Dict:
+        """Watched folders with their backend and sync counters"""
+        with self._lock:
+            watchers = list(self._watchers.values())
+        return {
+            "folders": [watcher.describe() for watcher in watchers],
+            "watchdog": watchdog_available(),
+        }
+
+    def _start_watcher(self, directory: str, recursive: bool) -> FolderWatcher:
+        settings = self.settings_manager.get_settings()
+        watcher = FolderWatcher(
+            directory,
+            self._index_folder_changes,
+            SUPPORTED_EXTENSIONS,
+            recursive=recursive,
+            debounce=float(settings.get("watch_debounce_seconds", DEBOUNCE_SECONDS)),
+            poll_interval=float(settings.get("watch_poll_seconds", POLL_SECONDS)),
+        )
+        with self._lock:
+            previous = self._watchers.pop(watcher.directory, None)
+            self._watchers[watcher.directory] = watcher
+        if previous is not None:
+            previous.stop()
+
+        watcher.start()
+        # Documents whose files went away while the folder was not watched
+        watcher.notify(
+            path
+            for _, path in self.vector_store.registry.under(watcher.directory)
+            if not os.path.exists(path)
+        )
+        return watcher
+
+    def _index_folder_changes(self, changed: list, deleted: list):
+        """Watcher callback: drop deleted documents, ingest changed files"""
+        with self._watch_lock:
+            removed = 0
+            for path in deleted:
+                # Deleted first: a moved file is then stored under its new path
+                removed += self.vector_store.delete_documents_under(path)
+            result = self._ingest_many(changed) if changed else {}
+        logger.info(
+            f"🔁 Folder sync: {len(changed)} changed "
+            f"({result.get('unchanged_count', 0)} unchanged), "
+            f"{removed} documents removed"
         )
 
-        return {"success": True, "doc_id": doc_id, "chunks_count": len(chunks)}
-
-    def _handle_get_documents(self, params: Dict) -> Dict:
-        """Get all documents"""
-        documents = self.vector_store.get_all_documents()
-        return {"documents": documents}
+    def _save_watched_folders(self):
+        with self._lock:
+            folders = [
+                {"directory": watcher.directory, "recursive": watcher.recursive}
+                for watcher in self._watchers.values()
+            ]
+        try:
+            WATCHED_FOLDERS_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(WATCHED_FOLDERS_PATH, "w") as f:
+                json.dump(folders, f, indent=2)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save watched folders: {e}")
+
+    def _restore_watched_folders(self):
+        """Warm-up stage: resume watching the folders of the last session"""
+        try:
+            with open(WATCHED_FOLDERS_PATH, "r") as f:
+                folders = json.load(f)
+        except FileNotFoundError:
+            return
+        for folder in folders:
+            if folder["directory"] in self._watchers:
+                continue
+            if Path(folder["directory"]).is_dir():
+                self._start_watcher(folder["directory"], folder.get("recursive", True))
+            else:
+                logger.warning(f"⚠️ Watched folder {folder['directory']} is gone")
 
+    @command("delete_document", {"doc_id": Param(str), "document_name": Param(str)})
     def _handle_delete_document(self, params: Dict) -> Dict:
-        """Delete a document"""
-        doc_id = params.get("doc_id")
-        if not doc_id:
-            return {"error": "doc_id required"}
+        """Delete a document and all its chunks, by doc_id or document_name"""
+        doc_id = params["doc_id"]
+        document_name = params["document_name"]
 
-        self.vector_store.delete_document(doc_id)
-        return {"success": True}
+        if doc_id:
+            self.vector_store.delete_document(doc_id)
+            return {"success": True}
 
+        if document_name:
+            self.vector_store.delete_document_by_name(document_name)
+            logger.info(f"✅ Deleted document: {document_name}")
+            return {"success": True, "message": f"Deleted {document_name}"}
+
+        return {"error": "doc_id or document_name required"}
+
+    @command("get_document_stats")
     def _handle_get_document_stats(self, params: Dict) -> Dict:
         """Get document statistics"""
         stats = self.vector_store.get_stats()
@@ -189,31 +689,23 @@ class Executor:
     # CHAT HANDLERS
     # ============================================
 
+    @command("answer_question", {"question": Param(str, required=True)})
     def _handle_answer_question(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle answering a question"""
-        # Handle empty params
-        if not params or not isinstance(params, dict):
-            params = {}
-
-        question = params.get("question", "")
-
-        if not question:
-            return {"error": "No question provided"}
+        question = params["question"]
 
         # Just call answer_question without document_filter
         result = self.rag_chain.answer_question(question)
         return result
 
+    @command("get_chat_history", {"limit": Param(int, default=50)})
     def _handle_get_chat_history(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Get chat history"""
-        # Handle empty params
-        if not params or not isinstance(params, dict):
-            params = {}
-
-        limit = params.get("limit", 50)
+        limit = params["limit"]
         history = self.rag_chain.get_chat_history(limit)
         return {"history": history}
 
+    @command("clear_chat_history")
     def _handle_clear_chat_history(self, params: Dict) -> Dict:
         """Clear chat history"""
         self.rag_chain.clear_history()
@@ -223,47 +715,34 @@ class Executor:
     # SETTINGS HANDLERS
     # ============================================
 
+    @command("save_ai_settings", {"settings": Param(dict, default={})})
     def _handle_save_ai_settings(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Save AI settings"""
-        if not params or not isinstance(params, dict):
-            params = {}
-
-        settings_str = params.get("settings", "{}")
+        settings = params["settings"]
 
         try:
-            import json
-            from pathlib import Path
-
-            # Parse settings
-            if isinstance(settings_str, str):
-                settings = json.loads(settings_str)
-            else:
-                settings = settings_str
-
             # Save to file
-            settings_path = Path.home() / ".giggliagents" / "rag_settings.json"
-            settings_path.parent.mkdir(parents=True, exist_ok=True)
+            SETTINGS_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(settings_path, "w") as f:
+            with open(SETTINGS_PATH, "w") as f:
                 json.dump(settings, f, indent=2)
 
-            print("✅ Settings saved")
+            logger.info("✅ Settings saved")
+
+            # Warm modules were built from the old settings
+            self.reload()
             return {"success": True}
 
         except Exception as e:
-            print(f"❌ Failed to save settings: {e}")
+            logger.error(f"❌ Failed to save settings: {e}")
             return {"error": str(e)}
 
+    @command("get_ai_settings")
     def _handle_get_ai_settings(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Get AI settings"""
         try:
-            import json
-            from pathlib import Path
-
-            settings_path = Path.home() / ".giggliagents" / "rag_settings.json"
-
-            if settings_path.exists():
-                with open(settings_path, "r") as f:
+            if SETTINGS_PATH.exists():
+                with open(SETTINGS_PATH, "r") as f:
                     settings = json.load(f)
             else:
                 # Default settings
@@ -282,9 +761,10 @@ class Executor:
             return settings
 
         except Exception as e:
-            print(f"❌ Failed to load settings: {e}")
+            logger.error(f"❌ Failed to load settings: {e}")
             return {"error": str(e)}
 
+    @command("check_ollama_installed")
     def _handle_check_ollama_installed(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Check if Ollama is installed"""
         try:
@@ -298,6 +778,7 @@ class Executor:
         except:
             return {"installed": False}
 
+    @command("get_ollama_models")
     def _handle_get_ollama_models(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Get installed Ollama models"""
         try:
@@ -312,14 +793,13 @@ class Executor:
         except:
             return {"models": []}
 
+    @command("install_ollama_model", {"model_name": Param(str, required=True)})
     def _handle_install_ollama_model(self, params: Dict) -> Dict:
         """Install Ollama model"""
-        model_name = params.get("model_name")
-        if not model_name:
-            return {"error": "model_name required"}
+        model_name = params["model_name"]
 
         try:
-            print(f"📥 Pulling {model_name}... (this may take 5-10 minutes)")
+            logger.info(f"📥 Pulling {model_name}... (this may take 5-10 minutes)")
 
             # Run ollama pull
             process = subprocess.Popen(
@@ -330,103 +810,312 @@ class Executor:
                 shell=True,  # CRITICAL for Windows!
             )
 
-            # Wait for completion
-            stdout, stderr = process.communicate(timeout=600)
+            # Wait for completion, polling so a job can be cancelled
+            deadline = time.time() + 600
+            while True:
+                try:
+                    stdout, stderr = process.communicate(timeout=1)
+                    break
+                except subprocess.TimeoutExpired:
+                    if is_cancel_requested() or time.time() > deadline:
+                        process.kill()
+                        process.communicate()
+                        check_cancelled()
+                        raise
 
             if process.returncode == 0:
-                print(f"✅ {model_name} installed successfully!")
+                logger.info(f"✅ {model_name} installed successfully!")
                 return {"success": True, "message": f"{model_name} is ready to use"}
             else:
-                print(f"❌ Pull failed: {stderr}")
+                logger.error(f"❌ Pull failed: {stderr}")
                 return {"error": stderr or "Installation failed"}
 
         except subprocess.TimeoutExpired:
             return {"error": "Installation timed out after 10 minutes"}
+        except JobCancelled:
+            raise
         except Exception as e:
-            print(f"❌ Installation error: {e}")
+            logger.error(f"❌ Installation error: {e}")
             return {"error": str(e)}
 
+    # ============================================
+    # RUNTIME HANDLERS
+    # ============================================
+
+    @command("health")
+    def _handle_health(self, params: Dict) -> Dict:
+        """Report which modules are warm and how long the runtime has been up"""
+        return {
+            "status": "ok",
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.time() - self.started_at, 3),
+            "commands_executed": self.commands_executed,
+            "modules": {
+                "document_processor": self._document_processor is not None,
+                "embedding_generator": self._embedding_generator is not None,
+                "embedding_model_loaded": self._embedding_generator is not None
+                and self._embedding_generator._model is not None,
+                "vector_store": self._vector_store is not None,
+                "rag_chain": self._rag_chain is not None,
+            },
+            "warmup": self.warmup_status()["state"],
+            "active_jobs": self._jobs.active_count() if self._jobs else 0,
+        }
+
+    @command("reload")
+    def _handle_reload(self, params: Dict) -> Dict:
+        """Rebuild settings-dependent modules"""
+        return self.reload()
+
+    @command("warmup")
+    def _handle_warmup(self, params: Dict) -> Dict:
+        """Start background warm-up"""
+        return self.warmup()
+
+    @command("warmup_status")
+    def _handle_warmup_status(self, params: Dict) -> Dict:
+        """Poll background warm-up"""
+        return self.warmup_status()
+
+    @command("get_runtime_metrics", {"reset": Param(bool, default=False)})
+    def _handle_get_runtime_metrics(self, params: Dict) -> Dict:
+        """Latency percentiles per command since startup (or the last reset)"""
+        commands = self.metrics.snapshot()
+        if params["reset"]:
+            self.metrics.reset()
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 3),
+            "commands": commands,
+        }
+
+    @command("get_recent_traces", {"limit": Param(int, default=50)})
+    def _handle_get_recent_traces(self, params: Dict) -> Dict:
+        """Per-stage timings of the most recent commands"""
+        return {"traces": recent_traces(params["limit"])}
+
+    @command(
+        "export_traces", {"limit": Param(int), "clear": Param(bool, default=False)}
+    )
+    def _handle_export_traces(self, params: Dict) -> Dict:
+        """Recent traces as Chrome trace-event JSON (chrome://tracing, Perfetto)"""
+        trace = export_chrome_trace(params["limit"])
+        if params["clear"]:
+            clear_traces()
+        return trace
+
+    # ============================================
+    # JOB HANDLERS
+    # ============================================
+
+    @command(
+        "submit_job",
+        {"command": Param(str, required=True), "params": Param(dict, default={})},
+    )
+    def _handle_submit_job(self, params: Dict) -> Dict:
+        """Queue a command to run in the background"""
+        job_command = params["command"]
+        if job_command in JOB_COMMANDS:
+            return {"error": f"{job_command} cannot run as a job"}
+        if job_command not in COMMANDS:
+            return {"error": f"Unknown command: {job_command}"}
+
+        job = self.jobs.submit(job_command, params["params"])
+        return {"success": True, "job_id": job.job_id, "state": job.state}
+
+    @command("job_status", {"job_id": Param(str, required=True)})
+    def _handle_job_status(self, params: Dict) -> Dict:
+        """Get state, progress and (when finished) result of a job"""
+        job_id = params["job_id"]
+        job = self.jobs.get(job_id)
+        if job is None:
+            return {"error": f"Unknown job: {job_id}"}
+        return job.to_dict()
+
+    @command("cancel_job", {"job_id": Param(str, required=True)})
+    def _handle_cancel_job(self, params: Dict) -> Dict:
+        """Request cancellation of a queued or running job"""
+        job_id = params["job_id"]
+        job = self.jobs.cancel(job_id)
+        if job is None:
+            return {"error": f"Unknown job: {job_id}"}
+        return {"success": True, "job_id": job_id, "state": job.state}
+
+    @command("list_jobs")
+    def _handle_list_jobs(self, params: Dict) -> Dict:
+        """List known jobs without their results"""
+        return {"jobs": [job.to_dict(include_result=False) for job in self.jobs.list()]}
+
     # ============================================
     # VECTOR STORE HANDLERS
     # ============================================
 
+    @command("get_vector_stats")
     def _handle_get_vector_stats(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Get vector store statistics"""
-        # Handle empty params
-        if not params or not isinstance(params, dict):
-            params = {}
-
         stats = self.vector_store.get_stats()
         return stats
 
+    @command("reset_vector_store")
     def _handle_reset_vector_store(self, params: Dict) -> Dict:
         """Reset vector store"""
         self.vector_store.reset()
         return {"success": True}
 
+    @command(
+        "rebuild_vector_store",
+        {"mode": Param(str), "dimensions": Param(int), "dtype": Param(str)},
+    )
+    def _handle_rebuild_vector_store(self, params: Dict) -> Dict:
+        """
+        Re-embed all chunks with the configured vector compression
+
+        mode/dimensions/dtype default to the vector_compression,
+        vector_dimensions and vector_dtype settings.
+        """
+        settings = self.settings_manager.get_settings()
+        mode = params["mode"] or settings.get("vector_compression", "none")
+        dimensions = params["dimensions"] or settings.get("vector_dimensions")
+        dtype = params["dtype"] or settings.get("vector_dtype", "float32")
+
+        try:
+            result = self.vector_store.rebuild(
+                mode,
+                dimensions,
+                dtype,
+                on_progress=lambda done, total: report_progress(
+                    done / total, f"{done}/{total} chunks"
+                ),
+            )
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+        return {"success": True, **result}
+
+    @command("get_all_documents", aliases=["get_documents"])
     def _handle_get_all_documents(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Get all unique documents from vector store"""
-        # Handle empty params
-        if not params or not isinstance(params, dict):
-            params = {}
-
         try:
-            # Get all documents from vector store
-            all_docs = self.vector_store.get_all_documents()
+            # One metadata scan covers names, chunk counts and document info
+            documents = self.vector_store.get_document_summaries()
+            return {"documents": documents}
 
-            # Get metadata for each document
-            documents = []
-            for doc_name in all_docs:
-                # Try to get metadata from vector store
-                try:
-                    # Query for this document to get metadata
-                    results = self.vector_store.collection.get(
-                        where={"doc_name": doc_name}, limit=1, include=["metadatas"]
-                    )
+        except Exception as e:
+            logger.error(f"❌ Failed to get documents: {e}")
+            return {"documents": []}
 
-                    if results and results["metadatas"] and results["metadatas"][0]:
-                        metadata = results["metadatas"][0]
-
-                        # Count chunks for this document
-                        chunk_count = self.vector_store.collection.count(
-                            where={"doc_name": doc_name}
-                        )
-
-                        documents.append(
-                            {
-                                "doc_id": metadata.get("doc_id", ""),
-                                "doc_name": doc_name,
-                                "added_at": metadata.get("added_at", ""),
-                                "chunks_count": chunk_count,
-                                "doc_path": metadata.get("doc_path", ""),
-                            }
-                        )
-                    else:
-                        # No metadata found, add basic info
-                        documents.append(
-                            {
-                                "doc_id": "",
-                                "doc_name": doc_name,
-                                "added_at": "",
-                                "chunks_count": 0,
-                                "doc_path": "",
-                            }
-                        )
+    # ============================================
+    # EMBEDDING CACHE HANDLERS
+    # ============================================
 
-                except Exception as e:
-                    print(f"⚠️ Error getting metadata for {doc_name}: {e}")
-                    documents.append(
-                        {
-                            "doc_id": "",
-                            "doc_name": doc_name,
-                            "added_at": "",
-                            "chunks_count": 0,
-                            "doc_path": "",
-                        }
-                    )
+    @command("get_embedding_cache_stats")
+    def _handle_get_embedding_cache_stats(self, params: Dict) -> Dict:
+        """Hit/miss counts of the embedding cache and the query cache"""
+        generator = self.embedding_generator
+        queries = {
+            "hits": generator.query_hits,
+            "misses": generator.query_misses,
+            "size": len(generator._queries),
+        }
+        cache = generator.cache
+        if cache is None:
+            return {"enabled": False, "query_cache": queries}
+        return {"enabled": True, **cache.stats(), "query_cache": queries}
+
+    @command("get_embedding_stats")
+    def _handle_get_embedding_stats(self, params: Dict) -> Dict:
+        """Batching, padding and truncation counters of the local embedder"""
+        generator = self.embedding_generator
+        stats = {"provider": generator.provider}
+        if generator._batcher is not None:
+            stats["batching"] = generator._batcher.snapshot()
+        if generator.worker_pool is not None:
+            stats["worker_pool"] = generator.worker_pool.snapshot()
+        return stats
 
-            return {"documents": documents}
+    @command("clear_embedding_cache")
+    def _handle_clear_embedding_cache(self, params: Dict) -> Dict:
+        """Remove all cached embeddings"""
+        cache = self.embedding_generator.cache
+        if cache is None:
+            return {"success": True, "removed": 0}
+        return {"success": True, "removed": cache.clear()}
 
-        except Exception as e:
-            print(f"❌ Failed to get documents: {e}")
-            return {"documents": []}
+    # ============================================
+    # WORKFLOW HANDLERS
+    # ============================================
+
+    @command(
+        "run_workflow",
+        {"workflow": Param(str, required=True), "inputs": Param(dict, default={})},
+    )
+    def _handle_run_workflow(self, params: Dict) -> Dict:
+        """Run a workflow from config_rag.g with the given inputs"""
+        try:
+            output = self.workflows.run(params["workflow"], params["inputs"])
+        except WorkflowError as e:
+            raise CommandError(str(e)) from e
+        return {
+            "success": True,
+            "workflow": params["workflow"],
+            "output": _to_json(output),
+        }
+
+    @command("list_workflows")
+    def _handle_list_workflows(self, params: Dict) -> Dict:
+        """List workflows and their step graphs"""
+        runner = self.workflows
+        return {
+            "workflows": runner.describe(),
+            "cache": {"hits": runner.cache_hits, "misses": runner.cache_misses},
+        }
+
+    # ============================================
+    # BATCH HANDLERS
+    # ============================================
+
+    @command("execute_batch", {"commands": Param(list, required=True)})
+    def _handle_execute_batch(self, params: Dict) -> Dict:
+        """
+        Run several commands in one call
+
+        Commands run in order; each entry is {"command": ..., "params": {...}}.
+        Results come back in the same order. Each command goes through
+        execute() on its own and sees the store as it is when it runs; the
+        batch only saves round trips over the bridge.
+        """
+        results = []
+        for entry in params["commands"]:
+            if not isinstance(entry, dict) or not entry.get("command"):
+                results.append(
+                    {"command": None, "result": {"error": "command required"}}
+                )
+                continue
+
+            name = entry["command"]
+            if name == "execute_batch":
+                result = {"error": "execute_batch cannot be nested"}
+            else:
+                result = self.execute(name, entry.get("params") or {})
+            results.append({"command": name, "result": result})
+
+        return {"results": results}
+
+
+def _exact_search_options(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """VectorStore exact search arguments from settings"""
+    return {
+        "exact_search": bool(settings.get("exact_search_enabled", True)),
+        "exact_max_chunks": int(
+            settings.get("exact_search_max_chunks", EXACT_SEARCH_MAX_CHUNKS)
+        ),
+    }
+
+
+def _to_json(value: Any) -> Any:
+    """Convert numpy arrays in step outputs to plain lists"""
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return value
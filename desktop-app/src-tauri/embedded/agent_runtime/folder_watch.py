@@ -0,0 +1,283 @@
+"""
+Folder Watching
+Turns filesystem events in a watched folder into debounced batches of changes
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# A batch is flushed once the folder has been quiet for DEBOUNCE_SECONDS, or
+# MAX_DELAY_SECONDS after its first event while events keep coming
+DEBOUNCE_SECONDS = 2.0
+MAX_DELAY_SECONDS = 30.0
+
+# Scan interval of the polling backend
+POLL_SECONDS = 5.0
+
+
+def watchdog_available() -> bool:
+    try:
+        import watchdog.observers  # noqa: F401
+
+        return True
+    except ImportError:
+        return False
+
+
+class FolderWatcher:
+    """
+    Watch a folder and report changed and deleted documents in batches
+
+    Events come from watchdog (inotify, FSEvents, ReadDirectoryChangesW)
+    when it is installed, otherwise from a polling scan that compares file
+    sizes and modification times. Either way they only mark paths as
+    pending; a dispatcher thread waits for the folder to go quiet, resolves
+    each pending path (a file that still exists changed, a missing one was
+    deleted, a directory contributes every document under it) and hands
+    the batch to on_changes. Batches are handled one at a time, so a burst
+    of saves becomes one ingest and the cost follows the number of changed
+    files, not the size of the folder.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        on_changes: Callable[[List[str], List[str]], None],
+        extensions: Iterable[str],
+        recursive: bool = True,
+        debounce: float = DEBOUNCE_SECONDS,
+        max_delay: float = MAX_DELAY_SECONDS,
+        poll_interval: float = POLL_SECONDS,
+        use_watchdog: Optional[bool] = None,
+    ):
+        """
+        Args:
+            directory: Folder to watch
+            on_changes: Called with (changed files, deleted paths) per batch;
+                deleted paths may be directories
+            extensions: Document suffixes to report (lower case, with dot)
+            recursive: Include subfolders
+            debounce: Quiet period before a batch is flushed
+            max_delay: Longest a pending change waits during a burst
+            poll_interval: Seconds between scans of the polling backend
+            use_watchdog: Force a backend; default is watchdog if installed
+        """
+        self.directory = str(Path(directory).expanduser().resolve())
+        self.on_changes = on_changes
+        self.extensions = {extension.lower() for extension in extensions}
+        self.recursive = recursive
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        if use_watchdog is None:
+            use_watchdog = watchdog_available()
+        self.backend = "watchdog" if use_watchdog else "polling"
+
+        self._pending: Set[str] = set()
+        self._first_event = 0.0
+        self._last_event = 0.0
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._observer = None
+        self._snapshot: Dict[str, Tuple[int, int]] = {}
+
+        self.stats = {
+            "batches": 0,
+            "changed": 0,
+            "deleted": 0,
+            "last_batch_at": None,
+            "last_error": None,
+        }
+
+    # ============================================
+    # LIFECYCLE
+    # ============================================
+
+    def start(self):
+        """Start watching; the folder's current documents form the first batch"""
+        if self.backend == "watchdog":
+            self._start_observer()
+        else:
+            self._snapshot = self._scan_stats()
+            self._spawn("folder-poll", self._poll)
+        self._spawn("folder-dispatch", self._dispatch)
+        self.notify([self.directory])
+        logger.info(f"👀 Watching {self.directory} ({self.backend})")
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join()
+        self._threads = []
+        logger.info(f"🛑 Stopped watching {self.directory}")
+
+    def _spawn(self, name: str, target):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _start_observer(self):
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.event_type in ("opened", "closed_no_write"):
+                    return
+                if event.is_directory and event.event_type == "modified":
+                    # Fired for the parent of every change; rescanning it
+                    # would touch the whole folder
+                    return
+                paths = [event.src_path, getattr(event, "dest_path", "")]
+                watcher.notify(os.fsdecode(path) for path in paths if path)
+
+        self._observer = Observer()
+        self._observer.schedule(Handler(), self.directory, recursive=self.recursive)
+        self._observer.start()
+
+    def describe(self) -> Dict[str, Any]:
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            "directory": self.directory,
+            "backend": self.backend,
+            "recursive": self.recursive,
+            "pending": pending,
+            **self.stats,
+        }
+
+    # ============================================
+    # EVENTS
+    # ============================================
+
+    def notify(self, paths: Iterable[str]):
+        """Mark paths as changed (files, deleted files or directories)"""
+        paths = [path for path in paths if self._wanted(path)]
+        if not paths:
+            return
+        now = time.monotonic()
+        with self._cond:
+            if not self._pending:
+                self._first_event = now
+            self._pending.update(paths)
+            self._last_event = now
+            self._cond.notify_all()
+
+    def _wanted(self, path: str) -> bool:
+        """Inside the folder, not hidden, and a document or directory"""
+        try:
+            relative = Path(path).relative_to(self.directory)
+        except ValueError:
+            return False
+        if any(part.startswith(".") for part in relative.parts):
+            return False
+        if not self.recursive and len(relative.parts) > 1:
+            return False
+        suffix = Path(path).suffix.lower()
+        return suffix in self.extensions or not suffix or os.path.isdir(path)
+
+    def _poll(self):
+        """Polling backend: diff (size, mtime) snapshots of the folder"""
+        while not self._stop.wait(self.poll_interval):
+            try:
+                snapshot = self._scan_stats()
+            except OSError as e:
+                logger.warning(f"⚠️ Scan of {self.directory} failed: {e}")
+                continue
+            changed = [
+                path
+                for path, stat in snapshot.items()
+                if self._snapshot.get(path) != stat
+            ]
+            deleted = [path for path in self._snapshot if path not in snapshot]
+            self._snapshot = snapshot
+            self.notify(changed + deleted)
+
+    def _scan_stats(self) -> Dict[str, Tuple[int, int]]:
+        stats = {}
+        for path in self._documents(self.directory):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            stats[path] = (stat.st_size, stat.st_mtime_ns)
+        return stats
+
+    def _documents(self, directory: str) -> List[str]:
+        """Watched documents under a directory"""
+        pattern = "**/*" if self.recursive else "*"
+        return sorted(
+            str(path)
+            for path in Path(directory).glob(pattern)
+            if path.suffix.lower() in self.extensions
+            and self._wanted(str(path))
+            and path.is_file()
+        )
+
+    # ============================================
+    # DISPATCH
+    # ============================================
+
+    def _dispatch(self):
+        while not self._stop.is_set():
+            with self._cond:
+                while not self._stop.is_set():
+                    if self._pending:
+                        now = time.monotonic()
+                        flush_at = min(
+                            self._last_event + self.debounce,
+                            self._first_event + self.max_delay,
+                        )
+                        if now >= flush_at:
+                            break
+                        self._cond.wait(flush_at - now)
+                    else:
+                        self._cond.wait()
+                if self._stop.is_set():
+                    return
+                paths, self._pending = self._pending, set()
+
+            changed, deleted = self._resolve(paths)
+            if not changed and not deleted:
+                continue
+            try:
+                self.on_changes(changed, deleted)
+                self.stats["last_error"] = None
+            except Exception as e:
+                logger.exception(f"❌ Indexing changes in {self.directory} failed")
+                self.stats["last_error"] = str(e)
+            self.stats["batches"] += 1
+            self.stats["changed"] += len(changed)
+            self.stats["deleted"] += len(deleted)
+            self.stats["last_batch_at"] = time.time()
+
+    def _resolve(self, paths: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """(changed documents, deleted paths) as the folder is now"""
+        changed: Dict[str, None] = {}
+        deleted = []
+        for path in sorted(paths):
+            if os.path.isdir(path):
+                changed.update(dict.fromkeys(self._documents(path)))
+            elif os.path.isfile(path):
+                if Path(path).suffix.lower() in self.extensions:
+                    changed[path] = None
+            else:
+                deleted.append(path)
+        return list(changed), deleted
@@ -0,0 +1,188 @@
+"""
+Background Job Queue
+Runs long executor commands on a worker pool and tracks them by job ID
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+
+# Jobs kept after they finish, oldest finished jobs are dropped first
+MAX_FINISHED_JOBS = 100
+
+# Thread-local pointer to the job running on the current worker
+_current = threading.local()
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancel_job() was requested"""
+
+    pass
+
+
+class Job:
+    """A single submitted command and its lifecycle"""
+
+    def __init__(self, command: str, params: Dict[str, Any]):
+        self.job_id = str(uuid.uuid4())
+        self.command = command
+        self.params = params
+        self.state = "queued"  # queued, running, completed, failed, cancelled
+        self.result = None
+        self.error = None
+        self.progress = 0.0
+        self.message = ""
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("completed", "failed", "cancelled")
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        """JSON-safe view of the job"""
+        data = {
+            "job_id": self.job_id,
+            "command": self.command,
+            "state": self.state,
+            "progress": self.progress,
+            "message": self.message,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.started_at is not None:
+            end = self.finished_at or time.time()
+            data["elapsed_seconds"] = round(end - self.started_at, 3)
+        if self.error:
+            data["error"] = self.error
+        if include_result and self.result is not None:
+            data["result"] = self.result
+        return data
+
+
+def check_cancelled():
+    """
+    Cancellation point for long-running handlers
+
+    No-op outside a job. Inside a job, raises JobCancelled once
+    cancel_job() was called for it.
+    """
+    job = getattr(_current, "job", None)
+    if job is not None and job.cancel_event.is_set():
+        raise JobCancelled(f"Job {job.job_id} cancelled")
+
+
+def report_progress(progress: float, message: str = ""):
+    """Publish progress (0.0 - 1.0) for the job running on this thread"""
+    job = getattr(_current, "job", None)
+    if job is not None:
+        job.progress = max(0.0, min(1.0, progress))
+        if message:
+            job.message = message
+
+
+def is_cancel_requested() -> bool:
+    """True when the current job should stop (for polling loops)"""
+    job = getattr(_current, "job", None)
+    return job is not None and job.cancel_event.is_set()
+
+
+class JobManager:
+    """Worker pool that runs commands in the background"""
+
+    def __init__(
+        self, runner: Callable[[str, Dict[str, Any]], Dict], max_workers: int = 2
+    ):
+        """
+        Args:
+            runner: Callable executing a command, usually Executor.execute
+            max_workers: Number of jobs that may run at the same time
+        """
+        self.runner = runner
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="executor-job"
+        )
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, command: str, params: Dict[str, Any]) -> Job:
+        """Queue a command and return its job"""
+        job = Job(command, params)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+        job.future = self._pool.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a job
+
+        Queued jobs never start. Running jobs stop at their next
+        check_cancelled() call.
+        """
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            job.state = "cancelled"
+            job.finished_at = time.time()
+        return job
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def active_count(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def _run(self, job: Job):
+        if job.cancel_event.is_set():
+            job.state = "cancelled"
+            job.finished_at = time.time()
+            return
+
+        job.state = "running"
+        job.started_at = time.time()
+        _current.job = job
+        try:
+            result = self.runner(job.command, job.params)
+            if job.cancel_event.is_set():
+                job.state = "cancelled"
+            elif isinstance(result, dict) and "error" in result:
+                job.state = "failed"
+                job.error = result["error"]
+            else:
+                job.state = "completed"
+                job.progress = 1.0
+            job.result = result
+        except JobCancelled:
+            job.state = "cancelled"
+        except Exception as e:
+            job.state = "failed"
+            job.error = str(e)
+        finally:
+            _current.job = None
+            job.finished_at = time.time()
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond MAX_FINISHED_JOBS"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
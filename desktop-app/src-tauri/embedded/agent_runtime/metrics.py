@@ -0,0 +1,106 @@
+"""
+Runtime Metrics
+In-process latency histograms for executor commands
+"""
+
+import threading
+from typing import Dict
+
+
+# 2^7 linear sub-buckets per power of two keeps relative error under 1%
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of latencies in microseconds
+
+    Values are grouped into log-linear buckets: every power-of-two range
+    is split into SUB_BUCKET_COUNT equal slots, so memory stays small
+    while percentiles keep two significant digits at any magnitude.
+    """
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    @staticmethod
+    def _bucket(value: int) -> int:
+        if value < SUB_BUCKET_COUNT:
+            return value
+        shift = value.bit_length() - SUB_BUCKET_BITS
+        return (shift << SUB_BUCKET_BITS) + (value >> shift)
+
+    @staticmethod
+    def _bucket_value(bucket: int) -> int:
+        """Midpoint of a bucket, used as its representative value"""
+        shift = bucket >> SUB_BUCKET_BITS
+        if shift == 0:
+            return bucket
+        mantissa = bucket & (SUB_BUCKET_COUNT - 1)
+        return (mantissa << shift) + (1 << (shift - 1))
+
+    def record(self, micros: int):
+        micros = max(0, int(micros))
+        bucket = self._bucket(micros)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += micros
+        self.min = micros if self.min is None else min(self.min, micros)
+        self.max = max(self.max, micros)
+
+    def percentile(self, pct: float) -> int:
+        """Value at the given percentile (0-100) in microseconds"""
+        if not self.count:
+            return 0
+        target = max(1, int(round(self.count * pct / 100.0)))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= target:
+                return min(self._bucket_value(bucket), self.max)
+        return self.max
+
+
+class RuntimeMetrics:
+    """Per-command latency histograms and error counts"""
+
+    def __init__(self):
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, command: str, seconds: float, failed: bool = False):
+        with self._lock:
+            histogram = self._histograms.get(command)
+            if histogram is None:
+                histogram = self._histograms[command] = LatencyHistogram()
+            histogram.record(seconds * 1_000_000)
+            if failed:
+                self._errors[command] = self._errors.get(command, 0) + 1
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Latency summary per command, in milliseconds"""
+        with self._lock:
+            return {
+                command: {
+                    "count": histogram.count,
+                    "errors": self._errors.get(command, 0),
+                    "mean_ms": round(histogram.total / histogram.count / 1000, 3),
+                    "min_ms": round((histogram.min or 0) / 1000, 3),
+                    "p50_ms": round(histogram.percentile(50) / 1000, 3),
+                    "p95_ms": round(histogram.percentile(95) / 1000, 3),
+                    "p99_ms": round(histogram.percentile(99) / 1000, 3),
+                    "max_ms": round(histogram.max / 1000, 3),
+                }
+                for command, histogram in sorted(self._histograms.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._errors.clear()
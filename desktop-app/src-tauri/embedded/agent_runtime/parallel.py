@@ -0,0 +1,124 @@
+"""
+Worker Pools
+Process pools for CPU-bound work, with a thread fallback
+"""
+
+import logging
+import os
+import subprocess
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Interpreter for worker processes of the desktop app, set by main.rs
+PYTHON_ENV = "GIGGLIAGENTS_PYTHON"
+
+
+def default_workers(limit: int = 4) -> int:
+    """Worker count for CPU-bound pools: one per core, at most limit"""
+    return max(1, min(limit, os.cpu_count() or 1))
+
+
+@lru_cache(maxsize=1)
+def worker_python() -> Optional[str]:
+    """
+    Python executable worker processes run on, None when there is none
+
+    Under a normal interpreter this is sys.executable. Inside the desktop app
+    Python is embedded, so sys.executable is the app binary itself; spawning
+    it would launch another window rather than a worker. There the
+    interpreter comes from GIGGLIAGENTS_PYTHON (main.rs passes the one the
+    app was built against) or from the Python installation the app is
+    linked to, and must be the same version as the embedded runtime.
+    """
+    if Path(sys.executable or "").name.lower().startswith("python"):
+        return sys.executable
+
+    version = f"{sys.version_info.major}.{sys.version_info.minor}"
+    candidates = [os.environ.get(PYTHON_ENV, "")]
+    for prefix in dict.fromkeys((sys.base_exec_prefix, sys.base_prefix)):
+        if sys.platform == "win32":
+            candidates.append(os.path.join(prefix, "python.exe"))
+        else:
+            candidates.append(os.path.join(prefix, "bin", f"python{version}"))
+            candidates.append(os.path.join(prefix, "bin", "python3"))
+
+    for candidate in dict.fromkeys(candidates):
+        if (
+            candidate
+            and os.path.isfile(candidate)
+            and _runs_version(candidate, version)
+        ):
+            logger.info(f"🐍 Worker processes use {candidate}")
+            return candidate
+    logger.warning(f"⚠️ No Python {version} for worker processes, using threads")
+    return None
+
+
+def _runs_version(python: str, version: str) -> bool:
+    """Whether an interpreter starts and is the given major.minor version"""
+    try:
+        output = subprocess.run(
+            [python, "-c", "import sys; print('%d.%d' % sys.version_info[:2])"],
+            capture_output=True,
+            text=True,
+            timeout=10,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        )
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return output.returncode == 0 and output.stdout.strip() == version
+
+
+def processes_available() -> bool:
+    """Whether worker processes can be started (see worker_python())"""
+    return worker_python() is not None
+
+
+def process_context():
+    """
+    multiprocessing context for worker pools
+
+    Always spawn: the app process runs GUI and model threads, which fork
+    would copy in whatever state they are in. Workers are started with
+    worker_python() and import their code from this process's sys.path.
+    """
+    import multiprocessing
+
+    context = multiprocessing.get_context("spawn")
+    python = worker_python()
+    if python is None:
+        raise RuntimeError("No Python interpreter for worker processes")
+    if python != sys.executable:
+        context.set_executable(python)
+        if not getattr(sys, "argv", None):
+            # Embedded interpreters may have no argv; spawn copies it
+            sys.argv = [""]
+    return context
+
+
+def make_pool(max_workers: int, use_processes: bool = True) -> Executor:
+    """
+    Create a pool for CPU-bound work
+
+    Args:
+        max_workers: Pool size
+        use_processes: Prefer processes; falls back to threads when worker
+            processes cannot be started (see processes_available())
+
+    Returns:
+        ProcessPoolExecutor or ThreadPoolExecutor
+    """
+    if use_processes and processes_available():
+        try:
+            return ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=process_context()
+            )
+        except (OSError, NotImplementedError, RuntimeError) as e:
+            logger.warning(f"⚠️ Process pool unavailable, using threads: {e}")
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cpu-pool")
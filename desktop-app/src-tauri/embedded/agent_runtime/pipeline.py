@@ -0,0 +1,428 @@
+"""
+Ingest Pipelines
+Extract → chunk → embed → store, streamed for one document or in bulk
+"""
+
+import contextvars
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from datetime import datetime
+from functools import lru_cache
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from prefabs.tracing import span
+
+from .jobs import check_cancelled
+
+logger = logging.getLogger(__name__)
+
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+class _StageError:
+    """Carries an exception from a worker stage to the consumer"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class StreamingIngest:
+    """
+    Ingest one document with stages running concurrently
+
+    A reader thread extracts and chunks the document into micro-batches,
+    an embedding thread embeds each batch, and the calling thread appends
+    embedded batches to the vector store. Queues between the stages are
+    bounded, so a fast reader waits for the embedder instead of buffering
+    the whole document: memory stays at roughly
+    (queue_size + 2) * batch_size chunks regardless of document size.
+
+    A file the store already holds is not re-embedded: unchanged content
+    returns right away, and for a changed file the reader drops chunks
+    whose text is already stored (see VectorStore.begin_document).
+    """
+
+    def __init__(
+        self,
+        document_processor,
+        embedding_generator,
+        vector_store,
+        batch_size: int = 64,
+        queue_size: int = 4,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ):
+        self.document_processor = document_processor
+        self.embedding_generator = embedding_generator
+        self.vector_store = vector_store
+        self.batch_size = max(1, batch_size)
+        self.queue_size = max(1, queue_size)
+        self.on_progress = on_progress
+
+    def run(self, file_path: str) -> Dict[str, Any]:
+        """
+        Ingest a document
+
+        Args:
+            file_path: Path to document
+
+        Returns:
+            doc_id, chunks_count and timing information
+        """
+        start = time.perf_counter()
+        sync = self.vector_store.begin_document(file_path)
+        if sync.unchanged:
+            self.vector_store.finish_document(sync)
+            logger.info(f"⏭️ {file_path} is unchanged, skipping")
+            return {
+                "doc_id": sync.doc_id,
+                **sync.describe(),
+                "seconds": round(time.perf_counter() - start, 3),
+                "chunks_per_second": 0.0,
+            }
+
+        stop = threading.Event()
+        chunk_batches: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        embedded_batches: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        reader = self._start_stage(
+            "ingest-read", self._read, file_path, sync, chunk_batches, stop
+        )
+        embedder = self._start_stage(
+            "ingest-embed", self._embed, chunk_batches, embedded_batches, stop
+        )
+
+        try:
+            doc_id, count = self.vector_store.add_document_stream(
+                file_path, self._drain(embedded_batches, stop), sync=sync
+            )
+        finally:
+            stop.set()
+            reader.join()
+            embedder.join()
+
+        elapsed = time.perf_counter() - start
+        logger.debug("⚡ Streamed %d chunks from %s in %.2fs", count, file_path, elapsed)
+        return {
+            "doc_id": doc_id,
+            **sync.describe(),
+            "seconds": round(elapsed, 3),
+            "chunks_per_second": round(count / elapsed, 1) if elapsed else 0.0,
+        }
+
+    def _start_stage(self, name: str, target, *args) -> threading.Thread:
+        # Copy the context so stage spans land in the caller's trace
+        context = contextvars.copy_context()
+        thread = threading.Thread(
+            target=context.run, args=(target, *args), name=name, daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _put(self, out: queue.Queue, item, stop: threading.Event) -> bool:
+        """Blocking put that gives up once the pipeline is stopping"""
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue, stop: threading.Event):
+        while True:
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                if stop.is_set():
+                    return _DONE
+
+    def _read(self, file_path: str, sync, out: queue.Queue, stop: threading.Event):
+        """Stage 1: extract and chunk into micro-batches of new chunks"""
+        try:
+            with span("extract_chunk") as stage:
+                batch: List[str] = []
+                pages: List = []
+                total = 0
+                chunks = self.document_processor.iter_page_chunks(file_path)
+                for chunk, page_range in chunks:
+                    if sync.claim(chunk, page_range):
+                        continue
+                    batch.append(chunk)
+                    pages.append(page_range)
+                    if len(batch) >= self.batch_size:
+                        total += len(batch)
+                        if not self._put(out, (batch, pages), stop):
+                            return
+                        batch, pages = [], []
+                if batch:
+                    total += len(batch)
+                    if not self._put(out, (batch, pages), stop):
+                        return
+                stage.set(chunks=total)
+            self._put(out, _DONE, stop)
+        except BaseException as e:
+            self._put(out, _StageError(e), stop)
+
+    def _embed(self, source: queue.Queue, out: queue.Queue, stop: threading.Event):
+        """Stage 2: embed each micro-batch"""
+        try:
+            while True:
+                item = self._get(source, stop)
+                if item is _DONE or isinstance(item, _StageError):
+                    self._put(out, item, stop)
+                    return
+                chunks, pages = item
+                embeddings = self.embedding_generator.generate_embeddings(chunks)
+                if not self._put(out, (chunks, embeddings, pages), stop):
+                    return
+        except BaseException as e:
+            self._put(out, _StageError(e), stop)
+
+    def _drain(self, source: queue.Queue, stop: threading.Event) -> Iterator:
+        """Stage 3 input: yield embedded batches for the vector store"""
+        stored = 0
+        while True:
+            check_cancelled()
+            item = self._get(source, stop)
+            if item is _DONE:
+                return
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+            stored += len(item[0])
+            if self.on_progress:
+                self.on_progress(stored)
+
+
+@lru_cache(maxsize=4)
+def _worker_processor(chunk_size: int, chunk_overlap: int):
+    """One DocumentProcessor per worker process and chunk configuration"""
+    from prefabs.document_processor.document_processor import DocumentProcessor
+
+    return DocumentProcessor(chunk_size, chunk_overlap)
+
+
+def _extract_document(
+    file_path: str, chunk_size: int, chunk_overlap: int
+) -> List[Tuple[str, Any]]:
+    """Pool worker: extract and chunk one document, with page ranges"""
+    processor = _worker_processor(chunk_size, chunk_overlap)
+    return list(processor.iter_page_chunks(file_path))
+
+
+class BulkIngest:
+    """
+    Ingest many documents with parallel extraction
+
+    Documents are extracted and chunked on a worker pool (processes when
+    available, since parsing is CPU-bound). Chunks from all documents feed
+    one shared embedding stage in fixed-size batches, and each embedded
+    batch is written to the vector store in a single call even when it
+    spans several documents.
+
+    Files are planned against the store first (VectorStore.begin_document):
+    unchanged files are not extracted at all, and changed files only have
+    their new chunks embedded.
+    """
+
+    def __init__(
+        self,
+        document_processor,
+        embedding_generator,
+        vector_store,
+        batch_size: int = 64,
+        max_workers: int = 4,
+        use_processes: bool = True,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        self.document_processor = document_processor
+        self.embedding_generator = embedding_generator
+        self.vector_store = vector_store
+        self.batch_size = max(1, batch_size)
+        self.max_workers = max(1, max_workers)
+        self.use_processes = use_processes
+        self.on_progress = on_progress
+
+    def run(self, file_paths: List[str]) -> Dict[str, Any]:
+        """
+        Ingest documents
+
+        A document that fails to extract is reported and skipped. A failure
+        while embedding or storing undoes every write of this run.
+
+        Args:
+            file_paths: Paths to documents
+
+        Returns:
+            Per-document results, failures and aggregate throughput
+        """
+        from .parallel import make_pool
+
+        start = time.perf_counter()
+        added_at = datetime.now().isoformat()
+        ingested: List[Any] = []
+        emptied: List[Any] = []
+        failed: List[Dict[str, str]] = []
+        pending: List[Tuple[str, str, int, str]] = []
+        pending_pages: List[Any] = []
+        chunks_total = 0
+
+        file_paths = list(dict.fromkeys(file_paths))
+        total = len(file_paths)
+        syncs, unchanged = self._plan(file_paths)
+        file_paths = list(syncs)
+        by_doc = {sync.doc_id: sync for sync in syncs.values()}
+
+        pool = make_pool(
+            min(self.max_workers, max(1, len(file_paths))),
+            use_processes=self.use_processes and len(file_paths) > 1,
+        )
+        done = total - len(file_paths)
+        try:
+            with span("bulk_ingest", documents=len(file_paths)):
+                for file_path, chunks, error in self._extract_all(pool, file_paths):
+                    check_cancelled()
+                    if error is not None:
+                        logger.warning(f"⚠️ Skipping {file_path}: {error}")
+                        failed.append({"file_path": file_path, "error": error})
+                    elif chunks:
+                        sync = syncs[file_path]
+                        ingested.append(sync)
+                        new = [
+                            (chunk, pages)
+                            for chunk, pages in chunks
+                            if not sync.claim(chunk, pages)
+                        ]
+                        pending.extend(sync.new_records([chunk for chunk, _ in new]))
+                        pending_pages.extend(pages for _, pages in new)
+                        chunks_total += len(new)
+                        while len(pending) >= self.batch_size:
+                            self._store(
+                                pending[: self.batch_size],
+                                pending_pages[: self.batch_size],
+                                added_at,
+                                by_doc,
+                            )
+                            del pending[: self.batch_size]
+                            del pending_pages[: self.batch_size]
+                    else:
+                        failed.append({"file_path": file_path, "error": "no text"})
+                        if syncs[file_path].existing:
+                            # Nothing claims the stored version's chunks, so
+                            # finishing the sync removes them all
+                            emptied.append(syncs[file_path])
+
+                    done += 1
+                    if self.on_progress:
+                        self.on_progress(done, total)
+
+                if pending:
+                    self._store(pending, pending_pages, added_at, by_doc)
+        except BaseException:
+            if ingested:
+                logger.warning("⚠️ Bulk ingest failed, removing partial data")
+                for sync in ingested:
+                    self.vector_store.abort_document(sync)
+            raise
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        for sync in ingested + unchanged + emptied:
+            self.vector_store.finish_document(sync)
+        documents = [
+            {"file_path": sync.file_path, "doc_id": sync.doc_id, **sync.describe()}
+            for sync in ingested + unchanged
+        ]
+
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"✅ Added {len(ingested)} documents ({chunks_total} chunks), "
+            f"{len(unchanged)} unchanged, in {elapsed:.2f}s"
+        )
+        return {
+            "documents": documents,
+            "failed": failed,
+            "documents_count": len(documents),
+            "unchanged_count": len(unchanged),
+            "chunks_count": chunks_total,
+            "seconds": round(elapsed, 3),
+            "docs_per_second": round(len(documents) / elapsed, 2) if elapsed else 0.0,
+            "chunks_per_second": round(chunks_total / elapsed, 1) if elapsed else 0.0,
+        }
+
+    def _extract_all(self, pool, file_paths: List[str]) -> Iterator[Tuple]:
+        """
+        Yield (file_path, chunks, error) as extractions finish
+
+        At most two extractions per worker are in flight, so finished
+        documents wait in memory only while the embedding stage catches up.
+        """
+        processor = self.document_processor
+        remaining = iter(file_paths)
+        running = {}
+
+        def submit_next() -> bool:
+            file_path = next(remaining, None)
+            if file_path is None:
+                return False
+            future = pool.submit(
+                _extract_document,
+                file_path,
+                processor.chunk_size,
+                processor.chunk_overlap,
+            )
+            running[future] = file_path
+            return True
+
+        for _ in range(self.max_workers * 2):
+            if not submit_next():
+                break
+
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                file_path = running.pop(future)
+                try:
+                    yield file_path, future.result(), None
+                except Exception as e:
+                    yield file_path, None, str(e)
+                submit_next()
+
+    def _plan(self, file_paths: List[str]) -> Tuple[Dict[str, Any], List[Any]]:
+        """
+        Plan every file against the store
+
+        Returns:
+            (sync per file to extract, syncs of files with nothing to write)
+        """
+        syncs: Dict[str, Any] = {}
+        unchanged = []
+        with span("plan_ingest", documents=len(file_paths)):
+            for file_path in file_paths:
+                sync = self.vector_store.begin_document(file_path)
+                if sync.unchanged:
+                    unchanged.append(sync)
+                else:
+                    syncs[file_path] = sync
+        return syncs, unchanged
+
+    def _store(
+        self,
+        records: List[Tuple[str, str, int, str]],
+        pages: List[Any],
+        added_at: str,
+        syncs: Dict[str, Any],
+    ):
+        """Embed one batch of chunks and write it in a single call"""
+        embeddings = self.embedding_generator.generate_embeddings(
+            [text for _, _, _, text in records]
+        )
+        self.vector_store.add_chunk_batch(records, embeddings, added_at, pages, syncs)
+        for doc_id, group in groupby(records, key=lambda record: record[0]):
+            syncs[doc_id].written(list(group))
@@ -0,0 +1,339 @@
+"""
+Workflow Runner
+Compiles the workflows in config_rag.g into step DAGs and executes them
+"""
+
+import contextvars
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from prefabs.tracing import span
+
+from .jobs import check_cancelled
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CONFIG_PATH = Path(__file__).parent.parent / "config_rag.g"
+USER_CONFIG_PATH = Path.home() / ".giggliagents" / "workflows.g"
+
+# Estimated bytes of cached step outputs kept across runs; an extract
+# output holds a whole document's chunks, so the cache is bounded by size
+STEP_CACHE_MAX_BYTES = 64 * 2**20
+
+
+class WorkflowError(Exception):
+    """Raised when a workflow is malformed or a step fails"""
+
+    pass
+
+
+class Step:
+    """One compiled workflow step"""
+
+    def __init__(self, index: int, spec: Dict[str, Any], previous: Optional[str]):
+        self.id = str(spec.get("id") or f"step{index}")
+        self.name = spec.get("name", self.id)
+        self.module = spec.get("module")
+        self.action = spec.get("action")
+        self.params = dict(spec.get("params") or {})
+        self.inputs = dict(spec.get("inputs") or {})
+        self.cache = bool(spec.get("cache", False))
+
+        if not self.module or not self.action:
+            raise WorkflowError(f"Step {self.id} needs module and action")
+
+        # Dependencies come from $steps references and depends_on. Steps that
+        # declare neither keep the legacy behaviour: run after the previous
+        # step and receive its output as params.
+        self.depends_on = set(spec.get("depends_on") or [])
+        for ref in self.inputs.values():
+            if isinstance(ref, str) and ref.startswith("$steps."):
+                self.depends_on.add(ref.split(".")[1])
+        self.pipe_from = None
+        if not self.inputs and "depends_on" not in spec and previous:
+            self.depends_on.add(previous)
+            self.pipe_from = previous
+
+
+class Workflow:
+    """A named DAG of steps"""
+
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        self.name = name
+        self.description = spec.get("description", "")
+        self.steps: Dict[str, Step] = OrderedDict()
+
+        previous = None
+        for index, step_spec in enumerate(spec.get("steps") or []):
+            step = Step(index, step_spec, previous)
+            if step.id in self.steps:
+                raise WorkflowError(f"Duplicate step id in {name}: {step.id}")
+            self.steps[step.id] = step
+            previous = step.id
+
+        if not self.steps:
+            raise WorkflowError(f"Workflow {name} has no steps")
+        self.output = spec.get("output") or previous
+
+        for step in self.steps.values():
+            unknown = step.depends_on - set(self.steps)
+            if unknown:
+                raise WorkflowError(
+                    f"Step {step.id} depends on unknown steps: {sorted(unknown)}"
+                )
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        visiting, done = set(), set()
+
+        def visit(step_id: str):
+            if step_id in done:
+                return
+            if step_id in visiting:
+                raise WorkflowError(f"Cycle in workflow {self.name} at {step_id}")
+            visiting.add(step_id)
+            for dep in self.steps[step_id].depends_on:
+                visit(dep)
+            visiting.discard(step_id)
+            done.add(step_id)
+
+        for step_id in self.steps:
+            visit(step_id)
+
+
+class WorkflowRunner:
+    """Runs compiled workflows against BaseModule instances"""
+
+    def __init__(
+        self,
+        resolve_module: Callable[[str], Any],
+        config_paths: Optional[List[Path]] = None,
+        max_workers: int = 4,
+    ):
+        """
+        Args:
+            resolve_module: Maps a module id (dp, eg, vs, rc) to its instance
+            config_paths: Workflow files, later files override earlier ones
+            max_workers: Steps that may run at the same time
+        """
+        self.resolve_module = resolve_module
+        self.config_paths = config_paths or [DEFAULT_CONFIG_PATH, USER_CONFIG_PATH]
+        self.max_workers = max_workers
+        self.workflows = self._load()
+        # key -> (output, estimated bytes), least recently used first
+        self._cache: "OrderedDict[str, Tuple[Dict, int]]" = OrderedDict()
+        self._cache_bytes = 0
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _load(self) -> Dict[str, Workflow]:
+        """Parse and compile every workflow once"""
+        import yaml
+
+        workflows = {}
+        for path in self.config_paths:
+            if not path.exists():
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                config = yaml.safe_load(f) or {}
+            for name, spec in (config.get("workflows") or {}).items():
+                workflows[name] = Workflow(name, spec)
+            logger.debug("📋 Loaded workflows from %s", path)
+        return workflows
+
+    def describe(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "name": workflow.name,
+                "description": workflow.description,
+                "steps": [
+                    {
+                        "id": step.id,
+                        "module": step.module,
+                        "action": step.action,
+                        "depends_on": sorted(step.depends_on),
+                    }
+                    for step in workflow.steps.values()
+                ],
+            }
+            for workflow in self.workflows.values()
+        ]
+
+    def run(
+        self, name: str, inputs: Dict[str, Any], context: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute a workflow
+
+        Steps whose dependencies are satisfied run concurrently.
+
+        Args:
+            name: Workflow name
+            inputs: Values referenced as $input.<key>
+            context: Passed through to BaseModule.execute
+
+        Returns:
+            Output of the workflow's output step
+        """
+        workflow = self.workflows.get(name)
+        if workflow is None:
+            raise WorkflowError(f"Unknown workflow: {name}")
+
+        context = dict(context or {}, workflow=name)
+        outputs: Dict[str, Dict[str, Any]] = {}
+        pending = dict(workflow.steps)
+        running = {}
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="workflow-step"
+        ) as pool:
+            while pending or running:
+                check_cancelled()
+                for step_id, step in list(pending.items()):
+                    if step.depends_on <= outputs.keys():
+                        params = self._resolve_params(step, inputs, outputs)
+                        # Copy the context so step spans land in the caller's trace
+                        future = pool.submit(
+                            contextvars.copy_context().run,
+                            self._run_step,
+                            step,
+                            params,
+                            dict(context, step=step.id),
+                        )
+                        running[future] = step
+                        del pending[step_id]
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    try:
+                        outputs[step.id] = future.result()
+                    except Exception as e:
+                        for other in running:
+                            other.cancel()
+                        raise WorkflowError(f"Step {step.id} failed: {e}") from e
+
+        return outputs[workflow.output]
+
+    def _resolve_params(
+        self, step: Step, inputs: Dict[str, Any], outputs: Dict[str, Dict]
+    ) -> Dict[str, Any]:
+        params = dict(step.params)
+        if step.pipe_from:
+            params.update(outputs[step.pipe_from])
+        for key, ref in step.inputs.items():
+            params[key] = self._resolve_ref(ref, inputs, outputs)
+        return params
+
+    @staticmethod
+    def _resolve_ref(ref: Any, inputs: Dict[str, Any], outputs: Dict[str, Dict]):
+        """Resolve $input.<key> and $steps.<id>.<key> references"""
+        if not isinstance(ref, str) or not ref.startswith("$"):
+            return ref
+        parts = ref[1:].split(".")
+        if parts[0] == "input" and len(parts) == 2:
+            if parts[1] not in inputs:
+                raise WorkflowError(f"Missing workflow input: {parts[1]}")
+            return inputs[parts[1]]
+        if parts[0] == "steps" and len(parts) >= 2:
+            value = outputs[parts[1]]
+            for key in parts[2:]:
+                value = value[key]
+            return value
+        raise WorkflowError(f"Bad reference: {ref}")
+
+    def _run_step(self, step: Step, params: Dict[str, Any], context: Dict) -> Dict:
+        key = None
+        if step.cache:
+            key = self._cache_key(step, params)
+            with self._cache_lock:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    self.cache_hits += 1
+                    return cached[0]
+                self.cache_misses += 1
+
+        module = self.resolve_module(step.module)
+        if module is None:
+            raise WorkflowError(f"Unknown module: {step.module}")
+
+        with span(f"{step.module}.{step.action}", step=step.id):
+            result = module.execute(step.action, params, context)
+
+        if key is not None:
+            self._cache_put(key, result)
+        return result
+
+    def _cache_put(self, key: str, result: Dict):
+        size = _size(result)
+        if size > STEP_CACHE_MAX_BYTES:
+            return
+        with self._cache_lock:
+            previous = self._cache.pop(key, None)
+            if previous is not None:
+                self._cache_bytes -= previous[1]
+            self._cache[key] = (result, size)
+            self._cache_bytes += size
+            while self._cache_bytes > STEP_CACHE_MAX_BYTES:
+                _, (_, evicted) = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted
+
+    def _cache_key(self, step: Step, params: Dict[str, Any]) -> str:
+        digest = hashlib.sha256(f"{step.module}.{step.action}".encode())
+        _fingerprint(params, digest)
+        return digest.hexdigest()
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_bytes = 0
+
+
+def _size(value: Any) -> int:
+    """Rough size in bytes of a step output"""
+    if isinstance(value, dict):
+        return sum(_size(key) + _size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return 8 * len(value) + sum(_size(item) for item in value)
+    if isinstance(value, str):
+        return len(value)
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    return 8
+
+
+def _fingerprint(value: Any, digest) -> None:
+    """Feed a stable representation of value into digest"""
+    if isinstance(value, dict):
+        digest.update(b"{")
+        for key in sorted(value):
+            digest.update(str(key).encode())
+            _fingerprint(value[key], digest)
+            if key == "file_path" and isinstance(value[key], str):
+                # Same path with new content must not hit the cache
+                try:
+                    stat = os.stat(value[key])
+                    digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+                except OSError:
+                    pass
+        digest.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"[")
+        for item in value:
+            _fingerprint(item, digest)
+        digest.update(b"]")
+    elif hasattr(value, "tobytes") and hasattr(value, "shape"):
+        digest.update(str(value.shape).encode())
+        digest.update(value.tobytes())
+    else:
+        digest.update(repr(value).encode())
+        digest.update(b"\0")
@@ -10,55 +10,104 @@ providers:
   - claude
 
 workflows:
+  # Steps reference workflow inputs as $input.<key> and earlier outputs as
+  # $steps.<id>.<key>. Steps with no dependency between them run in
+  # parallel; steps marked cache: true reuse outputs for identical params.
   process_document:
     name: "Process Document"
-    description: "Extract text, generate embeddings, store in vector DB"
+    description: "Extract text, embed only new chunks, store in vector DB"
     steps:
-      - name: "Extract Text"
+      # plan and extract don't depend on each other and run in parallel
+      - id: plan
+        name: "Check Stored Version"
+        module: "vs"  # Vector Store
+        action: "plan_document"
+        inputs:
+          file_path: $input.file_path
+
+      - id: extract
+        name: "Extract Text"
         module: "dp"  # Document Processor
         action: "extract_text"
+        cache: true
         params:
           chunk_size: 500
           chunk_overlap: 50
-      
-      - name: "Generate Embeddings"
+        inputs:
+          file_path: $input.file_path
+
+      # Chunks already stored (all of them for an unchanged file) are not
+      # embedded again
+      - id: claim
+        name: "Skip Stored Chunks"
+        module: "vs"
+        action: "claim_chunks"
+        inputs:
+          sync: $steps.plan.sync
+          chunks: $steps.extract.chunks
+          pages: $steps.extract.pages
+
+      - id: embed
+        name: "Generate Embeddings"
         module: "eg"  # Embedding Generator
         action: "generate_embeddings"
         params:
           provider: "auto"  # Use configured provider
-      
-      - name: "Store in Vector DB"
-        module: "vs"  # Vector Store
-        action: "add_documents"
+        inputs:
+          texts: $steps.claim.chunks
+
+      - id: store
+        name: "Store in Vector DB"
+        module: "vs"
+        action: "store_chunks"
+        inputs:
+          sync: $steps.plan.sync
+          chunks: $steps.claim.chunks
+          embeddings: $steps.embed.embeddings
+          pages: $steps.claim.pages
 
   answer_question:
     name: "Answer Question"
     description: "Search relevant documents and generate answer"
     steps:
-      - name: "Embed Question"
+      - id: embed_question
+        name: "Embed Question"
         module: "eg"
         action: "embed_query"
-      
-      - name: "Search Similar"
+        cache: true
+        inputs:
+          query: $input.question
+
+      - id: search
+        name: "Search Similar"
         module: "vs"
         action: "search"
         params:
           top_k: 5
-      
-      - name: "Generate Answer"
+        inputs:
+          query_embedding: $steps.embed_question.embedding
+
+      - id: answer
+        name: "Generate Answer"
         module: "rc"  # RAG Chain
         action: "generate_answer"
         params:
           provider: "auto"
           temperature: 0.7
+        inputs:
+          question: $input.question
+          sources: $steps.search.results
 
   delete_document:
     name: "Delete Document"
     description: "Remove document from vector store"
     steps:
-      - name: "Remove from DB"
+      - id: remove
+        name: "Remove from DB"
         module: "vs"
         action: "delete_document"
+        inputs:
+          doc_id: $input.doc_id
 
 schedule:
   enabled: false
\ No newline at end of file
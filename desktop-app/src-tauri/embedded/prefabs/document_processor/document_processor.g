@@ -19,5 +19,5 @@ actions:
         default: 50
         description: Overlap between chunks
     returns:
-      type: list[string]
-      description: List of text chunks
\ No newline at end of file
+      type: object
+      description: Text chunks, and the page range of each chunk
\ No newline at end of file
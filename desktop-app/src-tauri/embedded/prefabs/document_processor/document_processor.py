@@ -3,19 +3,139 @@ Document Processor Prefab
 Extracts text from various file formats
 """
 
+import logging
+import os
+from collections import deque
 from pathlib import Path
-from typing import List
-import PyPDF2
-from docx import Document
-from pptx import Presentation
-
-
-class DocumentProcessor:
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from prefabs.base_module import BaseModule, ModuleExecutionError
+from prefabs.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# File types _extract_by_type() understands, used when scanning folders
+SUPPORTED_EXTENSIONS = {
+    ".pdf",
+    ".docx",
+    ".doc",
+    ".pptx",
+    ".ppt",
+    ".txt",
+    ".md",
+    ".xlsx",
+    ".xls",
+    ".csv",
+    ".jpg",
+    ".jpeg",
+    ".png",
+    ".bmp",
+    ".tiff",
+    ".gif",
+    ".mp3",
+    ".wav",
+    ".m4a",
+    ".flac",
+    ".ogg",
+    ".mp4",
+    ".avi",
+    ".mov",
+    ".mkv",
+    ".zip",
+    ".7z",
+    ".html",
+    ".htm",
+    ".json",
+    ".xml",
+}
+
+# PDFs with at least this many pages are extracted on worker processes when
+# pdf_workers > 1; each task extracts PDF_PAGES_PER_TASK consecutive pages
+PDF_PARALLEL_MIN_PAGES = 100
+PDF_PAGES_PER_TASK = 25
+
+# (first page, last page) a chunk was taken from, 1-based; None when the
+# format has no pages
+PageRange = Optional[Tuple[int, int]]
+
+
+def check_chunking(chunk_size: int, chunk_overlap: int):
+    """Raise ValueError unless windows of chunk_size words advance"""
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    if not 0 <= chunk_overlap < chunk_size:
+        raise ValueError(
+            f"chunk_overlap must be at least 0 and smaller than chunk_size "
+            f"({chunk_size}), got {chunk_overlap}"
+        )
+
+
+def _extract_pdf_range(path: str, start: int, end: int) -> List[str]:
+    """
+    Pool worker: text of PDF pages start:end (0-based)
+
+    The file is opened per task and closed before returning, so idle
+    workers hold no handle on it (an open handle blocks deleting or
+    replacing the file on Windows).
+    """
+    import PyPDF2
+
+    with open(path, "rb") as f:
+        pdf = PyPDF2.PdfReader(f)
+        return [pdf.pages[number].extract_text() or "" for number in range(start, end)]
+
+
+class DocumentProcessor(BaseModule):
     """Process documents into text chunks"""
 
-    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 50):
+    def __init__(
+        self,
+        chunk_size: int = 500,
+        chunk_overlap: int = 50,
+        pdf_workers: int = 1,
+        mp_context: Any = None,
+    ):
+        """
+        Args:
+            chunk_size: Words per chunk
+            chunk_overlap: Words shared by consecutive chunks
+            pdf_workers: Worker processes for large PDFs; 1 extracts pages
+                in this process
+            mp_context: multiprocessing context the workers are started
+                from; spawn by default (see agent_runtime.parallel)
+
+        Raises:
+            ValueError: chunk_overlap is not smaller than chunk_size
+        """
+        check_chunking(chunk_size, chunk_overlap)
+        super().__init__("dp")
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.pdf_workers = max(1, pdf_workers)
+        self.mp_context = mp_context
+
+    def execute(
+        self, action: str, params: Dict[str, Any], context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Workflow entry point (see document_processor.g)"""
+        if action == "extract_text":
+            self.validate_params(params, ["file_path"])
+            chunk_size = int(params.get("chunk_size", self.chunk_size))
+            chunk_overlap = int(params.get("chunk_overlap", self.chunk_overlap))
+            try:
+                check_chunking(chunk_size, chunk_overlap)
+            except ValueError as e:
+                raise ModuleExecutionError(str(e)) from e
+            processor = self
+            if (chunk_size, chunk_overlap) != (self.chunk_size, self.chunk_overlap):
+                processor = DocumentProcessor(chunk_size, chunk_overlap)
+            chunks = list(processor.iter_page_chunks(params["file_path"]))
+            return {
+                "chunks": [chunk for chunk, _ in chunks],
+                "pages": [pages for _, pages in chunks],
+            }
+
+        raise ModuleExecutionError(f"Unknown action for dp: {action}")
 
     def extract_text(self, file_path: str) -> List[str]:
         """
@@ -30,81 +150,207 @@ class DocumentProcessor:
         path = Path(file_path)
         extension = path.suffix.lower()
 
-        print(f"📄 Processing: {path.name}")
+        logger.debug("📄 Processing: %s", path.name)
+
+        with span("extract", file_type=extension):
+            text = self._extract_by_type(path, extension)
+
+        # Split into chunks
+        with span("chunk") as stage:
+            chunks = self._chunk_text(text)
+            stage.set(chunks=len(chunks))
+
+        logger.debug("✅ Extracted %d chunks from %s", len(chunks), path.name)
+
+        return chunks
+
+    def iter_text(self, file_path: str) -> Iterator[str]:
+        """
+        Stream a document's text in pieces (pages, paragraphs, lines)
+
+        PDF, DOCX, PPTX and TXT/MD are read incrementally; other formats
+        are extracted whole and yielded as a single piece.
+
+        Args:
+            file_path: Path to document
+
+        Yields:
+            Text segments in document order
+        """
+        for _, text in self._iter_segments(Path(file_path)):
+            yield text
+
+    def iter_chunks(self, file_path: str) -> Iterator[str]:
+        """
+        Stream chunks as the document is read
+
+        Produces exactly the chunks extract_text() returns, while only
+        holding about one chunk's worth of words in memory.
+
+        Args:
+            file_path: Path to document
+
+        Yields:
+            Text chunks
+        """
+        for chunk, _ in self.iter_page_chunks(file_path):
+            yield chunk
+
+    def iter_page_chunks(self, file_path: str) -> Iterator[Tuple[str, PageRange]]:
+        """
+        Stream chunks with the pages they were taken from
+
+        Args:
+            file_path: Path to document
+
+        Yields:
+            (chunk, (first page, last page)) pairs; the page range is None
+            for formats without pages
+        """
+        yield from self._chunk_page_stream(self._iter_segments(Path(file_path)))
+
+    def _iter_segments(self, path: Path) -> Iterator[Tuple[Optional[int], str]]:
+        """(page number or None, text) pieces in document order"""
+        extension = path.suffix.lower()
 
-        # Extract based on file type
         if extension == ".pdf":
-            text = self._extract_pdf(path)
+            yield from enumerate(self._iter_pdf_pages(path), 1)
         elif extension in [".docx", ".doc"]:
-            text = self._extract_docx(path)
+            for text in self._iter_docx_paragraphs(path):
+                yield None, text
         elif extension in [".pptx", ".ppt"]:
-            text = self._extract_pptx(path)
+            for text in self._iter_pptx_texts(path):
+                yield None, text
         elif extension in [".txt", ".md"]:
-            text = self._extract_txt(path)
+            for text in self._iter_txt_lines(path):
+                yield None, text
+        else:
+            yield None, self._extract_by_type(path, extension)
+
+    def _extract_by_type(self, path: Path, extension: str) -> str:
+        """Extract full text based on file type"""
+        if extension == ".pdf":
+            return self._extract_pdf(path)
+        elif extension in [".docx", ".doc"]:
+            return self._extract_docx(path)
+        elif extension in [".pptx", ".ppt"]:
+            return self._extract_pptx(path)
+        elif extension in [".txt", ".md"]:
+            return self._extract_txt(path)
         elif extension in [".xlsx", ".xls"]:
-            text = self._extract_excel(path)
+            return self._extract_excel(path)
         elif extension == ".csv":
-            text = self._extract_csv(path)
+            return self._extract_csv(path)
         elif extension in [".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".gif"]:
-            text = self._extract_image_ocr(path)
+            return self._extract_image_ocr(path)
         elif extension in [".mp3", ".wav", ".m4a", ".flac", ".ogg"]:
-            text = self._extract_audio(path)
+            return self._extract_audio(path)
         elif extension in [".mp4", ".avi", ".mov", ".mkv"]:
-            text = self._extract_video(path)
+            return self._extract_video(path)
         elif extension == ".zip":
-            text = self._extract_zip(path)
+            return self._extract_zip(path)
         elif extension == ".7z":
-            text = self._extract_7z(path)
+            return self._extract_7z(path)
         elif extension in [".html", ".htm"]:
-            text = self._extract_html(path)
+            return self._extract_html(path)
         elif extension == ".json":
-            text = self._extract_json(path)
+            return self._extract_json(path)
         elif extension == ".xml":
-            text = self._extract_xml(path)
+            return self._extract_xml(path)
         else:
             raise ValueError(f"Unsupported file type: {extension}")
 
-        # Split into chunks
-        chunks = self._chunk_text(text)
-
-        print(f"✅ Extracted {len(chunks)} chunks from {path.name}")
-
-        return chunks
-
     # ============================================
     # EXISTING EXTRACTORS
     # ============================================
 
     def _extract_pdf(self, path: Path) -> str:
         """Extract text from PDF"""
-        text = ""
+        return "".join(page + "\n\n" for page in self._iter_pdf_pages(path))
+
+    def _iter_pdf_pages(self, path: Path) -> Iterator[str]:
+        """Yield the text of each PDF page"""
+        import PyPDF2
+
         with open(path, "rb") as f:
             pdf = PyPDF2.PdfReader(f)
-            for page in pdf.pages:
-                text += page.extract_text() + "\n\n"
-        return text
+            page_count = len(pdf.pages)
+            if self.pdf_workers == 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+                for page in pdf.pages:
+                    yield page.extract_text() or ""
+                return
+
+        yield from self._iter_pdf_pages_parallel(path, page_count)
+
+    def _iter_pdf_pages_parallel(self, path: Path, page_count: int) -> Iterator[str]:
+        """
+        Yield PDF pages extracted on worker processes, in page order
+
+        Pages go out in ranges of PDF_PAGES_PER_TASK, at most two ranges per
+        worker in flight, so pages held in memory stay bounded however long
+        the document is.
+        """
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        ranges = iter(
+            (start, min(start + PDF_PAGES_PER_TASK, page_count))
+            for start in range(0, page_count, PDF_PAGES_PER_TASK)
+        )
+        workers = min(self.pdf_workers, -(-page_count // PDF_PAGES_PER_TASK))
+        context = self.mp_context or multiprocessing.get_context("spawn")
+        with span("pdf_pages", pages=page_count, workers=workers):
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                running = deque()
+                try:
+                    for start, end in ranges:
+                        running.append(
+                            pool.submit(_extract_pdf_range, str(path), start, end)
+                        )
+                        if len(running) >= workers * 2:
+                            yield from running.popleft().result()
+                    while running:
+                        yield from running.popleft().result()
+                finally:
+                    for future in running:
+                        future.cancel()
 
     def _extract_docx(self, path: Path) -> str:
         """Extract text from DOCX"""
+        return "\n\n".join(self._iter_docx_paragraphs(path))
+
+    def _iter_docx_paragraphs(self, path: Path) -> Iterator[str]:
+        """Yield the text of each DOCX paragraph"""
+        from docx import Document
+
         doc = Document(path)
-        text = "\n\n".join([para.text for para in doc.paragraphs])
-        return text
+        for para in doc.paragraphs:
+            yield para.text
 
     def _extract_pptx(self, path: Path) -> str:
         """Extract text from PPTX"""
+        return "".join(text + "\n\n" for text in self._iter_pptx_texts(path))
+
+    def _iter_pptx_texts(self, path: Path) -> Iterator[str]:
+        """Yield the text of each PPTX shape, slide by slide"""
+        from pptx import Presentation
+
         prs = Presentation(path)
-        text = ""
         for slide in prs.slides:
             for shape in slide.shapes:
                 if hasattr(shape, "text"):
-                    text += shape.text + "\n\n"
-        return text
+                    yield shape.text
 
     def _extract_txt(self, path: Path) -> str:
         """Extract text from TXT/MD"""
         with open(path, "r", encoding="utf-8") as f:
             return f.read()
 
+    def _iter_txt_lines(self, path: Path) -> Iterator[str]:
+        """Yield TXT/MD lines without reading the whole file"""
+        with open(path, "r", encoding="utf-8") as f:
+            yield from f
+
     # ============================================
     # EXCEL & CSV
     # ============================================
@@ -130,7 +376,7 @@ class DocumentProcessor:
 
             return text
         except Exception as e:
-            print(f"⚠️ Excel extraction failed, trying pandas: {e}")
+            logger.warning(f"⚠️ Excel extraction failed, trying pandas: {e}")
             # Fallback to pandas
             return self._extract_excel_pandas(path)
 
@@ -156,7 +402,7 @@ class DocumentProcessor:
             df = pd.read_csv(path)
             return df.to_string(index=False)
         except Exception as e:
-            print(f"⚠️ Pandas failed, trying basic CSV: {e}")
+            logger.warning(f"⚠️ Pandas failed, trying basic CSV: {e}")
             # Fallback to basic CSV
             import csv
 
@@ -177,7 +423,7 @@ class DocumentProcessor:
             from PIL import Image
             import pytesseract
 
-            print(f"🖼️ Running OCR on {path.name}...")
+            logger.info(f"🖼️ Running OCR on {path.name}...")
 
             image = Image.open(path)
             text = pytesseract.image_to_string(image)
@@ -188,7 +434,7 @@ class DocumentProcessor:
             return f"=== OCR from {path.name} ===\n\n{text}"
 
         except Exception as e:
-            print(f"❌ OCR failed: {e}")
+            logger.error(f"❌ OCR failed: {e}")
             return f"[Image: {path.name} - OCR failed: {e}]"
 
     # ============================================
@@ -200,8 +446,8 @@ class DocumentProcessor:
         try:
             import whisper
 
-            print(f"🎵 Transcribing audio: {path.name}...")
-            print("⏳ This may take a few minutes for long files...")
+            logger.info(f"🎵 Transcribing audio: {path.name}...")
+            logger.info("⏳ This may take a few minutes for long files...")
 
             # Load model
             model = whisper.load_model("base")
@@ -211,13 +457,13 @@ class DocumentProcessor:
 
             transcription_text = result["text"]
 
-            print(f"📝 TRANSCRIBED: {len(transcription_text)} characters")
+            logger.info(f"📝 TRANSCRIBED: {len(transcription_text)} characters")
 
             # Return JUST the text, no header
             return transcription_text
 
         except Exception as e:
-            print(f"❌ Audio transcription failed: {e}")
+            logger.error(f"❌ Audio transcription failed: {e}")
             return f"[Audio: {path.name} - Transcription failed: {e}]"
 
     def _extract_video(self, path: Path) -> str:
@@ -229,7 +475,7 @@ class DocumentProcessor:
             import time
             import os
 
-            print(f"🎬 Processing video: {path.name}...")
+            logger.info(f"🎬 Processing video: {path.name}...")
 
             # Create temp file
             temp_audio = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
@@ -238,7 +484,7 @@ class DocumentProcessor:
 
             try:
                 # Extract audio
-                print("  Extracting audio track...")
+                logger.info("  Extracting audio track...")
                 video = AudioSegment.from_file(str(path))
                 video.export(temp_path, format="wav")
 
@@ -246,7 +492,7 @@ class DocumentProcessor:
                 time.sleep(0.5)
 
                 # Transcribe
-                print("  Transcribing audio...")
+                logger.info("  Transcribing audio...")
                 model = whisper.load_model("base")
                 result = model.transcribe(temp_path)
 
@@ -268,10 +514,12 @@ class DocumentProcessor:
                         if i < 4:
                             time.sleep(0.5)
                         else:
-                            print(f"⚠️ Could not delete temp file: {temp_path}")
+                            logger.warning(
+                                f"⚠️ Could not delete temp file: {temp_path}"
+                            )
 
         except Exception as e:
-            print(f"❌ Video transcription failed: {e}")
+            logger.error(f"❌ Video transcription failed: {e}")
             return f"[Video: {path.name} - Transcription failed: {e}]"
 
     # ============================================
@@ -284,7 +532,7 @@ class DocumentProcessor:
         import tempfile
         import shutil
 
-        print(f"📦 Extracting ZIP: {path.name}...")
+        logger.info(f"📦 Extracting ZIP: {path.name}...")
 
         text = f"=== Contents of {path.name} ===\n\n"
 
@@ -302,7 +550,7 @@ class DocumentProcessor:
                         text += f"\n\n--- From: {file_path.name} ---\n\n"
                         text += "\n\n".join(file_text)
                     except Exception as e:
-                        print(f"⚠️ Skipped {file_path.name}: {e}")
+                        logger.warning(f"⚠️ Skipped {file_path.name}: {e}")
                         text += f"\n\n[Skipped: {file_path.name} - {e}]\n\n"
 
         return text
@@ -312,7 +560,7 @@ class DocumentProcessor:
         import py7zr
         import tempfile
 
-        print(f"📦 Extracting 7Z: {path.name}...")
+        logger.info(f"📦 Extracting 7Z: {path.name}...")
 
         text = f"=== Contents of {path.name} ===\n\n"
 
@@ -329,7 +577,7 @@ class DocumentProcessor:
                         text += f"\n\n--- From: {file_path.name} ---\n\n"
                         text += "\n\n".join(file_text)
                     except Exception as e:
-                        print(f"⚠️ Skipped {file_path.name}: {e}")
+                        logger.warning(f"⚠️ Skipped {file_path.name}: {e}")
                         text += f"\n\n[Skipped: {file_path.name} - {e}]\n\n"
 
         return text
@@ -400,3 +648,51 @@ class DocumentProcessor:
                 chunks.append(chunk)
 
         return chunks
+
+    def _chunk_stream(self, segments: Iterable[str]) -> Iterator[str]:
+        """
+        Streaming equivalent of _chunk_text
+
+        Segments are split on whitespace and joined as if concatenated
+        with whitespace between them.
+
+        Args:
+            segments: Text pieces in document order
+
+        Yields:
+            Chunks of chunk_size words, chunk_overlap words apart
+        """
+        for chunk, _ in self._chunk_page_stream((None, text) for text in segments):
+            yield chunk
+
+    def _chunk_page_stream(
+        self, segments: Iterable[Tuple[Optional[int], str]]
+    ) -> Iterator[Tuple[str, PageRange]]:
+        """
+        _chunk_stream over (page, text) segments, with each chunk's pages
+
+        The page of every word in the window is kept alongside it, so a
+        chunk spanning a page break reports both pages.
+        """
+        step = self.chunk_size - self.chunk_overlap
+        window: List[str] = []
+        pages: List[Optional[int]] = []
+
+        def take() -> Tuple[str, PageRange]:
+            last = min(self.chunk_size, len(window)) - 1
+            chunk_pages = (pages[0], pages[last]) if pages[0] is not None else None
+            chunk = " ".join(window[: self.chunk_size])
+            del window[:step]
+            del pages[:step]
+            return chunk, chunk_pages
+
+        for page, segment in segments:
+            words = segment.split()
+            window.extend(words)
+            pages.extend([page] * len(words))
+            while len(window) >= self.chunk_size:
+                yield take()
+
+        # Tail windows, same as the last iterations of _chunk_text
+        while window:
+            yield take()
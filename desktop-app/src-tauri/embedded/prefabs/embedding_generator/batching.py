@@ -0,0 +1,254 @@
+"""
+Token-Budget Batching
+Length-bucketed batches and window splitting for local embedding models
+"""
+
+import logging
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# Token IDs of a text, special tokens excluded
+TokenIds = List[int]
+
+# Special tokens added around every sequence ([CLS] ... [SEP])
+SPECIAL_TOKENS = 2
+
+
+class TokenBudgetBatcher:
+    """
+    Plan and run embedding batches by token count
+
+    Every text is tokenized once up front, and the model is fed those token
+    IDs, so nothing is tokenized twice and a window never comes out longer
+    than planned. Texts longer than the model's window are split into
+    consecutive windows whose embeddings are averaged (weighted by tokens),
+    instead of being silently truncated. Windows are then sorted by length
+    and grouped so that batch_size * longest_in_batch stays under a
+    padded-token budget: short texts travel in large batches, long ones in
+    small batches, and little compute is spent on padding.
+    """
+
+    def __init__(
+        self,
+        tokenize: Callable[[List[str]], List[TokenIds]],
+        encode_ids: Callable[[List[TokenIds]], "np.ndarray"],
+        max_seq_length: int = 256,
+        max_batch_tokens: int = 8192,
+        max_batch_size: int = 128,
+        split_long: bool = True,
+    ):
+        """
+        Args:
+            tokenize: Token IDs of texts, without special tokens or
+                truncation
+            encode_ids: Embeds one batch of token ID lists, adding special
+                tokens and padding (normalized vectors)
+            max_seq_length: Model window including special tokens
+            max_batch_tokens: Padded tokens per batch
+            max_batch_size: Texts per batch
+            split_long: Split texts over the window; when False they are
+                cut to the window and counted as truncated
+        """
+        self.tokenize = tokenize
+        self.encode_ids = encode_ids
+        self.window = max(1, max_seq_length - SPECIAL_TOKENS)
+        self.max_batch_tokens = max(max_seq_length, max_batch_tokens)
+        self.max_batch_size = max(1, max_batch_size)
+        self.split_long = split_long
+
+        self._lock = threading.Lock()
+        self.stats = {
+            "texts": 0,
+            "over_window": 0,
+            "split": 0,
+            "truncated": 0,
+            "windows": 0,
+            "batches": 0,
+            "tokens": 0,
+            "padded_tokens": 0,
+        }
+
+    def plan(
+        self, texts: Sequence[str]
+    ) -> Tuple[List[Tuple[int, TokenIds, int]], List[List[int]], Dict[str, int]]:
+        """
+        Tokenize, split and batch texts
+
+        Returns:
+            pieces: (source index, token IDs, tokens with specials) per window
+            batches: Indices into pieces, one list per model call
+            stats: Counters for this plan
+        """
+        pieces: List[Tuple[int, TokenIds, int]] = []
+        stats = {"over_window": 0, "split": 0, "truncated": 0}
+
+        for index, ids in enumerate(self.tokenize(list(texts))):
+            if len(ids) <= self.window:
+                pieces.append((index, ids, len(ids) + SPECIAL_TOKENS))
+                continue
+
+            stats["over_window"] += 1
+            if not self.split_long:
+                stats["truncated"] += 1
+                pieces.append((index, ids[: self.window], self.window + SPECIAL_TOKENS))
+                continue
+
+            stats["split"] += 1
+            for start in range(0, len(ids), self.window):
+                window = ids[start : start + self.window]
+                pieces.append((index, window, len(window) + SPECIAL_TOKENS))
+
+        order = sorted(range(len(pieces)), key=lambda i: pieces[i][2])
+        batches: List[List[int]] = []
+        current: List[int] = []
+        padded = 0
+        for piece_index in order:
+            tokens = pieces[piece_index][2]
+            # Sorted ascending, so this piece is the longest in the batch
+            if current and (
+                (len(current) + 1) * tokens > self.max_batch_tokens
+                or len(current) >= self.max_batch_size
+            ):
+                padded += len(current) * pieces[current[-1]][2]
+                batches.append(current)
+                current = []
+            current.append(piece_index)
+        if current:
+            padded += len(current) * pieces[current[-1]][2]
+            batches.append(current)
+
+        stats.update(
+            texts=len(texts),
+            windows=len(pieces),
+            batches=len(batches),
+            tokens=sum(piece[2] for piece in pieces),
+            padded_tokens=padded,
+        )
+        return pieces, batches, stats
+
+    def encode(self, texts: Sequence[str]) -> "np.ndarray":
+        """
+        Embed texts
+
+        Returns:
+            float32 array, one normalized row per input text in input order
+        """
+        import numpy as np
+
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        pieces, batches, stats = self.plan(texts)
+
+        vectors = None
+        for batch in batches:
+            embedded = np.asarray(
+                self.encode_ids([pieces[i][1] for i in batch]), dtype=np.float32
+            )
+            if vectors is None:
+                vectors = np.empty((len(pieces), embedded.shape[1]), dtype=np.float32)
+            vectors[batch] = embedded
+
+        if len(pieces) == len(texts):
+            # Nothing was split, so pieces are the texts in input order
+            embeddings = vectors
+        else:
+            embeddings = np.zeros((len(texts), vectors.shape[1]), dtype=np.float32)
+            for (source, _, tokens), vector in zip(pieces, vectors):
+                embeddings[source] += vector * tokens
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.clip(norms, 1e-12, None)
+
+        with self._lock:
+            for key, value in stats.items():
+                self.stats[key] += value
+
+        if stats["truncated"]:
+            logger.warning(
+                f"⚠️ {stats['truncated']} texts exceeded the model window and "
+                "were truncated"
+            )
+        return embeddings
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self.stats)
+        padded = stats["padded_tokens"]
+        stats["padding_ratio"] = (
+            round(1 - stats["tokens"] / padded, 4) if padded else 0.0
+        )
+        return stats
+
+
+def pad_ids(
+    batch: List[TokenIds], cls_id: int, sep_id: int, pad_id: int
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Model inputs for token ID lists
+
+    Returns:
+        input_ids and attention_mask, int64 arrays padded to the longest
+        sequence, with [CLS] ... [SEP] around every sequence
+    """
+    import numpy as np
+
+    length = max(len(ids) for ids in batch) + SPECIAL_TOKENS
+    input_ids = np.full((len(batch), length), pad_id, dtype=np.int64)
+    attention_mask = np.zeros((len(batch), length), dtype=np.int64)
+    for row, ids in enumerate(batch):
+        input_ids[row, : len(ids) + SPECIAL_TOKENS] = [cls_id, *ids, sep_id]
+        attention_mask[row, : len(ids) + SPECIAL_TOKENS] = 1
+    return input_ids, attention_mask
+
+
+def sentence_transformer_batcher(model, **options) -> TokenBudgetBatcher:
+    """Batcher for a SentenceTransformer (its fast tokenizer and modules)"""
+    tokenizer = model.tokenizer
+
+    def tokenize(texts: List[str]) -> List[TokenIds]:
+        return tokenizer(
+            texts,
+            add_special_tokens=False,
+            truncation=False,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+            verbose=False,
+        )["input_ids"]
+
+    def encode_ids(batch: List[TokenIds]):
+        import numpy as np
+        import torch
+
+        input_ids, attention_mask = pad_ids(
+            batch,
+            tokenizer.cls_token_id,
+            tokenizer.sep_token_id,
+            tokenizer.pad_token_id,
+        )
+        input_ids = torch.from_numpy(input_ids).to(model.device)
+        features = {
+            "input_ids": input_ids,
+            "attention_mask": torch.from_numpy(attention_mask).to(model.device),
+        }
+        if "token_type_ids" in tokenizer.model_input_names:
+            # Single-segment inputs
+            features["token_type_ids"] = torch.zeros_like(input_ids)
+        # The model's modules (transformer, pooling, normalize) on the IDs,
+        # which is what encode() runs after tokenizing
+        with torch.inference_mode():
+            vectors = model(features)["sentence_embedding"].float().cpu().numpy()
+        norms = np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors / norms
+
+    return TokenBudgetBatcher(
+        tokenize,
+        encode_ids,
+        max_seq_length=int(getattr(model, "max_seq_length", 256) or 256),
+        **options,
+    )
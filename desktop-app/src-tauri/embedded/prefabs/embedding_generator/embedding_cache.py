@@ -0,0 +1,253 @@
+"""
+Embedding Cache
+Content-addressed, size-capped SQLite store of embedding vectors
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CACHE_PATH = Path.home() / ".giggliagents" / "embedding_cache.sqlite3"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# SQLite's default limit on host parameters is 999 on older builds
+_QUERY_CHUNK = 500
+
+_caches: Dict[str, "EmbeddingCache"] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(
+    path: Path = DEFAULT_CACHE_PATH,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    dtype: str = "float32",
+) -> "EmbeddingCache":
+    """
+    Shared cache for a database file
+
+    Generators are rebuilt when settings change; they all share one open
+    connection per file instead of each opening their own.
+    """
+    key = str(path)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = EmbeddingCache(path, max_bytes=max_bytes, dtype=dtype)
+            _caches[key] = cache
+        else:
+            cache.max_bytes = max_bytes
+            cache.dtype = dtype
+        return cache
+
+
+class EmbeddingCache:
+    """
+    Embedding vectors keyed by sha256(provider, model, variant, text)
+
+    The variant names settings that change vectors without changing the
+    model, such as int8 weights or how over-long texts are handled, so
+    changing them does not serve vectors computed the old way.
+
+    Vectors are stored as raw float32 or float16 blobs. Every hit refreshes
+    the entry's last-used time; when the stored vectors exceed max_bytes,
+    the least recently used entries are evicted down to 90% of the cap.
+    """
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_CACHE_PATH,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        dtype: str = "float32",
+    ):
+        """
+        Args:
+            path: SQLite database file
+            max_bytes: Cap on the total size of stored vectors
+            dtype: Storage precision for new entries, float32 or float16
+        """
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported cache dtype: {dtype}")
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.dtype = dtype
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key BLOB PRIMARY KEY,
+                dtype TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used "
+            "ON embeddings(last_used)"
+        )
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    @staticmethod
+    def key(provider: str, model: str, text: str, variant: str = "") -> bytes:
+        return hashlib.sha256(
+            f"{provider}\x00{model}\x00{variant}\x00{text}".encode()
+        ).digest()
+
+    def get_many(self, keys: Sequence[bytes]) -> Dict[bytes, "np.ndarray"]:
+        """
+        Look up vectors
+
+        Args:
+            keys: Cache keys from key()
+
+        Returns:
+            Found vectors as float32 arrays, by key
+        """
+        import numpy as np
+
+        found: Dict[bytes, "np.ndarray"] = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            for start in range(0, len(unique), _QUERY_CHUNK):
+                chunk = unique[start : start + _QUERY_CHUNK]
+                rows = self._conn.execute(
+                    "SELECT key, dtype, vector FROM embeddings WHERE key IN "
+                    f"({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, dtype, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=dtype).astype(np.float32)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return found
+
+    def put_many(self, items: List[Tuple[bytes, "np.ndarray"]]):
+        """Store vectors, evicting least recently used entries over the cap"""
+        import numpy as np
+
+        if not items:
+            return
+
+        now = time.time()
+        rows = []
+        for key, vector in items:
+            blob = np.asarray(vector, dtype=self.dtype).tobytes()
+            rows.append((key, self.dtype, len(vector), blob, now))
+
+        with self._lock:
+            keys = [row[0] for row in rows]
+            replaced = 0
+            for start in range(0, len(keys), _QUERY_CHUNK):
+                chunk = keys[start : start + _QUERY_CHUNK]
+                replaced += self._conn.execute(
+                    "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings "
+                    f"WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchone()[0]
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._total_bytes += sum(len(row[3]) for row in rows) - replaced
+            if self._total_bytes > self.max_bytes:
+                self._evict(int(self.max_bytes * 0.9))
+            self._conn.commit()
+
+    def _evict(self, target_bytes: int):
+        """Drop least recently used entries until the cache fits target_bytes"""
+        evicted = 0
+        while self._total_bytes > target_bytes:
+            rows = self._conn.execute(
+                "SELECT key, LENGTH(vector) FROM embeddings "
+                "ORDER BY last_used LIMIT 256"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            dropped = []
+            for key, size in rows:
+                dropped.append((key,))
+                self._total_bytes -= size
+                if self._total_bytes <= target_bytes:
+                    break
+            self._conn.executemany("DELETE FROM embeddings WHERE key = ?", dropped)
+            evicted += len(dropped)
+
+        self.evictions += evicted
+        logger.debug("🧹 Evicted %d cached embeddings", evicted)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[
+                0
+            ]
+            lookups = self.hits + self.misses
+            return {
+                "path": str(self.path),
+                "entries": entries,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "dtype": self.dtype,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def clear(self) -> int:
+        """Remove every entry; returns the number removed"""
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM embeddings").rowcount
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+            self._total_bytes = 0
+            self.hits = self.misses = self.evictions = 0
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def cache_from_settings(settings: Dict) -> Optional[EmbeddingCache]:
+    """The shared cache configured by settings, None when disabled"""
+    if not settings.get("embedding_cache_enabled", True):
+        return None
+    return get_embedding_cache(
+        DEFAULT_CACHE_PATH,
+        max_bytes=int(float(settings.get("embedding_cache_max_mb", 512)) * 1024 * 1024),
+        dtype=settings.get("embedding_cache_dtype", "float32"),
+    )
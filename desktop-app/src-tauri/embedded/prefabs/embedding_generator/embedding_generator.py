@@ -3,19 +3,160 @@ Embedding Generator Prefab
 Generates embeddings using local or cloud models
 """
 
-from typing import List
-import numpy as np
+import logging
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
 import json
 
+from prefabs.base_module import BaseModule, ModuleExecutionError
+from prefabs.tracing import span
 
-class EmbeddingGenerator:
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Settings besides embedding_provider that change how embeddings are
+# produced; a change requires a new generator (see Executor.reload)
+EMBEDDING_SETTINGS = (
+    "openai_api_key",
+    "openai_base_url",
+    "openai_embedding_model",
+    "openai_max_concurrency",
+    "openai_batch_tokens",
+    "embedding_cache_enabled",
+    "embedding_cache_max_mb",
+    "embedding_cache_dtype",
+    "query_cache_size",
+    "onnx_quantized",
+    "onnx_threads",
+    "onnx_batch_size",
+    "embed_batch_tokens",
+    "embed_max_batch_size",
+    "embed_split_long",
+    "embed_workers",
+)
+
+LOCAL_MODEL = "all-MiniLM-L6-v2"
+
+DEFAULT_QUERY_CACHE_SIZE = 256
+
+# Loaded models shared by every generator, keyed by (provider, model)
+_models: Dict[Tuple[str, str], Any] = {}
+_models_lock = threading.Lock()
+
+
+def shared_model(provider: str, name: str, loader: Callable[[], Any]) -> Any:
+    """
+    Load a model once per process
+
+    Generators are rebuilt when settings change; the model they load is
+    not, as long as the (provider, model) pair stays the same.
+    """
+    key = (provider, name)
+    model = _models.get(key)
+    if model is None:
+        with _models_lock:
+            model = _models.get(key)
+            if model is None:
+                model = loader()
+                _models[key] = model
+    return model
+
+
+def release_model(key: Tuple[str, str]):
+    """Drop a model from the shared registry, closing it if it can be"""
+    with _models_lock:
+        model = _models.pop(key, None)
+    close = getattr(model, "close", None)
+    if close is not None:
+        close()
+
+
+def shared_model_key(settings: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """Registry key of the model these settings load, None for OpenAI"""
+    provider = settings.get("embedding_provider") or "local"
+    if provider == "openai":
+        # A client per generator, holding its own API key and thread pool
+        return None
+    if provider == "onnx":
+        quantized = bool(settings.get("onnx_quantized", True))
+        threads = int(settings.get("onnx_threads", 0))
+        batch_size = int(settings.get("onnx_batch_size", 32))
+        weights = "int8" if quantized else "fp32"
+        return "onnx", f"{LOCAL_MODEL}:{weights}:{threads}:{batch_size}"
+    # Local, and Claude (no embeddings API) falls back to local
+    return "local", LOCAL_MODEL
+
+
+def _load_sentence_transformer(name: str):
+    from sentence_transformers import SentenceTransformer
+
+    logger.info("Loading local embedding model...")
+    model = SentenceTransformer(name)
+    logger.info("✅ Local embedding model loaded")
+    return model
+
+
+def normalize_query(query: str) -> str:
+    """Query cache key: case, whitespace and trailing punctuation ignored"""
+    return " ".join(query.lower().split()).rstrip("?!. ")
+
+
+def embedding_config(settings: Dict[str, Any]) -> tuple:
+    """The parts of the settings an EmbeddingGenerator depends on"""
+    # Missing and empty values compare equal, so SettingsManager defaults
+    # do not look like a change
+    return (settings.get("embedding_provider") or "local",) + tuple(
+        None if settings.get(key) == "" else settings.get(key)
+        for key in EMBEDDING_SETTINGS
+    )
+
+
+class EmbeddingGenerator(BaseModule):
     """Generate embeddings for text"""
 
-    def __init__(self):
-        self.settings = self._load_settings()
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            settings: Settings to use instead of rag_settings.json
+        """
+        super().__init__("eg")
+        self.settings = settings if settings is not None else self._load_settings()
         self.provider = self.settings.get("embedding_provider", "local")
+        self.config = embedding_config(self.settings)
         self._model = None
+        self._cache = None
+        self._cache_loaded = False
+        self._batcher = None
+        self._lock = threading.Lock()
+
+        # Multi-process encoder for bulk ingests, attached by the runtime
+        # (see agent_runtime.embedding_pool)
+        self.worker_pool = None
+
+        # Recent query embeddings, see embed_query()
+        self._queries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_cache_size = int(
+            self.settings.get("query_cache_size", DEFAULT_QUERY_CACHE_SIZE)
+        )
+        self.query_hits = 0
+        self.query_misses = 0
+
+    def execute(
+        self, action: str, params: Dict[str, Any], context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Workflow entry point (see embedding_generator.g)"""
+        if action == "generate_embeddings":
+            self.validate_params(params, ["texts"])
+            return {"embeddings": self.generate_embeddings(params["texts"])}
+        if action == "embed_query":
+            self.validate_params(params, ["query"])
+            return {"embedding": self.embed_query(params["query"])}
+
+        raise ModuleExecutionError(f"Unknown action for eg: {action}")
 
     def _load_settings(self) -> dict:
         """Load settings from config"""
@@ -25,83 +166,225 @@ class EmbeddingGenerator:
                 return json.load(f)
         return {}
 
+    @property
+    def model_name(self) -> str:
+        """Name of the model producing vectors, part of the cache key"""
+        if self.provider == "openai":
+            from .openai_backend import DEFAULT_MODEL
+
+            return self.settings.get("openai_embedding_model", DEFAULT_MODEL)
+        return LOCAL_MODEL
+
+    @property
+    def cache_variant(self) -> str:
+        """Settings that change vectors of the same model, part of the cache key"""
+        long_texts = "split" if self.settings.get("embed_split_long", True) else "trunc"
+        if self.provider == "onnx":
+            weights = "int8" if self.settings.get("onnx_quantized", True) else "fp32"
+            return f"onnx-{weights}:{long_texts}"
+        return long_texts
+
+    @property
+    def cache(self):
+        """Shared on-disk embedding cache, None when disabled or unavailable"""
+        if not self._cache_loaded:
+            from .embedding_cache import cache_from_settings
+
+            try:
+                self._cache = cache_from_settings(self.settings)
+            except Exception as e:
+                logger.warning(f"⚠️ Embedding cache unavailable: {e}")
+                self._cache = None
+            self._cache_loaded = True
+        return self._cache
+
     @property
     def model(self):
         """Lazy load embedding model"""
         if self._model is None:
-            if self.provider == "local":
-                from sentence_transformers import SentenceTransformer
-
-                print("Loading local embedding model...")
-                self._model = SentenceTransformer("all-MiniLM-L6-v2")
-                print("✅ Local embedding model loaded")
-            elif self.provider == "openai":
-                import openai
-
-                api_key = self.settings.get("openai_api_key")
-                if not api_key:
-                    raise ValueError("OpenAI API key not configured")
-                openai.api_key = api_key
-                self._model = "openai"
-            elif self.provider == "claude":
-                # Claude doesn't have embeddings, fall back to local
-                from sentence_transformers import SentenceTransformer
-
-                self._model = SentenceTransformer("all-MiniLM-L6-v2")
-
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load_model()
         return self._model
 
-    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+    def _load_model(self):
+        if self.provider == "openai":
+            from .openai_backend import DEFAULT_MODEL, OpenAIEmbeddingBackend
+
+            api_key = self.settings.get("openai_api_key")
+            if not api_key:
+                raise ValueError("OpenAI API key not configured")
+            return OpenAIEmbeddingBackend(
+                api_key=api_key,
+                model=self.settings.get("openai_embedding_model", DEFAULT_MODEL),
+                base_url=self.settings.get("openai_base_url") or None,
+                max_concurrency=int(self.settings.get("openai_max_concurrency", 4)),
+                max_batch_tokens=int(self.settings.get("openai_batch_tokens", 100_000)),
+                split_long=bool(self.settings.get("embed_split_long", True)),
+            )
+
+        if self.provider == "onnx":
+            from .onnx_backend import OnnxEmbeddingBackend
+
+            return shared_model(
+                *shared_model_key(self.settings),
+                lambda: OnnxEmbeddingBackend(
+                    quantized=bool(self.settings.get("onnx_quantized", True)),
+                    threads=int(self.settings.get("onnx_threads", 0)),
+                    batch_size=int(self.settings.get("onnx_batch_size", 32)),
+                ),
+            )
+
+        return shared_model(
+            *shared_model_key(self.settings),
+            lambda: _load_sentence_transformer(LOCAL_MODEL),
+        )
+
+    def close(self):
+        """
+        Release the worker pool and the model client this generator owns
+
+        Shared models stay loaded for other generators; see release_model.
+        """
+        if self.worker_pool is not None:
+            self.worker_pool.shutdown()
+            self.worker_pool = None
+        with self._lock:
+            model, self._model = self._model, None
+            self._batcher = None
+        if model is not None and shared_model_key(self.settings) is None:
+            model.close()
+
+    @property
+    def batcher(self):
+        """Token-budget batcher for the local and onnx models"""
+        if self._batcher is None:
+            model = self.model
+            with self._lock:
+                if self._batcher is None:
+                    self._batcher = self._make_batcher(model)
+        return self._batcher
+
+    def _make_batcher(self, model):
+        from .batching import TokenBudgetBatcher, sentence_transformer_batcher
+
+        options = {
+            "max_batch_tokens": int(self.settings.get("embed_batch_tokens", 8192)),
+            "max_batch_size": int(self.settings.get("embed_max_batch_size", 128)),
+            "split_long": bool(self.settings.get("embed_split_long", True)),
+        }
+        if self.provider == "onnx":
+            return TokenBudgetBatcher(
+                model.tokenize,
+                model.encode_ids,
+                max_seq_length=model.max_seq_length,
+                **options,
+            )
+        return sentence_transformer_batcher(model, **options)
+
+    def generate_embeddings(self, texts: List[str]) -> "np.ndarray":
         """
         Generate embeddings for texts
 
+        Texts already in the embedding cache are served from it; only the
+        rest reach the model or API.
+
         Args:
             texts: List of text chunks
 
         Returns:
             Numpy array of embeddings
         """
-        print(f"🔢 Generating embeddings for {len(texts)} chunks...")
+        if not len(texts):
+            # e.g. a workflow re-run on an unchanged file; the model stays unloaded
+            import numpy as np
 
-        if self.provider == "local":
-            embeddings = self.model.encode(texts, show_progress_bar=False)
+            return np.zeros((0, 0), dtype=np.float32)
 
-        elif self.provider == "openai":
-            import openai
+        logger.debug("🔢 Generating embeddings for %d chunks...", len(texts))
 
-            api_key = self.settings.get("openai_api_key")
-            if not api_key:
-                raise ValueError("OpenAI API key not configured")
+        with span("embed", provider=self.provider, texts=len(texts)) as stage:
+            cache = self.cache
+            if cache is None or not texts:
+                embeddings = self._encode(texts)
+            else:
+                embeddings = self._generate_cached(cache, texts, stage)
+
+        logger.debug("✅ Generated %d embeddings", len(embeddings))
+        return embeddings
 
-            # Create client with API key
-            client = openai.OpenAI(api_key=api_key)
+    def _generate_cached(self, cache, texts: List[str], stage) -> "np.ndarray":
+        import numpy as np
 
-            embeddings = []
-            for text in texts:
-                response = client.embeddings.create(
-                    model="text-embedding-3-small", input=text
-                )
-                embeddings.append(response.data[0].embedding)
-            embeddings = np.array(embeddings)
+        model, variant = self.model_name, self.cache_variant
+        keys = [cache.key(self.provider, model, text, variant) for text in texts]
+        try:
+            vectors = cache.get_many(keys)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read embedding cache: {e}")
+            vectors = {}
 
-        else:
-            # Default to local
-            from sentence_transformers import SentenceTransformer
+        # Each distinct missing text is embedded once
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+        stage.set(cache_hits=len(texts) - sum(key not in vectors for key in keys))
 
-            model = SentenceTransformer("all-MiniLM-L6-v2")
-            embeddings = model.encode(texts, show_progress_bar=False)
+        if missing:
+            fresh = self._encode(list(missing.values()))
+            new_items = list(zip(missing.keys(), fresh))
+            try:
+                cache.put_many(new_items)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not write embedding cache: {e}")
+            vectors.update(new_items)
 
-        print(f"✅ Generated {len(embeddings)} embeddings")
-        return embeddings
+        return np.stack([np.asarray(vectors[key], dtype=np.float32) for key in keys])
+
+    def _encode(self, texts: List[str]) -> "np.ndarray":
+        """Embed texts with the configured provider, bypassing the cache"""
+        if self.provider == "openai":
+            # Batched, concurrent requests over the backend's pooled client
+            return self.model.embed(texts)
+
+        pool = self.worker_pool
+        if pool is not None and len(texts) >= pool.min_texts:
+            try:
+                return pool.encode(texts)
+            except Exception as e:
+                logger.warning(f"⚠️ Embedding workers failed, encoding in-process: {e}")
 
-    def embed_query(self, query: str) -> np.ndarray:
+        # Local and onnx models: tokenized once, split over the model window
+        # and batched by token budget
+        return self.batcher.encode(texts)
+
+    def embed_query(self, query: str) -> "np.ndarray":
         """
         Generate embedding for a single query
 
+        Recent queries are kept in a small LRU keyed by normalize_query(),
+        so a repeated question skips encoding.
+
         Args:
             query: Query text
 
         Returns:
             Embedding vector
         """
-        return self.generate_embeddings([query])[0]
+        key = normalize_query(query)
+        with self._lock:
+            embedding = self._queries.get(key)
+            if embedding is not None:
+                self._queries.move_to_end(key)
+                self.query_hits += 1
+                return embedding
+            self.query_misses += 1
+
+        embedding = self.generate_embeddings([query])[0]
+
+        with self._lock:
+            self._queries[key] = embedding
+            while len(self._queries) > self._query_cache_size:
+                self._queries.popitem(last=False)
+        return embedding
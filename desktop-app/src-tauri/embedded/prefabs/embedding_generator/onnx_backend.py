@@ -0,0 +1,165 @@
+"""
+ONNX Embedding Backend
+all-MiniLM-L6-v2 on ONNX Runtime with int8 dynamic quantization
+"""
+
+import logging
+import platform
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+MODEL_REPO = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Matches max_seq_length in the model's sentence_bert_config.json
+MAX_SEQ_LENGTH = 256
+
+
+def quantized_model_file() -> str:
+    """
+    Dynamically quantized (int8) export for this CPU
+
+    The model repository ships quantize_dynamic() exports tuned per
+    instruction set; using them avoids depending on the onnx package to
+    quantize at runtime.
+    """
+    machine = platform.machine().lower()
+    if machine in ("arm64", "aarch64"):
+        return "onnx/model_qint8_arm64.onnx"
+    return "onnx/model_quint8_avx2.onnx"
+
+
+class OnnxEmbeddingBackend:
+    """
+    Sentence embeddings with ONNX Runtime
+
+    Produces the same vectors as SentenceTransformer("all-MiniLM-L6-v2")
+    (mean pooling over the attention mask, then L2 normalisation) without
+    PyTorch. Texts are sorted by length before batching so each batch pads
+    to a similar length.
+    """
+
+    def __init__(
+        self,
+        quantized: bool = True,
+        threads: int = 0,
+        batch_size: int = 32,
+        model_file: Optional[str] = None,
+    ):
+        """
+        Args:
+            quantized: Use the int8 export instead of float32
+            threads: Intra-op threads, 0 lets ONNX Runtime pick (physical cores)
+            batch_size: Texts per inference call
+            model_file: Override the file inside MODEL_REPO
+        """
+        import onnxruntime as ort
+        from huggingface_hub import hf_hub_download
+        from tokenizers import Tokenizer
+
+        self.batch_size = max(1, batch_size)
+        self.model_file = model_file or (
+            quantized_model_file() if quantized else "onnx/model.onnx"
+        )
+
+        logger.info(f"Loading ONNX embedding model ({self.model_file})...")
+        model_path = hf_hub_download(MODEL_REPO, self.model_file)
+        tokenizer_path = hf_hub_download(MODEL_REPO, "tokenizer.json")
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+        # Untruncated copy for the token budget batcher, see tokenize()
+        self._measure_tokenizer = Tokenizer.from_file(tokenizer_path)
+        self._measure_tokenizer.no_truncation()
+        self._measure_tokenizer.no_padding()
+        self.max_seq_length = MAX_SEQ_LENGTH
+        self.special_ids = tuple(
+            self.tokenizer.token_to_id(token) for token in ("[CLS]", "[SEP]", "[PAD]")
+        )
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = max(0, threads)
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {item.name for item in self.session.get_inputs()}
+
+        logger.info("✅ ONNX embedding model loaded")
+
+    def encode(self, texts: List[str], show_progress_bar: bool = False) -> "np.ndarray":
+        """
+        Embed texts (same call shape as SentenceTransformer.encode)
+
+        Args:
+            texts: Texts to embed
+            show_progress_bar: Accepted for compatibility, ignored
+
+        Returns:
+            float32 array of shape (len(texts), 384), rows in input order
+        """
+        import numpy as np
+
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        embeddings = None
+
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start : start + self.batch_size]
+            vectors = self.encode_batch([texts[i] for i in indices])
+            if embeddings is None:
+                embeddings = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            embeddings[indices] = vectors
+
+        return embeddings
+
+    def tokenize(self, texts: List[str]) -> List[List[int]]:
+        """Token IDs of texts, without special tokens or truncation"""
+        encodings = self._measure_tokenizer.encode_batch(
+            list(texts), add_special_tokens=False
+        )
+        return [encoding.ids for encoding in encodings]
+
+    def encode_ids(self, batch: List[List[int]]) -> "np.ndarray":
+        """Embed token ID lists (from tokenize), padded to the longest"""
+        from .batching import pad_ids
+
+        return self._run(*pad_ids(batch, *self.special_ids))
+
+    def encode_batch(self, texts: List[str]) -> "np.ndarray":
+        """Embed one batch, padded to its longest text"""
+        import numpy as np
+
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        return self._run(input_ids, attention_mask)
+
+    def _run(self, input_ids: "np.ndarray", attention_mask: "np.ndarray"):
+        """Mean-pooled, normalized embeddings for padded model inputs"""
+        import numpy as np
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            # Single-segment inputs
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling over real tokens, then L2 normalisation
+        mask = attention_mask[:, :, None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled = summed / counts
+        norms = np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return (pooled / norms).astype(np.float32)
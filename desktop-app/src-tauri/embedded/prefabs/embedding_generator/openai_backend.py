@@ -0,0 +1,333 @@
+"""
+OpenAI Embedding Backend
+Token-bounded batch requests over one pooled client
+"""
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MODEL = "text-embedding-3-small"
+
+# API limits per embeddings request
+MAX_INPUTS_PER_REQUEST = 2048
+MAX_TOKENS_PER_INPUT = 8191
+
+# Tokens per window of a split text; the margin covers windows tokenizing
+# slightly differently once decoded back to text
+WINDOW_TOKENS = MAX_TOKENS_PER_INPUT - 64
+
+
+class OpenAIEmbeddingBackend:
+    """
+    Embed texts with the OpenAI embeddings API
+
+    Texts are packed into requests bounded by an estimated token budget
+    and input count, and the requests run concurrently on a small thread
+    pool sharing one client (and therefore one HTTP connection pool).
+    Rate-limited and transient failures are retried with exponential
+    backoff, honouring the server's Retry-After header.
+
+    Texts over the API's per-input token limit, which would fail their
+    whole request, are split into windows whose embeddings are averaged
+    (weighted by tokens), or cut to the first window with split_long off.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = DEFAULT_MODEL,
+        base_url: Optional[str] = None,
+        max_concurrency: int = 4,
+        max_batch_tokens: int = 100_000,
+        max_batch_inputs: int = MAX_INPUTS_PER_REQUEST,
+        max_retries: int = 6,
+        timeout: float = 60.0,
+        split_long: bool = True,
+    ):
+        """
+        Args:
+            api_key: OpenAI API key
+            model: Embedding model name
+            base_url: API base URL (proxies, Azure-compatible gateways, tests)
+            max_concurrency: Requests in flight at the same time
+            max_batch_tokens: Estimated tokens per request
+            max_batch_inputs: Texts per request
+            max_retries: Retries per request on 429 / 5xx / connection errors
+            timeout: Per-request timeout in seconds
+            split_long: Split texts over MAX_TOKENS_PER_INPUT; when False
+                they are truncated to the limit
+        """
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_batch_tokens = max(1, max_batch_tokens)
+        self.max_batch_inputs = max(1, min(max_batch_inputs, MAX_INPUTS_PER_REQUEST))
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.split_long = split_long
+
+        self._client = None
+        self._encoding = None
+        self._pool = None
+        self._lock = threading.Lock()
+
+        # Counters for diagnostics, updated under _lock since requests run on
+        # pool threads
+        self.requests_sent = 0
+        self.retries = 0
+        self.texts_split = 0
+        self.texts_truncated = 0
+
+    @property
+    def client(self):
+        """Shared client; its HTTP connections are reused across calls"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import openai
+
+                    # Retries are handled in _request() so they respect
+                    # max_retries and are counted
+                    self._client = openai.OpenAI(
+                        api_key=self.api_key,
+                        base_url=self.base_url,
+                        max_retries=0,
+                        timeout=self.timeout,
+                    )
+        return self._client
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_concurrency,
+                        thread_name_prefix="openai-embed",
+                    )
+        return self._pool
+
+    @property
+    def encoding(self):
+        """The model's tiktoken encoding, False when tiktoken is missing"""
+        if self._encoding is None:
+            try:
+                import tiktoken
+
+                try:
+                    self._encoding = tiktoken.encoding_for_model(self.model)
+                except KeyError:
+                    self._encoding = tiktoken.get_encoding("cl100k_base")
+            except ImportError:
+                self._encoding = False
+        return self._encoding
+
+    def count_tokens(self, text: str) -> int:
+        """Token count via tiktoken, or a chars/4 estimate without it"""
+        if self.encoding:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return len(text) // 4 + 1
+
+    def split_text(self, text: str) -> List[Tuple[str, int]]:
+        """
+        Cut a text into windows the API accepts
+
+        Windows hold WINDOW_TOKENS tokens. Without tiktoken they hold at
+        most MAX_TOKENS_PER_INPUT UTF-8 bytes instead: every token covers at
+        least one byte, so such a window never exceeds the limit.
+
+        Returns:
+            (window, weight) per window, weight being its tokens (or bytes)
+        """
+        data = text.encode("utf-8")
+        if len(data) <= MAX_TOKENS_PER_INPUT:
+            return [(text, len(data))]
+
+        if self.encoding:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            if len(tokens) <= MAX_TOKENS_PER_INPUT:
+                return [(text, len(tokens))]
+            windows = [
+                tokens[start : start + WINDOW_TOKENS]
+                for start in range(0, len(tokens), WINDOW_TOKENS)
+            ]
+            return [(self.encoding.decode(window), len(window)) for window in windows]
+
+        windows = []
+        start = 0
+        while start < len(data):
+            end = min(start + MAX_TOKENS_PER_INPUT, len(data))
+            # Back up to a character boundary (skip UTF-8 continuation bytes)
+            while end < len(data) and data[end] & 0xC0 == 0x80:
+                end -= 1
+            windows.append((data[start:end].decode("utf-8"), end - start))
+            start = end
+        return windows
+
+    def make_batches(self, texts: List[str]) -> List[List[int]]:
+        """
+        Group text indices into requests
+
+        Each request stays under max_batch_tokens and max_batch_inputs; a
+        single text larger than the budget gets a request of its own.
+        """
+        batches: List[List[int]] = []
+        current: List[int] = []
+        tokens = 0
+
+        for index, text in enumerate(texts):
+            count = min(self.count_tokens(text), MAX_TOKENS_PER_INPUT)
+            if current and (
+                tokens + count > self.max_batch_tokens
+                or len(current) >= self.max_batch_inputs
+            ):
+                batches.append(current)
+                current, tokens = [], 0
+            current.append(index)
+            tokens += count
+
+        if current:
+            batches.append(current)
+        return batches
+
+    def embed(self, texts: List[str]) -> "np.ndarray":
+        """
+        Embed texts
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Array of shape (len(texts), dimension), rows in input order
+        """
+        import numpy as np
+
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        # The API rejects empty strings
+        texts = [text if text.strip() else " " for text in texts]
+
+        # (source index, text, weight) per input sent to the API
+        pieces: List[Tuple[int, str, int]] = []
+        split = truncated = 0
+        for index, text in enumerate(texts):
+            windows = self.split_text(text)
+            if len(windows) > 1:
+                if self.split_long:
+                    split += 1
+                else:
+                    truncated += 1
+                    windows = windows[:1]
+            pieces.extend((index, window, weight) for window, weight in windows)
+        with self._lock:
+            self.texts_split += split
+            self.texts_truncated += truncated
+
+        inputs = [text for _, text, _ in pieces]
+        batches = self.make_batches(inputs)
+
+        if len(batches) == 1:
+            results = [self._request([inputs[i] for i in batches[0]])]
+        else:
+            futures = [
+                self.pool.submit(self._request, [inputs[i] for i in batch])
+                for batch in batches
+            ]
+            results = [future.result() for future in futures]
+
+        vectors = None
+        for batch, batch_vectors in zip(batches, results):
+            if vectors is None:
+                vectors = np.empty(
+                    (len(inputs), len(batch_vectors[0])), dtype=np.float32
+                )
+            vectors[batch] = batch_vectors
+
+        if len(pieces) == len(texts):
+            # Nothing was split, so pieces are the texts in input order
+            embeddings = vectors
+        else:
+            embeddings = np.zeros((len(texts), vectors.shape[1]), dtype=np.float32)
+            for (source, _, weight), vector in zip(pieces, vectors):
+                embeddings[source] += vector * weight
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.clip(norms, 1e-12, None)
+
+        if truncated:
+            logger.warning(
+                f"⚠️ {truncated} texts exceeded {MAX_TOKENS_PER_INPUT} tokens and "
+                "were truncated"
+            )
+        logger.debug(
+            "🔢 Embedded %d texts in %d OpenAI requests", len(texts), len(batches)
+        )
+        return embeddings
+
+    def _request(self, inputs: List[str]) -> List[List[float]]:
+        """One embeddings request with backoff; vectors in input order"""
+        import openai
+
+        attempt = 0
+        while True:
+            try:
+                with self._lock:
+                    self.requests_sent += 1
+                response = self.client.embeddings.create(model=self.model, input=inputs)
+                data = sorted(response.data, key=lambda item: item.index)
+                return [item.embedding for item in data]
+            except (
+                openai.RateLimitError,
+                openai.APIConnectionError,
+                openai.InternalServerError,
+            ) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(e, attempt)
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                logger.warning(
+                    f"⚠️ OpenAI embeddings request failed ({type(e).__name__}), "
+                    f"retry {attempt}/{self.max_retries} in {delay:.1f}s"
+                )
+                time.sleep(delay)
+
+    @staticmethod
+    def _retry_delay(error: Exception, attempt: int) -> float:
+        """Retry-After from the response when present, else jittered backoff"""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms:
+            try:
+                return float(retry_after_ms) / 1000
+            except ValueError:
+                pass
+
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+
+        return min(30.0, 0.5 * 2**attempt) * (0.5 + random.random() / 2)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+        if self._client is not None:
+            self._client.close()
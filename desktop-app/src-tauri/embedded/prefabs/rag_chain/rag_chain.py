@@ -4,24 +4,106 @@ Handles question answering with smart document filtering
 """
 
 import json
-from typing import Dict, Any, List
+import logging
+import re
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
 from datetime import datetime
 from pathlib import Path
 
+from prefabs.base_module import BaseModule, ModuleExecutionError
+from prefabs.tracing import span
 
-class RAGChain:
+logger = logging.getLogger(__name__)
+
+
+# Common vague patterns and their improvements
+QUESTION_IMPROVEMENTS = {
+    # "what is in" → "summarize and describe the content"
+    r"what\s+(is|are)\s+in": "Summarize and describe the main content and topics in",
+    r"what.*about": "Explain the main topics and information about",
+    r"tell me about": "Provide a detailed summary of",
+    r"what does.*say": "Summarize the main points and information in",
+    r"what.*contain": "List and describe the main content and information in",
+}
+
+
+@lru_cache(maxsize=1)
+def compiled_question_improvements() -> List[Tuple[re.Pattern, str]]:
+    """Compile QUESTION_IMPROVEMENTS once per process"""
+    return [
+        (re.compile(pattern, flags=re.IGNORECASE), replacement)
+        for pattern, replacement in QUESTION_IMPROVEMENTS.items()
+    ]
+
+
+def page_label(pages) -> str:
+    """Citation for a page range: "p. 3", "pp. 3-4", or "" without pages"""
+    if not pages:
+        return ""
+    start, end = pages
+    return f"p. {start}" if start == end else f"pp. {start}-{end}"
+
+
+def context_block(result: Dict[str, Any]) -> str:
+    """One search result as context for the LLM, labelled with its source"""
+    label = page_label(result.get("pages"))
+    source = f"{result['document']} ({label})" if label else result["document"]
+    return f"From {source}:\n{result['text']}"
+
+
+class RAGChain(BaseModule):
     """RAG chain for question answering with intelligent filtering"""
 
     def __init__(
-        self, vector_store, llm_provider: str = "openai", settings: Dict = None
+        self,
+        vector_store,
+        llm_provider: str = "openai",
+        settings: Dict = None,
+        embedding_generator=None,
     ):
+        super().__init__("rc")
         self.vector_store = vector_store
+        # Shared query embedder; falls back to the vector store's own
+        self.embedding_generator = embedding_generator
         self.llm_provider = llm_provider
         self.settings = settings or {}
         self.chat_history_file = Path.home() / ".giggliagents" / "chat_history.json"
         self.chat_history_file.parent.mkdir(parents=True, exist_ok=True)
 
-        print(f"✅ RAG Chain initialized (LLM: {llm_provider})")
+        logger.info(f"✅ RAG Chain initialized (LLM: {llm_provider})")
+
+    def execute(
+        self, action: str, params: Dict[str, Any], context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Workflow entry point (see rag_chain.g)"""
+        if action == "ask":
+            self.validate_params(params, ["question"])
+            return self.answer_question(
+                params["question"], top_k=int(params.get("top_k", 5))
+            )
+        if action == "generate_answer":
+            self.validate_params(params, ["question", "sources"])
+            sources = params["sources"]
+            if not sources:
+                return {
+                    "answer": "I couldn't find any relevant information.",
+                    "sources": [],
+                }
+            context_text = "\n\n".join([context_block(r) for r in sources])
+            with span("generate", provider=self.llm_provider):
+                answer = self._generate_answer(
+                    context_text, params["question"], sources
+                )
+            self._save_to_history(params["question"], answer, sources)
+            return {"answer": answer, "sources": sources}
+        if action == "get_history":
+            return {"history": self.get_chat_history(int(params.get("limit", 50)))}
+        if action == "clear_history":
+            self.clear_history()
+            return {"success": True}
+
+        raise ModuleExecutionError(f"Unknown action for rc: {action}")
 
     def _identify_document_intent(
         self, question: str, all_docs: List[str]
@@ -87,24 +169,10 @@ class RAGChain:
         Returns:
             Enhanced question
         """
-        question_lower = question.lower().strip()
-
-        # Common vague patterns and their improvements
-        improvements = {
-            # "what is in" → "summarize and describe the content"
-            r"what\s+(is|are)\s+in": "Summarize and describe the main content and topics in",
-            r"what.*about": "Explain the main topics and information about",
-            r"tell me about": "Provide a detailed summary of",
-            r"what does.*say": "Summarize the main points and information in",
-            r"what.*contain": "List and describe the main content and information in",
-        }
-
         # Apply improvements
-        import re
-
         enhanced = question
-        for pattern, replacement in improvements.items():
-            enhanced = re.sub(pattern, replacement, enhanced, flags=re.IGNORECASE)
+        for pattern, replacement in compiled_question_improvements():
+            enhanced = pattern.sub(replacement, enhanced)
 
         return enhanced
 
@@ -112,10 +180,12 @@ class RAGChain:
         """
         Answer question with smart filtering and helpful responses
         """
-        print(f"❓ Question: {question}")
+        logger.debug("❓ Question: %s", question)
 
         # Get all available documents
-        all_docs = self.vector_store.get_all_documents()
+        with span("list_documents") as stage:
+            all_docs = self.vector_store.get_all_documents()
+            stage.set(documents=len(all_docs))
 
         if not all_docs:
             return {
@@ -133,16 +203,16 @@ class RAGChain:
             filter_part = question[16:end_bracket]  # After "[Search only in "
             clean_question = question[end_bracket + 1 :].strip()
             manual_filter = filter_part.strip()
-            print(f"🎯 Manual filter detected: {manual_filter}")
+            logger.debug(f"🎯 Manual filter detected: {manual_filter}")
 
         # If manual filter specified, use only that document
         if manual_filter:
             matching_docs = [d for d in all_docs if manual_filter in d]
             if matching_docs:
                 relevant_doc_filter = matching_docs
-                print(f"✅ Filtering to: {matching_docs}")
+                logger.debug(f"✅ Filtering to: {matching_docs}")
             else:
-                print(f"⚠️ Filter '{manual_filter}' not found, using all docs")
+                logger.warning(f"⚠️ Filter '{manual_filter}' not found, using all docs")
                 relevant_doc_filter = all_docs
         else:
             # Smart automatic filtering
@@ -150,31 +220,47 @@ class RAGChain:
                 clean_question, all_docs
             )
 
-        if len(relevant_doc_filter) < len(all_docs):
-            print(
+        if len(relevant_doc_filter) < len(all_docs) and logger.isEnabledFor(
+            logging.DEBUG
+        ):
+            logger.debug(
                 f"🎯 Smart filter: Searching {len(relevant_doc_filter)}/{len(all_docs)} relevant documents"
             )
             for doc in relevant_doc_filter:
-                print(f"   ✓ {doc}")
+                logger.debug(f"   ✓ {doc}")
             ignored = [d for d in all_docs if d not in relevant_doc_filter]
             if ignored:
-                print(
+                logger.debug(
                     f"   ✗ Ignoring: {', '.join(ignored[:3])}{'...' if len(ignored) > 3 else ''}"
                 )
 
         # Enhance vague questions
         enhanced_question = self._improve_question(clean_question)
         if enhanced_question != clean_question:
-            print(f"💡 Enhanced query: {enhanced_question}")
+            logger.debug(f"💡 Enhanced query: {enhanced_question}")
+
+        query_embedding = None
+        if self.embedding_generator is not None:
+            with span("embed_query"):
+                query_embedding = self.embedding_generator.embed_query(
+                    enhanced_question
+                )
 
         # Search with filtering
-        results = self.vector_store.search(
-            enhanced_question,
-            top_k=top_k,
-            document_filter=relevant_doc_filter
-            if relevant_doc_filter != all_docs
-            else None,
-        )
+        # Dense + BM25 unless turned off; exact identifiers (invoice numbers,
+        # error codes) are often far from the question in embedding space
+        hybrid = self.settings.get("hybrid_search_enabled", True)
+        search = self.vector_store.hybrid_search if hybrid else self.vector_store.search
+        with span("retrieve", top_k=top_k, hybrid=hybrid) as stage:
+            results = search(
+                enhanced_question,
+                top_k=top_k,
+                document_filter=relevant_doc_filter
+                if relevant_doc_filter != all_docs
+                else None,
+                query_embedding=query_embedding,
+            )
+            stage.set(results=len(results))
 
         if not results:
             doc_list = "\n".join([f"• {doc}" for doc in all_docs])
@@ -189,15 +275,14 @@ class RAGChain:
             sum(r["relevance"] for r in results) / len(results) if results else -1
         )
 
-        print(f"📊 Relevance: best={best_relevance:.2f}, avg={avg_relevance:.2f}")
+        logger.debug("📊 Relevance: best=%.2f, avg=%.2f", best_relevance, avg_relevance)
 
         # Build context from results
-        context = "\n\n".join(
-            [f"From {r['document']}:\n{r['text']}" for r in results[:top_k]]
-        )
+        context = "\n\n".join([context_block(r) for r in results[:top_k]])
 
         # Generate answer using LLM
-        answer = self._generate_answer(context, question, results)
+        with span("generate", provider=self.llm_provider):
+            answer = self._generate_answer(context, question, results)
 
         # Save to history
         self._save_to_history(question, answer, results)
@@ -223,6 +308,7 @@ Instructions:
 - Be conversational and natural
 - Don't say "based on the provided documents" - just answer naturally
 - If you're not sure, say so clearly
+- When a source gives pages, cite them after the facts taken from it, like (p. 12)
 
 Answer:"""
 
@@ -243,7 +329,7 @@ Answer:"""
             return answer
 
         except Exception as e:
-            print(f"❌ LLM error: {e}")
+            logger.error(f"❌ LLM error: {e}")
             # Fallback: return context directly
             return f"I found this information but couldn't generate a summary:\n\n{context[:500]}..."
 
@@ -308,7 +394,11 @@ Answer:"""
                     "question": question,
                     "answer": answer,
                     "sources": [
-                        {"document": s["document"], "relevance": s["relevance"]}
+                        {
+                            "document": s["document"],
+                            "relevance": s["relevance"],
+                            "pages": s.get("pages"),
+                        }
                         for s in sources[:5]
                     ],
                 }
@@ -322,7 +412,7 @@ Answer:"""
                 json.dump(history, f, indent=2, ensure_ascii=False)
 
         except Exception as e:
-            print(f"⚠️ Failed to save chat history: {e}")
+            logger.warning(f"⚠️ Failed to save chat history: {e}")
 
     def get_chat_history(self, limit: int = 50) -> List[Dict]:
         """Get chat history"""
@@ -333,7 +423,7 @@ Answer:"""
                 return history[-limit:]
             return []
         except Exception as e:
-            print(f"⚠️ Failed to load chat history: {e}")
+            logger.warning(f"⚠️ Failed to load chat history: {e}")
             return []
 
     def clear_history(self):
@@ -341,6 +431,6 @@ Answer:"""
         try:
             if self.chat_history_file.exists():
                 self.chat_history_file.unlink()
-            print("✅ Chat history cleared")
+            logger.info("✅ Chat history cleared")
         except Exception as e:
-            print(f"⚠️ Failed to clear history: {e}")
+            logger.warning(f"⚠️ Failed to clear history: {e}")
@@ -3,10 +3,13 @@ Settings Manager
 Manages app settings
 """
 
+import logging
 from pathlib import Path
 import json
 from typing import Dict
 
+logger = logging.getLogger(__name__)
+
 
 class SettingsManager:
     """Manage RAG settings"""
@@ -43,4 +46,4 @@ class SettingsManager:
         """Save settings"""
         with open(self.settings_path, "w") as f:
             json.dump(settings, f, indent=2)
-        print("✅ Settings saved")
+        logger.info("✅ Settings saved")
@@ -0,0 +1,232 @@
+"""
+Runtime Tracing
+Level-gated logging and lightweight spans for pipeline stages
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+
+# Loggers owned by the embedded runtime
+RUNTIME_LOGGERS = ("agent_runtime", "prefabs", "module")
+
+DEFAULT_BUFFER_SIZE = 200
+
+# All span timestamps are relative to this, in nanoseconds
+_EPOCH_NS = time.perf_counter_ns()
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar(
+    "current_trace", default=None
+)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+_recent = deque(maxlen=DEFAULT_BUFFER_SIZE)
+_recent_lock = threading.Lock()
+_enabled = True
+
+
+def configure_logging(level: Optional[str] = None):
+    """
+    Route runtime loggers to stdout at the given level
+
+    Args:
+        level: Level name (DEBUG, INFO, ...). Falls back to the
+            GIGGLI_LOG_LEVEL environment variable, then INFO.
+    """
+    level = (level or os.environ.get("GIGGLI_LOG_LEVEL") or "INFO").upper()
+    numeric = getattr(logging, level, logging.INFO)
+
+    for name in RUNTIME_LOGGERS:
+        logger = logging.getLogger(name)
+        logger.setLevel(numeric)
+        if not logger.handlers:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+        logger.propagate = False
+
+
+def configure_tracing(enabled: bool = True, buffer_size: int = DEFAULT_BUFFER_SIZE):
+    """Turn span recording on/off and resize the recent-trace ring buffer"""
+    global _enabled, _recent
+    _enabled = enabled
+    with _recent_lock:
+        if _recent.maxlen != buffer_size:
+            _recent = deque(_recent, maxlen=buffer_size)
+
+
+class Span:
+    """A timed stage inside a trace"""
+
+    __slots__ = ("name", "attrs", "start_ns", "end_ns", "thread_id", "depth")
+
+    def __init__(self, name: str, attrs: Dict[str, Any], depth: int):
+        self.name = name
+        self.attrs = attrs
+        self.start_ns = time.perf_counter_ns() - _EPOCH_NS
+        self.end_ns = None
+        self.thread_id = threading.get_ident()
+        self.depth = depth
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else self.start_ns
+        return (end - self.start_ns) / 1_000_000
+
+    def set(self, **attrs):
+        """Attach attributes discovered while the span runs"""
+        self.attrs.update(attrs)
+
+
+class Trace:
+    """All spans recorded for one top-level operation"""
+
+    def __init__(self, name: str):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.started_at = time.time()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def summary(self) -> Dict[str, Any]:
+        root = self.spans[0] if self.spans else None
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round(root.duration_ms, 3) if root else 0.0,
+            "stages": [
+                {
+                    "name": span.name,
+                    "duration_ms": round(span.duration_ms, 3),
+                    "depth": span.depth,
+                    **span.attrs,
+                }
+                for span in self.spans[1:]
+            ],
+        }
+
+
+class _NoopSpan:
+    """Returned when no trace is active; costs one attribute lookup"""
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _SpanContext:
+    def __init__(self, trace: Trace, name: str, attrs: Dict[str, Any], root: bool):
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+        self.root = root
+
+    def __enter__(self) -> Span:
+        parent = _current_span.get()
+        depth = parent.depth + 1 if parent is not None and not self.root else 0
+        self.span = Span(self.name, self.attrs, depth)
+        self.trace.add(self.span)
+        self._span_token = _current_span.set(self.span)
+        if self.root:
+            self._trace_token = _current_trace.set(self.trace)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.end_ns = time.perf_counter_ns() - _EPOCH_NS
+        if exc_type is not None:
+            self.span.attrs["error"] = str(exc)
+        _current_span.reset(self._span_token)
+        if self.root:
+            _current_trace.reset(self._trace_token)
+            with _recent_lock:
+                _recent.append(self.trace)
+        return False
+
+
+def start_trace(name: str, **attrs):
+    """
+    Begin a trace for a top-level operation (one executor command)
+
+    Usage:
+        with start_trace("answer_question"):
+            ...
+    """
+    if not _enabled:
+        return _NOOP
+    return _SpanContext(Trace(name), name, attrs, root=True)
+
+
+def span(name: str, **attrs):
+    """
+    Time a stage of the current trace
+
+    A no-op when no trace is active, so prefabs can be used standalone.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP
+    return _SpanContext(trace, name, attrs, root=False)
+
+
+def recent_traces(limit: int = 50) -> List[Dict[str, Any]]:
+    """Summaries of the most recent traces, newest first"""
+    with _recent_lock:
+        traces = list(_recent)[-limit:]
+    return [trace.summary() for trace in reversed(traces)]
+
+
+def export_chrome_trace(limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Recent traces in Chrome trace-event format
+
+    Load the result in chrome://tracing or https://ui.perfetto.dev.
+    """
+    with _recent_lock:
+        traces = list(_recent)
+    if limit:
+        traces = traces[-limit:]
+
+    pid = os.getpid()
+    events = []
+    for trace in traces:
+        for item in list(trace.spans):
+            if item.end_ns is None:
+                continue
+            events.append(
+                {
+                    "name": item.name,
+                    "cat": trace.name,
+                    "ph": "X",
+                    "ts": item.start_ns / 1000,
+                    "dur": (item.end_ns - item.start_ns) / 1000,
+                    "pid": pid,
+                    "tid": item.thread_id,
+                    "args": {"trace_id": trace.trace_id, **item.attrs},
+                }
+            )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def clear_traces():
+    with _recent_lock:
+        _recent.clear()
@@ -0,0 +1,188 @@
+"""
+Vector Compression
+Dimensionality reduction (PCA or truncation) and float16 precision
+"""
+
+import hashlib
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+MODES = ("none", "truncate", "pca")
+DTYPES = ("float32", "float16")
+
+# Vectors used to fit PCA; more adds fitting time, not accuracy
+PCA_SAMPLE_SIZE = 20000
+
+
+class VectorCompressor:
+    """
+    Map model embeddings to the vectors stored in the index
+
+    Modes:
+        none      keep the model's vectors
+        truncate  keep the first `dimensions` components (Matryoshka-style;
+                  lossless only for models trained for it)
+        pca       project onto the top `dimensions` principal components
+                  fitted on the local corpus
+
+    With dtype float16, vectors are rounded to half precision. Chroma keeps
+    float32 on disk, so there the saving comes from fewer dimensions; the
+    in-memory exact index stores float16 as is.
+
+    Reduced vectors are re-normalized so L2 distances keep the same
+    meaning as for the model's unit-length embeddings.
+    """
+
+    def __init__(
+        self,
+        mode: str = "none",
+        dimensions: Optional[int] = None,
+        dtype: str = "float32",
+        mean: "np.ndarray" = None,
+        components: "np.ndarray" = None,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown compression mode: {mode}")
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        if mode != "none" and not dimensions:
+            raise ValueError(f"Compression mode {mode} needs dimensions")
+        if mode == "pca" and components is None:
+            raise ValueError("PCA compression needs fitted components")
+
+        self.mode = mode
+        self.dimensions = int(dimensions) if mode != "none" else None
+        self.dtype = dtype
+        self.mean = mean
+        self.components = components
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "none" or self.dtype != "float32"
+
+    @property
+    def signature(self) -> str:
+        """Identifies the stored vector space (kept in collection metadata)"""
+        signature = f"{self.mode}:{self.dimensions or 'full'}:{self.dtype}"
+        if self.mode == "pca":
+            digest = hashlib.sha256(self.components.tobytes()).hexdigest()[:12]
+            signature += f":{digest}"
+        return signature
+
+    def transform(self, vectors: Any) -> "np.ndarray":
+        """
+        Compress embeddings
+
+        Args:
+            vectors: (n, d) array or a single (d,) vector
+
+        Returns:
+            float32 array with the compressed vectors (same rank as input)
+        """
+        import numpy as np
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not self.enabled:
+            return vectors
+
+        single = vectors.ndim == 1
+        matrix = vectors[None, :] if single else vectors
+
+        if self.mode == "truncate":
+            matrix = matrix[:, : self.dimensions]
+        elif self.mode == "pca":
+            matrix = (matrix - self.mean) @ self.components.T
+        if self.mode != "none":
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = matrix / np.clip(norms, 1e-12, None)
+        if self.dtype == "float16":
+            matrix = matrix.astype(np.float16)
+
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        return matrix[0] if single else matrix
+
+    def bytes_per_vector(self, model_dimensions: int) -> int:
+        dimensions = self.dimensions or model_dimensions
+        return dimensions * (2 if self.dtype == "float16" else 4)
+
+    @classmethod
+    def fit(
+        cls, mode: str, dimensions: Optional[int], dtype: str, sample: "np.ndarray"
+    ) -> "VectorCompressor":
+        """
+        Build a compressor, fitting PCA on sample embeddings when needed
+
+        Args:
+            mode: none, truncate or pca
+            dimensions: Target dimensions (ignored for none)
+            dtype: float32 or float16
+            sample: (n, d) embeddings from the local corpus (pca only)
+        """
+        import numpy as np
+
+        if mode != "pca":
+            return cls(mode, dimensions, dtype)
+
+        sample = np.asarray(sample, dtype=np.float32)
+        if len(sample) > PCA_SAMPLE_SIZE:
+            rng = np.random.default_rng(0)
+            sample = sample[rng.choice(len(sample), PCA_SAMPLE_SIZE, replace=False)]
+        dimensions = int(dimensions)
+        if dimensions > sample.shape[1]:
+            raise ValueError(
+                f"PCA dimensions ({dimensions}) exceed the model's "
+                f"({sample.shape[1]})"
+            )
+        if len(sample) < dimensions:
+            raise ValueError(
+                f"PCA to {dimensions} dimensions needs at least {dimensions} "
+                f"vectors, the corpus has {len(sample)}"
+            )
+
+        mean = sample.mean(axis=0)
+        # Rows of vt are principal axes, ordered by explained variance
+        _, _, vt = np.linalg.svd(sample - mean, full_matrices=False)
+        return cls(mode, dimensions, dtype, mean=mean, components=vt[:dimensions])
+
+    def save(self, path: Path):
+        import numpy as np
+
+        np.savez(
+            path,
+            mode=self.mode,
+            dimensions=self.dimensions or 0,
+            dtype=self.dtype,
+            mean=self.mean if self.mean is not None else np.zeros(0),
+            components=(
+                self.components if self.components is not None else np.zeros((0, 0))
+            ),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "VectorCompressor":
+        import numpy as np
+
+        with np.load(path) as data:
+            mode = str(data["mode"])
+            return cls(
+                mode,
+                int(data["dimensions"]) or None,
+                str(data["dtype"]),
+                mean=data["mean"] if mode == "pca" else None,
+                components=data["components"] if mode == "pca" else None,
+            )
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "dimensions": self.dimensions,
+            "dtype": self.dtype,
+            "signature": self.signature,
+        }
@@ -0,0 +1,314 @@
+"""
+Document Registry
+One SQLite row per stored document, so listings and stats skip chunk scans
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+REGISTRY_FILE = "rag_index.sqlite3"
+
+_HASH_BLOCK = 1024 * 1024
+
+
+def file_fingerprint(file_path: str) -> Tuple[Optional[int], Optional[str]]:
+    """(size in bytes, sha256 hex) of a file, (None, None) when unreadable"""
+    try:
+        digest = hashlib.sha256()
+        size = 0
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+                digest.update(block)
+                size += len(block)
+        return size, digest.hexdigest()
+    except OSError:
+        return None, None
+
+
+class DocumentRegistry:
+    """
+    Documents in the vector store
+
+    Holds doc_id, name, path, added_at, chunk_count, byte size and content
+    hash per document. VectorStore updates it after every collection write
+    or delete, each update in one transaction. Chroma cannot join that
+    transaction, so on open the registry compares its chunk total with the
+    collection and rebuilds itself from chunk metadata when they differ.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                path TEXT NOT NULL,
+                added_at TEXT NOT NULL,
+                chunk_count INTEGER NOT NULL,
+                size_bytes INTEGER,
+                content_hash TEXT
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_documents_name ON documents(name)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_documents_path ON documents(path)"
+        )
+        self._conn.commit()
+
+    # ============================================
+    # WRITES
+    # ============================================
+
+    def add_chunks(
+        self,
+        documents: Iterable[Tuple[str, str, str, int]],
+        added_at: str,
+        fingerprints: Optional[Dict[str, Tuple[Optional[int], str]]] = None,
+    ):
+        """
+        Record chunks written to the collection
+
+        New documents are inserted with their file's size and hash; known
+        ones (streamed in several batches) get their chunk count raised.
+
+        Args:
+            documents: (doc_id, name, path, chunks added) per document
+            added_at: Timestamp for new documents
+            fingerprints: (size, content hash) by doc_id, already computed
+                by the caller; files of other new documents are hashed here
+        """
+        documents = list(documents)
+        fingerprints = dict(fingerprints or {})
+        with self._lock:
+            known = self._known([doc_id for doc_id, _, _, _ in documents])
+
+        # Hashed outside the lock so listings are not held up by large files
+        for doc_id, _, path, _ in documents:
+            if doc_id not in known and doc_id not in fingerprints:
+                fingerprints[doc_id] = file_fingerprint(path)
+
+        with self._lock, self._conn:
+            known = self._known([doc_id for doc_id, _, _, _ in documents])
+            self._conn.executemany(
+                "UPDATE documents SET chunk_count = chunk_count + ? "
+                "WHERE doc_id = ?",
+                [
+                    (count, doc_id)
+                    for doc_id, _, _, count in documents
+                    if doc_id in known
+                ],
+            )
+            self._conn.executemany(
+                "INSERT INTO documents VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (doc_id, name, path, added_at, count, *fingerprints[doc_id])
+                    for doc_id, name, path, count in documents
+                    if doc_id not in known
+                ],
+            )
+
+    def _known(self, doc_ids: List[str]) -> set:
+        unique = list(dict.fromkeys(doc_ids))
+        rows = self._conn.execute(
+            "SELECT doc_id FROM documents WHERE doc_id IN "
+            f"({','.join('?' * len(unique))})",
+            unique,
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def update_file(
+        self, doc_id: str, size: Optional[int], content_hash: Optional[str]
+    ):
+        """Record a re-ingested version of a document's file"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE documents SET size_bytes = ?, content_hash = ? WHERE doc_id = ?",
+                (size, content_hash, doc_id),
+            )
+
+    def remove_chunks(self, doc_id: str, count: int):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE documents SET chunk_count = chunk_count - ? WHERE doc_id = ?",
+                (count, doc_id),
+            )
+
+    def remove(self, doc_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM documents")
+
+    def rebuild(self, collection, page_size: int = 5000):
+        """
+        Recreate every row from the collection's chunk metadata
+
+        Used once for stores created before the registry existed, and after
+        a crash left the registry out of step. File size and hash are read
+        from the original files where they still exist.
+        """
+        documents: Dict[str, Dict[str, Any]] = {}
+        total = collection.count()
+        for offset in range(0, total, page_size):
+            page = collection.get(limit=page_size, offset=offset, include=["metadatas"])
+            if not page["ids"]:
+                break
+            for metadata in page["metadatas"]:
+                if not metadata or "doc_id" not in metadata:
+                    continue
+                document = documents.get(metadata["doc_id"])
+                if document is None:
+                    document = documents[metadata["doc_id"]] = {
+                        "name": metadata.get("doc_name", "unknown"),
+                        "path": metadata.get("doc_path", ""),
+                        "added_at": metadata.get("added_at", ""),
+                        "chunk_count": 0,
+                    }
+                document["chunk_count"] += 1
+
+        rows = [
+            (
+                doc_id,
+                document["name"],
+                document["path"],
+                document["added_at"],
+                document["chunk_count"],
+                *file_fingerprint(document["path"]),
+            )
+            for doc_id, document in documents.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM documents")
+            self._conn.executemany(
+                "INSERT INTO documents VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        logger.info(f"✅ Document registry rebuilt ({len(rows)} documents)")
+
+    # ============================================
+    # READS
+    # ============================================
+
+    def totals(self) -> Tuple[int, int]:
+        """(documents, chunks)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(chunk_count), 0) FROM documents"
+            ).fetchone()
+
+    def names(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT name FROM documents ORDER BY name"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def chunk_count(self, names: List[str]) -> int:
+        """Chunks of every document with one of these names"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COALESCE(SUM(chunk_count), 0) FROM documents WHERE name IN "
+                f"({','.join('?' * len(names))})",
+                names,
+            ).fetchone()[0]
+
+    def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def find(self, path: str) -> List[Dict[str, Any]]:
+        """Documents stored from this path, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM documents WHERE path = ? ORDER BY added_at", (path,)
+            ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def under(self, path: str) -> List[Tuple[str, str]]:
+        """(doc_id, path) of documents stored from this file or directory"""
+        prefix = os.path.join(path, "")
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        with self._lock:
+            return self._conn.execute(
+                "SELECT doc_id, path FROM documents "
+                "WHERE path = ? OR path LIKE ? ESCAPE '\\'",
+                (path, escaped + "%"),
+            ).fetchall()
+
+    def doc_ids_by_name(self, name: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT doc_id FROM documents WHERE name = ?", (name,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        """
+        One entry per document name, sorted by name
+
+        Documents uploaded more than once under the same name are merged:
+        chunk counts are summed, the other fields come from the earliest.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT doc_id, name, path, MIN(added_at), SUM(chunk_count),
+                       size_bytes, content_hash
+                FROM documents GROUP BY name ORDER BY name
+                """
+            ).fetchall()
+        return [
+            {
+                "doc_id": doc_id,
+                "doc_name": name,
+                "added_at": added_at,
+                "chunks_count": chunks,
+                "doc_path": path,
+                "size_bytes": size,
+                "content_hash": content_hash,
+            }
+            for doc_id, name, path, added_at, chunks, size, content_hash in rows
+        ]
+
+    @staticmethod
+    def _row_to_dict(row: tuple) -> Dict[str, Any]:
+        doc_id, name, path, added_at, chunk_count, size, content_hash = row
+        return {
+            "doc_id": doc_id,
+            "doc_name": name,
+            "doc_path": path,
+            "added_at": added_at,
+            "chunks_count": chunk_count,
+            "size_bytes": size,
+            "content_hash": content_hash,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
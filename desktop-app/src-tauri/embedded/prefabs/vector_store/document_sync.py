@@ -0,0 +1,119 @@
+"""
+Document Sync
+Matches a file being (re-)ingested against the chunks already stored for it
+"""
+
+import hashlib
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def chunk_hash(text: str, pages: Optional[Tuple[int, int]] = None) -> str:
+    """Content key of a chunk; the pages are part of it, so citations stay right"""
+    if pages:
+        text = f"{text}\0{pages[0]}-{pages[1]}"
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class DocumentSync:
+    """
+    One ingest of a file, planned against the store
+
+    Created by VectorStore.begin_document. When the store already holds the
+    file's path (same content, or an older version), doc_id is the stored
+    document's and only chunks whose text is new need embedding: claim()
+    matches a chunk to a stored one by content hash, and new_records()
+    numbers the unmatched ones after the highest stored chunk index. Stored
+    chunks nothing claimed are stale and removed by
+    VectorStore.finish_document.
+    """
+
+    def __init__(
+        self,
+        doc_id: str,
+        file_path: str,
+        size: Optional[int],
+        content_hash: Optional[str],
+        existing: bool = False,
+        unchanged: bool = False,
+        stored: Optional[List[Tuple[str, str, Optional[Tuple[int, int]]]]] = None,
+        duplicates: Optional[List[str]] = None,
+    ):
+        """
+        Args:
+            doc_id: Document to write to
+            file_path: Path of the file
+            size: File size in bytes
+            content_hash: sha256 of the file
+            existing: doc_id is already in the store
+            unchanged: The store holds this exact content; nothing to write
+            stored: (chunk ID, text, page range) of the document's stored
+                chunks
+            duplicates: Earlier re-uploads of this path, removed once the
+                ingest succeeds
+        """
+        self.doc_id = doc_id
+        self.file_path = file_path
+        self.size = size
+        self.content_hash = content_hash
+        self.existing = existing
+        self.unchanged = unchanged
+        self.duplicates = duplicates or []
+
+        self.known: Dict[str, List[str]] = defaultdict(list)
+        self.next_index = 0
+        for chunk_id, text, pages in stored or ():
+            self.known[chunk_hash(text, pages)].append(chunk_id)
+            self.next_index = max(self.next_index, chunk_index(chunk_id) + 1)
+
+        self.reused = 0
+        self.added: List[str] = []
+        self.removed = 0
+
+    def claim(self, text: str, pages: Optional[Tuple[int, int]] = None) -> bool:
+        """True when a stored chunk has this text (it is kept, not re-embedded)"""
+        stored = self.known.get(chunk_hash(text, pages))
+        if not stored:
+            return False
+        stored.pop()
+        self.reused += 1
+        return True
+
+    def new_records(self, chunks: List[str]) -> List[Tuple[str, str, int, str]]:
+        """
+        Number chunks that are not stored yet
+
+        Returns:
+            (doc_id, file_path, chunk_index, text) per chunk
+        """
+        start = self.next_index
+        self.next_index += len(chunks)
+        return [
+            (self.doc_id, self.file_path, index, text)
+            for index, text in enumerate(chunks, start)
+        ]
+
+    def written(self, records: List[Tuple[str, str, int, str]]):
+        """Note records stored, so a failed ingest can remove them again"""
+        self.added.extend(f"{doc_id}_chunk_{index}" for doc_id, _, index, _ in records)
+
+    def stale(self) -> List[str]:
+        """Stored chunk IDs no chunk of the file matched"""
+        return [chunk_id for ids in self.known.values() for chunk_id in ids]
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "chunks_count": self.reused + len(self.added),
+            "chunks_added": len(self.added),
+            "chunks_reused": self.reused,
+            "chunks_removed": self.removed,
+            "unchanged": self.unchanged,
+        }
+
+
+def chunk_index(chunk_id: str) -> int:
+    """Index part of a chunk ID, -1 when it has none"""
+    try:
+        return int(chunk_id.rsplit("_chunk_", 1)[1])
+    except (IndexError, ValueError):
+        return -1
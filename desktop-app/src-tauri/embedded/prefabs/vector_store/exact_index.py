@@ -0,0 +1,456 @@
+"""
+Exact Vector Index
+Brute-force top-k over a memory-mapped matrix, kept next to the Chroma collection
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+VECTORS_FILE = "vectors.bin"
+ROWS_FILE = "rows.bin"
+META_FILE = "meta.json"
+# Present while writes are not yet covered by meta.json
+DIRTY_FILE = "dirty"
+
+# Seconds between a write and the save that persists it; writes in between
+# share the save
+SAVE_DELAY = 2.0
+
+# Rows reserved on first write; capacity doubles from there
+MIN_CAPACITY = 1024
+
+# Rows scored per block when the matrix is float16 (upcast block by block)
+SCORE_BLOCK = 16384
+
+
+class ExactIndex:
+    """
+    Stored vectors as one contiguous matrix for exact search
+
+    Row i of vectors.bin holds the vector of chunk i; row i of rows.bin
+    its (document slot, chunk index) pair, from which the Chroma chunk ID
+    is rebuilt. Documents are kept in a small slot table, so filtering by
+    document name is a mask over one int32 column.
+
+    Search is one matrix-vector product and an argpartition. Scores are
+    squared L2 distances, the same values Chroma returns, so relevance is
+    comparable between both search paths.
+
+    Deleting a document moves rows from the end of the matrix into the
+    freed rows, so the live rows stay contiguous. Both files are memory
+    maps written in place, so a write costs its own rows, not the whole
+    index. meta.json (row count, document slots) is saved SAVE_DELAY
+    seconds after a write, sharing one save between the writes of a
+    streaming ingest; until then a dirty marker makes open() reject the
+    files, and the index is rebuilt from the collection.
+    """
+
+    def __init__(self, path: Path, signature: str, dtype: str = "float32"):
+        """
+        Args:
+            path: Directory for the index files
+            signature: Vector space the index was built for (see
+                VectorCompressor.signature)
+            dtype: Storage type of the matrix, float32 or float16
+        """
+        self.path = Path(path)
+        self.signature = signature
+        self.dtype = dtype
+        self.dimensions = 0
+        self.count = 0
+        self.capacity = 0
+
+        self._vectors = None
+        self._norms = None
+        self._rows = None
+        self._docs: List[Optional[Tuple[str, str]]] = []
+        self._slots: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+        # Pending save, see _changed()
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+
+    @classmethod
+    def open(cls, path: Path, signature: str, expected_count: int) -> "ExactIndex":
+        """
+        Load a persisted index
+
+        Raises:
+            ValueError: When the files are missing, incomplete, for another
+                vector space or out of step with the collection
+        """
+        import numpy as np
+
+        path = Path(path)
+        if (path / DIRTY_FILE).exists():
+            raise ValueError("exact index was not saved after its last write")
+        try:
+            with open(path / META_FILE, "r") as f:
+                meta = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"no usable exact index: {e}") from e
+
+        if meta.get("signature") != signature:
+            raise ValueError("exact index is for another vector space")
+        if meta["count"] != expected_count:
+            raise ValueError(
+                f"exact index has {meta['count']} chunks, "
+                f"the collection {expected_count}"
+            )
+
+        index = cls(path, signature, meta["dtype"])
+        index._docs = [tuple(doc) if doc else None for doc in meta["docs"]]
+        index._slots = {doc[0]: slot for slot, doc in enumerate(index._docs) if doc}
+        index.count = meta["count"]
+        if meta["dimensions"]:
+            index.dimensions = meta["dimensions"]
+            rows_size = (path / ROWS_FILE).stat().st_size if index.count else 0
+            if rows_size < index.count * 2 * np.dtype(np.int32).itemsize:
+                raise ValueError("exact index rows file is incomplete")
+            index._map(meta["capacity"])
+            index._norms = np.zeros(index.capacity, dtype=np.float32)
+            index._norms[: index.count] = index._row_norms(0, index.count)
+        return index
+
+    # ============================================
+    # STORAGE
+    # ============================================
+
+    def _map(self, capacity: int):
+        """(Re)map vectors.bin and rows.bin with room for capacity rows"""
+        import numpy as np
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        for name, file_name, dtype, shape in (
+            ("_vectors", VECTORS_FILE, self.dtype, (capacity, self.dimensions)),
+            ("_rows", ROWS_FILE, np.int32, (capacity, 2)),
+        ):
+            mapped = getattr(self, name)
+            if mapped is not None:
+                mapped.flush()
+                setattr(self, name, None)
+            file_path = self.path / file_name
+            size = shape[0] * shape[1] * np.dtype(dtype).itemsize
+            with open(file_path, "ab") as f:
+                if f.tell() < size:
+                    f.truncate(size)
+            setattr(
+                self, name, np.memmap(file_path, dtype=dtype, mode="r+", shape=shape)
+            )
+        self.capacity = capacity
+
+    def _reserve(self, rows: int):
+        import numpy as np
+
+        needed = self.count + rows
+        if needed <= self.capacity:
+            return
+        capacity = max(MIN_CAPACITY, self.capacity)
+        while capacity < needed:
+            capacity *= 2
+
+        self._map(capacity)
+        grown = np.zeros(capacity, dtype=np.float32)
+        if self._norms is not None:
+            grown[: self.count] = self._norms[: self.count]
+        self._norms = grown
+
+    def _row_norms(self, start: int, end: int) -> "np.ndarray":
+        """Squared L2 norms of rows start:end"""
+        import numpy as np
+
+        norms = np.empty(end - start, dtype=np.float32)
+        for block in range(start, end, SCORE_BLOCK):
+            rows = np.asarray(
+                self._vectors[block : min(block + SCORE_BLOCK, end)], dtype=np.float32
+            )
+            norms[block - start : block - start + len(rows)] = np.einsum(
+                "ij,ij->i", rows, rows
+            )
+        return norms
+
+    def save(self):
+        """Flush the maps and write meta.json for the current row count"""
+        with self._lock:
+            self._cancel_save()
+            self.path.mkdir(parents=True, exist_ok=True)
+            for mapped in (self._vectors, self._rows):
+                if mapped is not None:
+                    mapped.flush()
+
+            meta = {
+                "signature": self.signature,
+                "dtype": self.dtype,
+                "dimensions": self.dimensions,
+                "count": self.count,
+                "capacity": self.capacity,
+                "docs": [list(doc) if doc else None for doc in self._docs],
+            }
+            meta_tmp = self.path / f"{META_FILE}.tmp"
+            with open(meta_tmp, "w") as f:
+                json.dump(meta, f)
+            os.replace(meta_tmp, self.path / META_FILE)
+
+            try:
+                (self.path / DIRTY_FILE).unlink()
+            except FileNotFoundError:
+                pass
+            self._dirty = False
+
+    def flush(self):
+        """Save now if writes are pending"""
+        with self._lock:
+            if self._dirty:
+                self.save()
+
+    def _changed(self):
+        """Mark the files dirty and schedule a save (called under the lock)"""
+        if not self._dirty:
+            self.path.mkdir(parents=True, exist_ok=True)
+            (self.path / DIRTY_FILE).touch()
+            self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(SAVE_DELAY, self._scheduled_save)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _scheduled_save(self):
+        with self._lock:
+            self._timer = None
+            if self._dirty and self._vectors is not None:
+                self.save()
+
+    def _cancel_save(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def destroy(self):
+        """Remove the index files"""
+        with self._lock:
+            self._cancel_save()
+            self._dirty = False
+            self._vectors = None
+            self._rows = None
+            for name in (META_FILE, ROWS_FILE, VECTORS_FILE, DIRTY_FILE):
+                try:
+                    (self.path / name).unlink()
+                except FileNotFoundError:
+                    pass
+
+    # ============================================
+    # WRITES
+    # ============================================
+
+    def add(
+        self,
+        chunks: Iterable[Tuple[str, str, int]],
+        vectors: Any,
+        save: bool = True,
+    ):
+        """
+        Append chunks
+
+        Args:
+            chunks: (doc_id, doc_name, chunk_index) per vector
+            vectors: (n, d) vectors as stored in the collection
+            save: Schedule a save (False while bootstrapping, which saves
+                once at the end)
+        """
+        import numpy as np
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(vectors):
+            return
+
+        with self._lock:
+            if not self.dimensions:
+                self.dimensions = vectors.shape[1]
+            elif vectors.shape[1] != self.dimensions:
+                raise ValueError(
+                    f"Vectors have {vectors.shape[1]} dimensions, "
+                    f"the exact index {self.dimensions}"
+                )
+            self._reserve(len(vectors))
+
+            start, end = self.count, self.count + len(vectors)
+            for row, (doc_id, doc_name, chunk_index) in enumerate(chunks, start):
+                slot = self._slots.get(doc_id)
+                if slot is None:
+                    slot = self._slots[doc_id] = len(self._docs)
+                    self._docs.append((doc_id, doc_name))
+                self._rows[row] = (slot, chunk_index)
+
+            self._vectors[start:end] = vectors
+            self.count = end
+            self._norms[start:end] = self._row_norms(start, end)
+            if save:
+                self._changed()
+
+    def remove_document(self, doc_id: str) -> int:
+        """
+        Remove every chunk of a document
+
+        Returns:
+            Number of rows removed
+        """
+        with self._lock:
+            slot = self._slots.pop(doc_id, None)
+            if slot is None:
+                return 0
+            self._docs[slot] = None
+
+            removed = self._remove_rows(self._rows[: self.count, 0] == slot)
+            if not self._slots:
+                self._docs = []
+            self._changed()
+            return removed
+
+    def remove_chunks(self, doc_id: str, chunk_indexes: Iterable[int]) -> int:
+        """
+        Remove some chunks of a document
+
+        Returns:
+            Number of rows removed
+        """
+        import numpy as np
+
+        with self._lock:
+            slot = self._slots.get(doc_id)
+            if slot is None:
+                return 0
+            rows = self._rows[: self.count]
+            removed = self._remove_rows(
+                (rows[:, 0] == slot) & np.isin(rows[:, 1], list(chunk_indexes))
+            )
+            self._changed()
+            return removed
+
+    def _remove_rows(self, mask: "np.ndarray") -> int:
+        """Drop the masked rows, moving rows from the end into the holes"""
+        import numpy as np
+
+        removed = np.flatnonzero(mask)
+        new_count = self.count - len(removed)
+        # Live rows past the new end fill the holes before it
+        holes = removed[removed < new_count]
+        tail = np.arange(new_count, self.count)
+        movers = tail[~mask[new_count : self.count]]
+        self._vectors[holes] = self._vectors[movers]
+        self._rows[holes] = self._rows[movers]
+        self._norms[holes] = self._norms[movers]
+        self.count = new_count
+        return len(removed)
+
+    def clear(self):
+        """Remove all chunks (keeps the allocated file)"""
+        with self._lock:
+            self.count = 0
+            self._docs = []
+            self._slots = {}
+            self.save()
+
+    # ============================================
+    # SEARCH
+    # ============================================
+
+    def search(
+        self,
+        query: Any,
+        top_k: int,
+        document_filter: Optional[List[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Exact nearest chunks
+
+        Args:
+            query: Query vector in the stored vector space
+            top_k: Number of results
+            document_filter: Only search these document names
+
+        Returns:
+            (chunk ID, squared L2 distance) pairs, nearest first
+        """
+        import numpy as np
+
+        query = np.asarray(query, dtype=np.float32)
+
+        with self._lock:
+            if not self.count or top_k <= 0:
+                return []
+
+            rows = None
+            if document_filter:
+                names = set(document_filter)
+                slots = [
+                    slot
+                    for slot, doc in enumerate(self._docs)
+                    if doc and doc[1] in names
+                ]
+                rows = np.flatnonzero(np.isin(self._rows[: self.count, 0], slots))
+                if not len(rows):
+                    return []
+
+            similarity = self._dot(query, rows)
+            norms = self._norms[: self.count] if rows is None else self._norms[rows]
+            distances = norms - 2 * similarity + float(query @ query)
+
+            k = min(top_k, len(distances))
+            if k < len(distances):
+                nearest = np.argpartition(distances, k - 1)[:k]
+            else:
+                nearest = np.arange(len(distances))
+            nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+
+            matrix_rows = nearest if rows is None else rows[nearest]
+            return [
+                (
+                    f"{self._docs[slot][0]}_chunk_{chunk_index}",
+                    float(distances[position]),
+                )
+                for position, (slot, chunk_index) in zip(
+                    nearest, self._rows[matrix_rows].tolist()
+                )
+            ]
+
+    def _dot(self, query: "np.ndarray", rows: Optional["np.ndarray"]) -> "np.ndarray":
+        """Dot products of the query with all (or the given) rows"""
+        import numpy as np
+
+        if rows is not None:
+            return np.asarray(self._vectors[rows], dtype=np.float32) @ query
+        if self.dtype == "float32":
+            return self._vectors[: self.count] @ query
+
+        scores = np.empty(self.count, dtype=np.float32)
+        for start in range(0, self.count, SCORE_BLOCK):
+            end = min(start + SCORE_BLOCK, self.count)
+            scores[start:end] = self._vectors[start:end].astype(np.float32) @ query
+        return scores
+
+    def describe(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "chunks": self.count,
+                "documents": len(self._slots),
+                "dimensions": self.dimensions,
+                "dtype": self.dtype,
+                "matrix_mb": round(
+                    self.capacity
+                    * self.dimensions
+                    * (2 if self.dtype == "float16" else 4)
+                    / 2**20,
+                    2,
+                ),
+            }
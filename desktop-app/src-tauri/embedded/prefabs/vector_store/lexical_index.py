@@ -0,0 +1,200 @@
+"""
+Lexical Index
+SQLite FTS5 (BM25) over chunk texts, for exact terms dense search misses
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Hyphens and underscores are part of a token, so identifiers such as
+# INV-2023-0042 or ERR_DISK_FULL match as one term
+TOKENIZER = "unicode61 tokenchars '-_'"
+_TERM = re.compile(r"[\w\-]+")
+
+# Longer questions are cut to their first terms
+MAX_QUERY_TERMS = 32
+
+# Stored in PRAGMA user_version; older full-text indexes are rebuilt on open
+FTS_VERSION = 1
+
+
+def match_expression(query: str) -> str:
+    """FTS5 query matching any term of a free-text question"""
+    terms = []
+    for term in _TERM.findall(query.lower()):
+        term = term.strip("-")
+        if term and term not in terms:
+            terms.append(term)
+    return " OR ".join(f'"{term}"' for term in terms[:MAX_QUERY_TERMS])
+
+
+class LexicalIndex:
+    """
+    Chunk texts with a BM25 full-text index
+
+    Chunks live in a plain `chunks` table (indexed by doc_id, so deleting a
+    document touches only its rows); an external-content FTS5 table over
+    it is kept in step by triggers. Both share the registry's database
+    file and are written in one transaction per call.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # INSERT OR REPLACE deletes the old row of a re-added chunk; without
+        # this the delete trigger does not fire and the old text stays in
+        # the full-text index
+        self._conn.execute("PRAGMA recursive_triggers=ON")
+        self._conn.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS chunks (
+                rowid INTEGER PRIMARY KEY,
+                chunk_id TEXT NOT NULL UNIQUE,
+                doc_id TEXT NOT NULL,
+                doc_name TEXT NOT NULL,
+                text TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_chunks_doc_id ON chunks(doc_id);
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+                text, content='chunks', content_rowid='rowid',
+                tokenize="{TOKENIZER}"
+            );
+            CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN
+                INSERT INTO chunks_fts(rowid, text) VALUES (new.rowid, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS chunks_ad AFTER DELETE ON chunks BEGIN
+                INSERT INTO chunks_fts(chunks_fts, rowid, text)
+                VALUES ('delete', old.rowid, old.text);
+            END;
+            """
+        )
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < FTS_VERSION:
+            # Indexes written before recursive_triggers was set hold the old
+            # text of re-added chunks; rebuild them from the chunks table once
+            self._conn.execute("INSERT INTO chunks_fts(chunks_fts) VALUES ('rebuild')")
+            self._conn.execute(f"PRAGMA user_version = {FTS_VERSION}")
+        self._conn.commit()
+
+    def add(self, chunks: Iterable[Tuple[str, str, str, str]]):
+        """
+        Index chunks
+
+        Args:
+            chunks: (chunk_id, doc_id, doc_name, text) per chunk
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (chunk_id, doc_id, doc_name, text) "
+                "VALUES (?, ?, ?, ?)",
+                chunks,
+            )
+
+    def remove_document(self, doc_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM chunks WHERE doc_id = ?", (doc_id,))
+
+    def remove_chunks(self, chunk_ids: List[str]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM chunks WHERE chunk_id = ?",
+                [(chunk_id,) for chunk_id in chunk_ids],
+            )
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.execute("INSERT INTO chunks_fts(chunks_fts) VALUES ('rebuild')")
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def rebuild(self, collection, page_size: int = 5000):
+        """Re-index every chunk of the collection"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.execute("INSERT INTO chunks_fts(chunks_fts) VALUES ('rebuild')")
+            total = collection.count()
+            for offset in range(0, total, page_size):
+                page = collection.get(
+                    limit=page_size, offset=offset, include=["documents", "metadatas"]
+                )
+                if not page["ids"]:
+                    break
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO chunks (chunk_id, doc_id, doc_name, text) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (
+                            chunk_id,
+                            (metadata or {}).get("doc_id", ""),
+                            (metadata or {}).get("doc_name", "unknown"),
+                            text or "",
+                        )
+                        for chunk_id, text, metadata in zip(
+                            page["ids"], page["documents"], page["metadatas"]
+                        )
+                    ],
+                )
+        logger.info(f"✅ Lexical index rebuilt ({total} chunks)")
+
+    def search(
+        self,
+        query: str,
+        top_k: int,
+        document_filter: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Best BM25 matches for the terms of a question
+
+        Args:
+            query: Free-text question
+            top_k: Number of results
+            document_filter: Only search these document names
+
+        Returns:
+            chunk_id, text, document and bm25 (lower is better) per match,
+            best first
+        """
+        expression = match_expression(query)
+        if not expression or top_k <= 0:
+            return []
+
+        sql = (
+            "SELECT c.chunk_id, c.text, c.doc_name, bm25(chunks_fts) AS score "
+            "FROM chunks_fts JOIN chunks c ON c.rowid = chunks_fts.rowid "
+            "WHERE chunks_fts MATCH ?"
+        )
+        params: List[Any] = [expression]
+        if document_filter:
+            sql += f" AND c.doc_name IN ({','.join('?' * len(document_filter))})"
+            params.extend(document_filter)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(top_k)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {"chunk_id": chunk_id, "text": text, "document": name, "bm25": score}
+            for chunk_id, text, name, score in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -4,7 +4,7 @@ module:
   
 actions:
   add_document:
-    description: Add document to vector database
+    description: Add or update a document; unchanged files are skipped
     params:
       - name: file_path
         type: string
@@ -15,10 +15,56 @@ actions:
       - name: embeddings
         type: array
         required: true
+      - name: pages
+        type: list
+        description: Page range per chunk (null for formats without pages)
     returns:
-      type: string
-      description: Document ID
+      type: object
+      description: Document ID and chunks added, reused and removed
   
+  plan_document:
+    description: Match a file against the store before it is embedded
+    params:
+      - name: file_path
+        type: string
+        required: true
+    returns:
+      type: object
+      description: Ingest plan (sync), doc_id and whether the file is unchanged
+
+  claim_chunks:
+    description: Drop the chunks of a planned file that are already stored
+    params:
+      - name: sync
+        type: object
+        required: true
+      - name: chunks
+        type: list[string]
+        required: true
+      - name: pages
+        type: list
+    returns:
+      type: object
+      description: Chunks (and page ranges) that still need embedding
+
+  store_chunks:
+    description: Store the claimed-over chunks of a planned file
+    params:
+      - name: sync
+        type: object
+        required: true
+      - name: chunks
+        type: list[string]
+        required: true
+      - name: embeddings
+        type: array
+        required: true
+      - name: pages
+        type: list
+    returns:
+      type: object
+      description: Document ID and chunks added, reused and removed
+
   search:
     description: Search for similar chunks
     params:
@@ -28,9 +74,13 @@ actions:
       - name: top_k
         type: integer
         default: 5
+      - name: hybrid
+        type: boolean
+        default: false
+        description: Fuse with BM25 over the query text (needs query)
     returns:
       type: object
-      description: Search results with documents and metadata
+      description: Search results with documents, metadata and page ranges
   
   delete_document:
     description: Delete document from database
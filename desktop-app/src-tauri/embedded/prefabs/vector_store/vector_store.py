@@ -3,28 +3,181 @@ Vector Store Prefab
 Manages ChromaDB vector database
 """
 
-from typing import List, Dict, Any
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from pathlib import Path
-import chromadb
 from datetime import datetime
+import threading
+import time
 import uuid
 
+from prefabs.base_module import BaseModule, ModuleExecutionError
+from prefabs.tracing import span
 
-class VectorStore:
+from .document_registry import REGISTRY_FILE, DocumentRegistry, file_fingerprint
+from .document_sync import DocumentSync, chunk_index
+from .lexical_index import LexicalIndex
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "documents"
+REBUILD_COLLECTION_NAME = "documents_rebuild"
+
+# Fitted projection for the active collection, see rebuild()
+COMPRESSION_FILE = "compression.npz"
+
+REBUILD_BATCH_SIZE = 512
+
+# Upper bound on text + vector bytes per collection.add call; Chroma's own
+# max batch size caps the number of records
+WRITE_BATCH_BYTES = 16 * 1024 * 1024
+
+# Exact in-memory search, see exact_index
+EXACT_INDEX_DIR = "exact_index"
+EXACT_SEARCH_MAX_CHUNKS = 200_000
+
+# Filtered searches over at most this many chunks score them exactly when
+# the store has outgrown the exact index; larger ones use Chroma's filtered
+# HNSW search
+FILTERED_EXACT_MAX_CHUNKS = 20_000
+
+# Hybrid search: candidates taken from each ranking, and the reciprocal-rank
+# fusion constant (60 as in Cormack et al.)
+HYBRID_MIN_CANDIDATES = 20
+RRF_K = 60
+
+
+def _page_metadata(pages: Optional[List], position: int) -> Dict[str, int]:
+    """Chunk metadata for the page range of a record, if it has one"""
+    page_range = pages[position] if pages else None
+    if not page_range:
+        return {}
+    return {"page_start": page_range[0], "page_end": page_range[1]}
+
+
+def _page_range(metadata: Optional[Dict[str, Any]]) -> Optional[Tuple[int, int]]:
+    """Page range stored with a chunk, None for chunks without pages"""
+    if not metadata or "page_start" not in metadata:
+        return None
+    return metadata["page_start"], metadata["page_end"]
+
+
+class VectorStore(BaseModule):
     """Local vector database using ChromaDB"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        embedding_generator=None,
+        exact_search: bool = True,
+        exact_max_chunks: int = EXACT_SEARCH_MAX_CHUNKS,
+    ):
+        """
+        Args:
+            embedding_generator: Embeds search queries; when omitted one is
+                created on first search and reused
+            exact_search: Answer unfiltered searches from the exact index;
+                searches filtered to documents use it either way
+            exact_max_chunks: Above this the exact index is dropped and
+                searches go to Chroma's HNSW index
+        """
+        super().__init__("vs")
+        self.embedding_generator = embedding_generator
+        self.exact_search = exact_search
+        self.exact_max_chunks = exact_max_chunks
+
         # Store in user's home directory
         self.db_path = Path.home() / ".giggliagents" / "rag_vectordb"
         self.db_path.mkdir(parents=True, exist_ok=True)
 
-        # Initialize ChromaDB
+        # Initialize ChromaDB (imported here: it is the slowest import in the runtime)
+        import chromadb
+
         self.client = chromadb.PersistentClient(path=str(self.db_path))
+        self._recover_rebuild()
         self.collection = self.client.get_or_create_collection(
-            name="documents", metadata={"description": "RAG document store"}
+            name=COLLECTION_NAME, metadata={"description": "RAG document store"}
         )
+        self.compressor = self._load_compressor()
+        self.max_batch_size = self._get_max_batch_size()
+        self.write_stats = {"vectors": 0, "calls": 0, "seconds": 0.0}
+
+        self.registry = DocumentRegistry(self.db_path / REGISTRY_FILE)
+        if self.registry.totals()[1] != self.collection.count():
+            # New registry for an existing store, or a write was interrupted
+            self.registry.rebuild(self.collection)
+
+        # BM25 over chunk texts, in the registry's database file
+        self.lexical = LexicalIndex(self.db_path / REGISTRY_FILE)
+        if self.lexical.count() != self.collection.count():
+            self.lexical.rebuild(self.collection)
 
-        print(f"✅ Vector store initialized at {self.db_path}")
+        # Loaded on first use, see exact_index
+        self._exact_index = None
+        self._exact_too_large = False
+        self._exact_lock = threading.RLock()
+
+        # Held by every collection write and for the whole of a rebuild, so
+        # a write can't land in the collection a rebuild is replacing
+        self._write_lock = threading.RLock()
+
+        logger.info(f"✅ Vector store initialized at {self.db_path}")
+
+    def execute(
+        self, action: str, params: Dict[str, Any], context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Workflow entry point (see vector_store.g)"""
+        if action == "add_document":
+            self.validate_params(params, ["file_path", "chunks", "embeddings"])
+            return self.ingest_document(
+                params["file_path"],
+                params["chunks"],
+                params["embeddings"],
+                params.get("pages"),
+            )
+        if action == "plan_document":
+            self.validate_params(params, ["file_path"])
+            sync = self.begin_document(params["file_path"])
+            return {"sync": sync, "doc_id": sync.doc_id, "unchanged": sync.unchanged}
+        if action == "claim_chunks":
+            self.validate_params(params, ["sync", "chunks"])
+            chunks, pages = params["chunks"], params.get("pages")
+            new = self.claim_chunks(params["sync"], chunks, pages)
+            return {
+                "chunks": [chunks[position] for position in new],
+                "pages": [pages[position] for position in new] if pages else None,
+            }
+        if action == "store_chunks":
+            self.validate_params(params, ["sync", "chunks", "embeddings"])
+            return self.store_new_chunks(
+                params["sync"],
+                params["chunks"],
+                params["embeddings"],
+                params.get("pages"),
+            )
+        if action == "search":
+            if "query" not in params and "query_embedding" not in params:
+                raise ModuleExecutionError("search needs query or query_embedding")
+            search = self.hybrid_search if params.get("hybrid") else self.search
+            results = search(
+                params.get("query", ""),
+                top_k=int(params.get("top_k", 5)),
+                document_filter=params.get("document_filter"),
+                query_embedding=params.get("query_embedding"),
+            )
+            return {"results": results}
+        if action == "delete_document":
+            self.validate_params(params, ["doc_id"])
+            self.delete_document(params["doc_id"])
+            return {"success": True}
+        if action == "get_all_documents":
+            return {"documents": self.get_document_summaries()}
+        if action == "get_stats":
+            return self.get_stats()
+        if action == "reset":
+            self.reset()
+            return {"success": True}
+
+        raise ModuleExecutionError(f"Unknown action for vs: {action}")
 
     def add_document(self, file_path: str, chunks: List[str], embeddings: Any) -> str:
         """
@@ -39,126 +192,1009 @@ class VectorStore:
             Document ID
         """
         doc_id = str(uuid.uuid4())
-        doc_name = Path(file_path).name
 
-        # Generate IDs for each chunk
-        chunk_ids = [f"{doc_id}_chunk_{i}" for i in range(len(chunks))]
+        start = time.perf_counter()
+        self._add_chunks(
+            doc_id, file_path, chunks, embeddings, 0, datetime.now().isoformat()
+        )
+        elapsed = time.perf_counter() - start
 
-        # Prepare metadata
-        metadatas = [
-            {
-                "doc_id": doc_id,
-                "doc_name": doc_name,
-                "doc_path": file_path,
-                "chunk_index": i,
-                "added_at": datetime.now().isoformat(),
-            }
-            for i in range(len(chunks))
-        ]
+        logger.info(
+            f"✅ Added document {Path(file_path).name} with {len(chunks)} chunks "
+            f"({len(chunks) / elapsed if elapsed else 0:.0f} vectors/s)"
+        )
 
-        # Add to collection
-        self.collection.add(
-            embeddings=embeddings.tolist(),
-            documents=chunks,
-            metadatas=metadatas,
-            ids=chunk_ids,
+        return doc_id
+
+    def ingest_document(
+        self,
+        file_path: str,
+        chunks: List[str],
+        embeddings: Any,
+        pages: Optional[List[Optional[Tuple[int, int]]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Store an extracted and embedded file the way streaming ingests do
+
+        The file is planned with begin_document, so an unchanged file writes
+        nothing and a changed one keeps its doc_id and only stores chunks
+        that are not stored yet.
+
+        Args:
+            file_path: Path to original document
+            chunks: Every chunk of the file
+            embeddings: Embedding per chunk
+            pages: Page range per chunk, if the format has pages
+
+        Returns:
+            doc_id plus chunk counts (see DocumentSync.describe)
+        """
+        sync = self.begin_document(file_path)
+        pages = pages or [None] * len(chunks)
+        new = self.claim_chunks(sync, chunks, pages)
+        return self.store_new_chunks(
+            sync,
+            [chunks[position] for position in new],
+            [embeddings[position] for position in new],
+            [pages[position] for position in new],
         )
 
-        print(f"✅ Added document {doc_name} with {len(chunks)} chunks")
+    def claim_chunks(
+        self,
+        sync: DocumentSync,
+        chunks: List[str],
+        pages: Optional[List[Optional[Tuple[int, int]]]] = None,
+    ) -> List[int]:
+        """
+        Match a planned file's chunks against its stored ones
 
-        return doc_id
+        Returns:
+            Positions of the chunks that are not stored yet and need
+            embedding (none when the file is unchanged)
+        """
+        if sync.unchanged:
+            return []
+        pages = pages or [None] * len(chunks)
+        return [
+            position
+            for position, chunk in enumerate(chunks)
+            if not sync.claim(chunk, pages[position])
+        ]
+
+    def store_new_chunks(
+        self,
+        sync: DocumentSync,
+        chunks: List[str],
+        embeddings: Any,
+        pages: Optional[List[Optional[Tuple[int, int]]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Write the chunks claim_chunks left over and finish the ingest
+
+        Returns:
+            doc_id plus chunk counts (see DocumentSync.describe)
+        """
+        if sync.unchanged:
+            self.finish_document(sync)
+            logger.info(f"⏭️ {sync.file_path} is unchanged, skipping")
+            return {"doc_id": sync.doc_id, **sync.describe()}
+
+        batches = []
+        if len(chunks):
+            batches.append((chunks, embeddings, pages or [None] * len(chunks)))
+        self.add_document_stream(sync.file_path, batches, sync)
+        return {"doc_id": sync.doc_id, **sync.describe()}
+
+    def add_document_stream(
+        self,
+        file_path: str,
+        batches: Iterable[Tuple[List[str], Any]],
+        sync: Optional[DocumentSync] = None,
+    ) -> Tuple[str, int]:
+        """
+        Add a document batch by batch as chunks are embedded
+
+        Each batch is searchable as soon as it is written. If the stream
+        fails part way, chunks already written are removed again.
+
+        Args:
+            file_path: Path to original document
+            batches: (chunks, embeddings) or (chunks, embeddings, page
+                ranges) tuples in document order
+            sync: Plan from begin_document; batches then hold only the
+                chunks it did not claim, and stale chunks are removed once
+                the stream is done
+
+        Returns:
+            (document ID, number of chunks stored)
+        """
+        sync = sync or DocumentSync(
+            str(uuid.uuid4()), file_path, *file_fingerprint(file_path)
+        )
+        added_at = datetime.now().isoformat()
+        count = 0
 
-    def get_all_documents(self) -> List[str]:
-        """Get list of all document names in the store"""
         try:
-            # Get all items from collection
-            results = self.collection.get(include=["metadatas"])
+            for chunks, embeddings, *pages in batches:
+                records = sync.new_records(chunks)
+                self.add_chunk_batch(
+                    records, embeddings, added_at, *pages, syncs={sync.doc_id: sync}
+                )
+                sync.written(records)
+                count += len(chunks)
+        except BaseException:
+            if count:
+                logger.warning(
+                    f"⚠️ Ingest of {file_path} failed, removing partial data"
+                )
+                self.abort_document(sync)
+            raise
 
-            if results and "metadatas" in results and results["metadatas"]:
-                # Extract unique document names
-                docs = set()
-                for metadata in results["metadatas"]:
-                    if metadata and "doc_name" in metadata:  # ← Changed here
-                        docs.add(metadata["doc_name"])
+        self.finish_document(sync)
+        if sync.existing:
+            logger.info(
+                f"✅ Updated document {Path(file_path).name}: {count} chunks added, "
+                f"{sync.removed} removed, {sync.reused} unchanged"
+            )
+        else:
+            logger.info(f"✅ Added document {Path(file_path).name} with {count} chunks")
 
-                doc_list = sorted(list(docs))
-                print(f"📚 Found {len(doc_list)} documents: {doc_list}")
-                return doc_list
+        return sync.doc_id, count
 
-            print("⚠️ No documents found in vector store")
-            return []
+    # ============================================
+    # INCREMENTAL RE-INGEST
+    # ============================================
 
-        except Exception as e:
-            print(f"❌ Error getting documents: {e}")
-            return []
+    def begin_document(self, file_path: str) -> DocumentSync:
+        """
+        Plan an ingest of a file against the documents already stored
+
+        Documents are matched by path only, so every file keeps its own
+        document even when another file has the same content (its vectors
+        then come from the embedding cache). If this path is stored with
+        the same content, there is nothing to write. If an older version is
+        stored, its doc_id is kept and its chunks are matched by content
+        hash, so only new chunks are embedded. Earlier re-uploads of the
+        same path are removed when the ingest finishes.
+        """
+        size, content_hash = file_fingerprint(file_path)
+        matches = self.registry.find(file_path)
+        same = [
+            m for m in matches if content_hash and m["content_hash"] == content_hash
+        ]
+        keep = (same or matches or [None])[0]
+        if keep is None:
+            return DocumentSync(str(uuid.uuid4()), file_path, size, content_hash)
+
+        duplicates = [m["doc_id"] for m in matches if m is not keep]
+        if same:
+            sync = DocumentSync(
+                keep["doc_id"],
+                file_path,
+                size,
+                content_hash,
+                existing=True,
+                unchanged=True,
+                duplicates=duplicates,
+            )
+            sync.reused = keep["chunks_count"]
+            return sync
+        return DocumentSync(
+            keep["doc_id"],
+            file_path,
+            size,
+            content_hash,
+            existing=True,
+            stored=self._stored_chunks(keep["doc_id"]),
+            duplicates=duplicates,
+        )
+
+    def _stored_chunks(
+        self, doc_id: str
+    ) -> List[Tuple[str, str, Optional[Tuple[int, int]]]]:
+        """(chunk ID, text, page range) of every chunk of a document"""
+        found = self.collection.get(
+            where={"doc_id": doc_id}, include=["documents", "metadatas"]
+        )
+        return [
+            (chunk_id, text or "", _page_range(metadata))
+            for chunk_id, text, metadata in zip(
+                found["ids"], found["documents"], found["metadatas"]
+            )
+        ]
+
+    def finish_document(self, sync: DocumentSync):
+        """Remove stale chunks and earlier re-uploads of a finished ingest"""
+        stale = sync.stale()
+        if stale:
+            self.remove_chunks(sync.doc_id, stale)
+            sync.removed = len(stale)
+        if sync.existing and not sync.unchanged:
+            self.registry.update_file(sync.doc_id, sync.size, sync.content_hash)
+        for doc_id in sync.duplicates:
+            self.delete_document(doc_id)
+
+    def abort_document(self, sync: DocumentSync):
+        """Undo the writes of a failed ingest"""
+        if not sync.existing:
+            self.delete_document(sync.doc_id)
+        elif sync.added:
+            self.remove_chunks(sync.doc_id, sync.added)
+        sync.added = []
+
+    def remove_chunks(self, doc_id: str, chunk_ids: List[str]):
+        """Delete some chunks of a document"""
+        if not chunk_ids:
+            return
+        with self._write_lock, self._exact_lock:
+            index = self.exact_index
+            self.collection.delete(ids=chunk_ids)
+            if index is not None:
+                index.remove_chunks(doc_id, [chunk_index(c) for c in chunk_ids])
+            self._exact_too_large = False
+        self.lexical.remove_chunks(chunk_ids)
+        self.registry.remove_chunks(doc_id, len(chunk_ids))
+
+    def _add_chunks(
+        self,
+        doc_id: str,
+        file_path: str,
+        chunks: List[str],
+        embeddings: Any,
+        start_index: int,
+        added_at: str,
+    ):
+        """Write chunks of one document, numbering them from start_index"""
+        records = [
+            (doc_id, file_path, start_index + offset, chunk)
+            for offset, chunk in enumerate(chunks)
+        ]
+        self.add_chunk_batch(records, embeddings, added_at)
+
+    def add_chunk_batch(
+        self,
+        records: List[Tuple[str, str, int, str]],
+        embeddings: Any,
+        added_at: Optional[str] = None,
+        pages: Optional[List[Optional[Tuple[int, int]]]] = None,
+        syncs: Optional[Dict[str, DocumentSync]] = None,
+    ):
+        """
+        Write chunks of one or more documents
+
+        Records go to the collection in slices bounded by Chroma's max batch
+        size and WRITE_BATCH_BYTES, so a very large document neither fails
+        the call nor materializes all its rows at once. Texts are indexed
+        for BM25 and vectors mirrored into the exact index after the last
+        slice. If any of these fails, the slices and texts already written
+        by this call are deleted again.
+
+        Args:
+            records: (doc_id, file_path, chunk_index, text) per chunk
+            embeddings: Embeddings for the records, in the same order
+            added_at: Timestamp stored with every chunk (defaults to now)
+            pages: Page range per record (None entries for chunks without
+                pages), stored for citations
+            syncs: Ingest plans by doc_id; new documents are registered with
+                the size and hash the plan already has
+        """
+        added_at = added_at or datetime.now().isoformat()
+
+        # Metadata shared by a document's chunks, built once per document
+        base_metadata: Dict[str, Dict[str, Any]] = {}
+        for doc_id, file_path, _, _ in records:
+            if doc_id not in base_metadata:
+                base_metadata[doc_id] = {
+                    "doc_id": doc_id,
+                    "doc_name": Path(file_path).name,
+                    "doc_path": file_path,
+                    "added_at": added_at,
+                }
+
+        start = time.perf_counter()
+        with self._write_lock, self._exact_lock:
+            # Compressed (or plain float32) array; Chroma takes numpy directly,
+            # which avoids building nested Python lists. Done under the write
+            # lock so a rebuild can't swap the compressor in between
+            embeddings = self.compressor.transform(embeddings)
+
+            # Loaded before the write so it matches the collection it syncs to
+            index = self.exact_index
+
+            written: List[str] = []
+            indexed = mirroring = False
+            with span("store", chunks=len(records)) as stage:
+                try:
+                    slices = self._write_slices(records, embeddings)
+                    for first, last in slices:
+                        chunk_ids = [
+                            f"{doc_id}_chunk_{chunk_index}"
+                            for doc_id, _, chunk_index, _ in records[first:last]
+                        ]
+                        self.collection.add(
+                            ids=chunk_ids,
+                            embeddings=embeddings[first:last],
+                            documents=[text for _, _, _, text in records[first:last]],
+                            metadatas=[
+                                {
+                                    **base_metadata[records[position][0]],
+                                    "chunk_index": records[position][2],
+                                    **_page_metadata(pages, position),
+                                }
+                                for position in range(first, last)
+                            ],
+                        )
+                        written.extend(chunk_ids)
+                    self.lexical.add(
+                        (
+                            f"{doc_id}_chunk_{chunk_index}",
+                            doc_id,
+                            base_metadata[doc_id]["doc_name"],
+                            text,
+                        )
+                        for doc_id, _, chunk_index, text in records
+                    )
+                    indexed = True
+                    if index is not None:
+                        mirroring = True
+                        self._exact_add(index, records, embeddings)
+                except BaseException:
+                    if written:
+                        logger.warning(
+                            f"⚠️ Write failed, removing {len(written)} chunks"
+                        )
+                        self.collection.delete(ids=written)
+                    if indexed:
+                        self.lexical.remove_chunks(written)
+                    if mirroring:
+                        # May hold part of the batch; rebuilt on next use
+                        self._drop_exact_index()
+                    raise
+                stage.set(batches=len(slices))
+
+            elapsed = time.perf_counter() - start
+            # Replaced, not updated in place, so get_stats reads one snapshot
+            stats = self.write_stats
+            self.write_stats = {
+                "vectors": stats["vectors"] + len(records),
+                "calls": stats["calls"] + len(slices),
+                "seconds": stats["seconds"] + elapsed,
+            }
+        logger.debug(
+            "💾 Wrote %d vectors in %d calls (%.0f vectors/s)",
+            len(records),
+            len(slices),
+            len(records) / elapsed if elapsed else 0.0,
+        )
+
+        counts: Dict[str, List] = {}
+        for doc_id, file_path, _, _ in records:
+            entry = counts.setdefault(
+                doc_id, [doc_id, Path(file_path).name, file_path, 0]
+            )
+            entry[3] += 1
+        syncs = syncs or {}
+        fingerprints = {
+            doc_id: (syncs[doc_id].size, syncs[doc_id].content_hash)
+            for doc_id in counts
+            if doc_id in syncs and syncs[doc_id].content_hash
+        }
+        self.registry.add_chunks(counts.values(), added_at, fingerprints)
+
+    def _write_slices(
+        self, records: List[Tuple[str, str, int, str]], embeddings: Any
+    ) -> List[Tuple[int, int]]:
+        """(start, end) record ranges, each one collection.add call"""
+        vector_bytes = embeddings.shape[1] * 4 if embeddings.ndim == 2 else 0
+        slices = []
+        first = 0
+        size = 0
+        for position, (_, file_path, _, text) in enumerate(records):
+            # Text (UTF-8 upper bound), vector and metadata strings
+            record_bytes = 4 * len(text) + vector_bytes + 2 * len(file_path) + 128
+            if position > first and (
+                position - first >= self.max_batch_size
+                or size + record_bytes > WRITE_BATCH_BYTES
+            ):
+                slices.append((first, position))
+                first = position
+                size = 0
+            size += record_bytes
+        if first < len(records):
+            slices.append((first, len(records)))
+        return slices
+
+    def _get_max_batch_size(self) -> int:
+        """Records per collection.add accepted by this Chroma backend"""
+        try:
+            return int(self.client.get_max_batch_size())
+        except Exception:
+            # Limit of Chroma's SQLite backend in older releases
+            return 5461
+
+    def get_all_documents(self) -> List[str]:
+        """Get list of all document names in the store"""
+        return self.registry.names()
+
+    def get_document_summaries(self) -> List[Dict[str, Any]]:
+        """
+        Per-document info from the registry
+
+        Returns:
+            One dict per document name with doc_id, doc_name, added_at,
+            chunks_count, doc_path, size_bytes and content_hash, sorted by
+            name
+        """
+        return self.registry.summaries()
 
     def search(
-        self, query: str, top_k: int = 5, document_filter: List[str] = None
+        self,
+        query: str,
+        top_k: int = 5,
+        document_filter: List[str] = None,
+        query_embedding: Any = None,
     ) -> List[Dict[str, Any]]:
         """Search with optional document filtering"""
-        from prefabs.embedding_generator.embedding_generator import EmbeddingGenerator
+        query_embedding = self._query_vector(query, query_embedding)
+        return self._dense_search(query_embedding, top_k, document_filter)
 
-        # EmbeddingGenerator loads settings itself - no parameters needed!
-        embedding_gen = EmbeddingGenerator()
-        query_embedding = embedding_gen.generate_embeddings([query])[0]
+    def _query_vector(self, query: str, query_embedding: Any = None) -> Any:
+        """Query embedding in the stored vector space"""
+        if query_embedding is None:
+            if self.embedding_generator is None:
+                from prefabs.embedding_generator.embedding_generator import (
+                    EmbeddingGenerator,
+                )
+
+                # EmbeddingGenerator loads settings itself - no parameters needed!
+                self.embedding_generator = EmbeddingGenerator()
+
+            with span("embed_query"):
+                query_embedding = self.embedding_generator.embed_query(query)
+
+        return self.compressor.transform(query_embedding)
+
+    def _dense_search(
+        self,
+        query_embedding: Any,
+        top_k: int,
+        document_filter: Optional[List[str]],
+    ) -> List[Dict[str, Any]]:
+        index = self.exact_index
+        if index is not None and (self.exact_search or document_filter):
+            return self._search_exact(index, query_embedding, top_k, document_filter)
 
         # Build where clause for filtering
         where_clause = None
         if document_filter:
+            if self.registry.chunk_count(document_filter) <= FILTERED_EXACT_MAX_CHUNKS:
+                return self._search_filtered(query_embedding, top_k, document_filter)
             where_clause = {"doc_name": {"$in": document_filter}}
 
         # Search
-        results = self.collection.query(
-            query_embeddings=[query_embedding.tolist()],
-            n_results=top_k,
-            where=where_clause,
-        )
+        with span("vector_query", filtered=bool(where_clause)):
+            results = self.collection.query(
+                query_embeddings=[query_embedding],
+                n_results=top_k,
+                where=where_clause,
+            )
 
         # Format results
         formatted_results = []
         if results["documents"] and results["documents"][0]:
             for i, doc in enumerate(results["documents"][0]):
+                metadata = results["metadatas"][0][i] if results["metadatas"] else None
                 formatted_results.append(
                     {
+                        "chunk_id": results["ids"][0][i],
                         "text": doc,
                         "relevance": -results["distances"][0][i],
-                        "document": results["metadatas"][0][i].get(
-                            "doc_name", "unknown"
-                        )
-                        if results["metadatas"]
-                        else "unknown",
+                        "document": (metadata or {}).get("doc_name", "unknown"),
+                        "pages": _page_range(metadata),
                     }
                 )
 
         return formatted_results
 
+    def _search_filtered(
+        self, query_embedding: Any, top_k: int, document_filter: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Exact top-k over the chunks of a few documents
+
+        Used when the store has outgrown the exact index. Chroma applies a
+        where filter to a global HNSW search, which misses results when the
+        documents hold a small share of the store; here only their vectors
+        are read, through Chroma's metadata index, and scored.
+        """
+        import numpy as np
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        where = {"doc_name": {"$in": document_filter}}
+        with span("vector_query", filtered=True, exact=True) as stage:
+            found_ids: List[str] = []
+            distances = []
+            offset = 0
+            while True:
+                page = self.collection.get(
+                    where=where,
+                    limit=self.max_batch_size,
+                    offset=offset,
+                    include=["embeddings"],
+                )
+                if not page["ids"]:
+                    break
+                offset += len(page["ids"])
+                difference = np.asarray(page["embeddings"], dtype=np.float32) - query
+                found_ids.extend(page["ids"])
+                distances.append(np.einsum("ij,ij->i", difference, difference))
+            stage.set(candidates=len(found_ids))
+            if not found_ids:
+                return []
+
+            distances = np.concatenate(distances)
+            k = min(top_k, len(distances))
+            nearest = np.argpartition(distances, k - 1)[:k]
+            nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+            hits = [(found_ids[i], float(distances[i])) for i in nearest]
+            return self._hit_results(hits)
+
+    def hybrid_search(
+        self,
+        query: str,
+        top_k: int = 5,
+        document_filter: List[str] = None,
+        query_embedding: Any = None,
+        candidates: Optional[int] = None,
+        rrf_k: int = RRF_K,
+    ) -> List[Dict[str, Any]]:
+        """
+        Dense and BM25 search merged by reciprocal-rank fusion
+
+        Each ranking contributes 1 / (rrf_k + rank) to a chunk's score, so a
+        chunk found by only one of them (an invoice number the embedding
+        misses, a paraphrase BM25 misses) still ranks near the top.
+
+        Args:
+            query: Question text (also the BM25 query)
+            top_k: Number of results
+            document_filter: Only search these document names
+            query_embedding: Precomputed query embedding
+            candidates: Results taken from each ranking (default
+                max(4 * top_k, HYBRID_MIN_CANDIDATES))
+            rrf_k: Fusion constant; larger values flatten rank differences
+
+        Returns:
+            Search results as from search(), plus the fused score, best
+            first. relevance is always the dense (negative squared L2) score.
+        """
+        candidates = candidates or max(4 * top_k, HYBRID_MIN_CANDIDATES)
+        query_embedding = self._query_vector(query, query_embedding)
+        dense = self._dense_search(query_embedding, candidates, document_filter)
+        with span("lexical_query", filtered=bool(document_filter)):
+            lexical = self.lexical.search(query, candidates, document_filter)
+
+        fused: Dict[str, Dict[str, Any]] = {}
+        for ranking in (dense, lexical):
+            for rank, result in enumerate(ranking, 1):
+                entry = fused.setdefault(
+                    result["chunk_id"],
+                    {
+                        "chunk_id": result["chunk_id"],
+                        "text": result["text"],
+                        "relevance": result.get("relevance"),
+                        "document": result["document"],
+                        "pages": result.get("pages"),
+                        "score": 0.0,
+                    },
+                )
+                entry["score"] += 1.0 / (rrf_k + rank)
+
+        results = sorted(fused.values(), key=lambda r: r["score"], reverse=True)
+        results = results[:top_k]
+        self._fill_relevance(results, query_embedding)
+        return results
+
+    def _fill_relevance(self, results: List[Dict[str, Any]], query_embedding: Any):
+        """Dense relevance and pages for results found by BM25 alone"""
+        import numpy as np
+
+        missing = [r for r in results if r["relevance"] is None]
+        if not missing:
+            return
+        found = self.collection.get(
+            ids=[r["chunk_id"] for r in missing], include=["embeddings", "metadatas"]
+        )
+        vectors = dict(zip(found["ids"], found["embeddings"]))
+        metadatas = dict(zip(found["ids"], found["metadatas"]))
+        query = np.asarray(query_embedding, dtype=np.float32)
+        for result in missing:
+            vector = vectors.get(result["chunk_id"])
+            if vector is None:
+                # Deleted since the BM25 lookup
+                results.remove(result)
+                continue
+            difference = np.asarray(vector, dtype=np.float32) - query
+            result["relevance"] = -float(difference @ difference)
+            result["pages"] = _page_range(metadatas[result["chunk_id"]])
+
     def delete_document(self, doc_id: str):
         """Delete all chunks for a document"""
-        # Get all chunk IDs for this document
-        results = self.collection.get(where={"doc_id": doc_id})
+        with self._write_lock:
+            # Get all chunk IDs for this document
+            results = self.collection.get(where={"doc_id": doc_id}, include=[])
+
+            if results["ids"]:
+                with self._exact_lock:
+                    index = self.exact_index
+                    self.collection.delete(ids=results["ids"])
+                    if index is not None:
+                        index.remove_document(doc_id)
+                    # May have dropped below exact_max_chunks
+                    self._exact_too_large = False
+                logger.info(f"✅ Deleted document {doc_id}")
+        self.lexical.remove_document(doc_id)
+        self.registry.remove(doc_id)
 
-        if results["ids"]:
-            self.collection.delete(ids=results["ids"])
-            print(f"✅ Deleted document {doc_id}")
+    def delete_document_by_name(self, doc_name: str) -> int:
+        """
+        Delete every document with this file name
+
+        Returns:
+            Number of documents deleted
+        """
+        doc_ids = self.registry.doc_ids_by_name(doc_name)
+        for doc_id in doc_ids:
+            self.delete_document(doc_id)
+        return len(doc_ids)
+
+    def delete_documents_under(self, path: str) -> int:
+        """
+        Delete documents stored from this file, or from files under this
+        directory
+
+        Returns:
+            Number of documents deleted
+        """
+        documents = self.registry.under(path)
+        for doc_id, _ in documents:
+            self.delete_document(doc_id)
+        return len(documents)
 
     def get_stats(self) -> Dict:
         """Get statistics about vector store"""
-        all_data = self.collection.get()
-
-        unique_docs = set()
-        for metadata in all_data["metadatas"]:
-            unique_docs.add(metadata["doc_id"])
+        documents, chunks = self.registry.totals()
 
+        index = self._exact_index
         return {
-            "total_chunks": len(all_data["ids"]),
-            "total_documents": len(unique_docs),
+            "total_chunks": chunks,
+            "total_documents": documents,
             "storage_path": str(self.db_path),
+            "compression": self.compressor.describe(),
+            "writes": self._write_summary(),
+            "search": "exact" if index is not None and self.exact_search else "chroma",
+            "exact_index": index.describe() if index is not None else None,
         }
 
+    def _write_summary(self) -> Dict[str, Any]:
+        stats = dict(self.write_stats)
+        seconds = stats["seconds"]
+        stats["seconds"] = round(seconds, 3)
+        stats["vectors_per_second"] = (
+            round(stats["vectors"] / seconds, 1) if seconds else 0.0
+        )
+        stats["max_batch_size"] = self.max_batch_size
+        return stats
+
     def reset(self):
-        """Delete all data"""
-        self.client.delete_collection("documents")
-        self.collection = self.client.create_collection(
-            name="documents", metadata={"description": "RAG document store"}
+        """Delete all data (the vector compression setup is kept)"""
+        with self._write_lock, self._exact_lock:
+            self.client.delete_collection(COLLECTION_NAME)
+            self.collection = self.client.create_collection(
+                name=COLLECTION_NAME,
+                metadata=self._collection_metadata(self.compressor),
+            )
+            if self._exact_index is not None:
+                self._exact_index.clear()
+            self._exact_too_large = False
+        self.lexical.clear()
+        self.registry.clear()
+        logger.info("✅ Vector store reset")
+
+    # ============================================
+    # VECTOR COMPRESSION
+    # ============================================
+
+    def _collection_metadata(self, compressor) -> Dict[str, Any]:
+        metadata = {"description": "RAG document store"}
+        if compressor.enabled:
+            metadata["compression"] = compressor.signature
+        return metadata
+
+    def _load_compressor(self):
+        """Compressor matching the vectors stored in the collection"""
+        from .compression import VectorCompressor
+
+        signature = (self.collection.metadata or {}).get("compression")
+        if not signature:
+            return VectorCompressor()
+
+        path = self.db_path / COMPRESSION_FILE
+        if path.exists():
+            compressor = VectorCompressor.load(path)
+            if compressor.signature == signature:
+                return compressor
+        raise RuntimeError(
+            f"Vector store uses compression {signature} but {path} does not "
+            "match; run rebuild_vector_store"
+        )
+
+    def _recover_rebuild(self):
+        """Finish a rebuild that stopped between dropping and renaming"""
+        names = {getattr(item, "name", item) for item in self.client.list_collections()}
+        if REBUILD_COLLECTION_NAME not in names:
+            return
+        if COLLECTION_NAME in names:
+            # Rebuild never reached the swap; the original is intact
+            self.client.delete_collection(REBUILD_COLLECTION_NAME)
+        else:
+            logger.warning("⚠️ Completing interrupted vector store rebuild")
+            self.client.get_collection(REBUILD_COLLECTION_NAME).modify(
+                name=COLLECTION_NAME
+            )
+
+    def rebuild(
+        self,
+        mode: str = "none",
+        dimensions: Optional[int] = None,
+        dtype: str = "float32",
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Re-embed every chunk into a new vector space
+
+        Chunk texts are embedded again (mostly embedding-cache hits), a PCA
+        projection is fitted on a sample when mode is pca, and the vectors
+        are written to a new collection that replaces the current one.
+        Writes from other threads (folder watcher, job queue) wait until the
+        new collection has replaced the old one.
+
+        Args:
+            mode: none, truncate or pca (see VectorCompressor)
+            dimensions: Target dimensions for truncate/pca
+            dtype: float32 or float16
+            on_progress: Called with (chunks done, total chunks)
+
+        Returns:
+            New compression settings and sizes
+        """
+        import numpy as np
+
+        from .compression import PCA_SAMPLE_SIZE, VectorCompressor
+
+        if self.embedding_generator is None:
+            raise RuntimeError("rebuild needs an embedding generator")
+        embed = self.embedding_generator.generate_embeddings
+
+        # Writes wait until the new collection is in place; otherwise they
+        # would go to the old one after its chunks were copied and be lost
+        with self._write_lock:
+            total = self.collection.count()
+
+            # Fit on an evenly spaced sample of chunk texts
+            sample = None
+            if mode == "pca" and total:
+                step = max(1, total // PCA_SAMPLE_SIZE)
+                texts = []
+                for offset in range(0, total, REBUILD_BATCH_SIZE):
+                    page = self.collection.get(
+                        limit=REBUILD_BATCH_SIZE, offset=offset, include=["documents"]
+                    )
+                    texts.extend(page["documents"][::step])
+                sample = np.asarray(embed(texts[:PCA_SAMPLE_SIZE]), dtype=np.float32)
+            compressor = VectorCompressor.fit(mode, dimensions, dtype, sample)
+
+            if REBUILD_COLLECTION_NAME in {
+                getattr(item, "name", item) for item in self.client.list_collections()
+            }:
+                self.client.delete_collection(REBUILD_COLLECTION_NAME)
+            target = self.client.create_collection(
+                name=REBUILD_COLLECTION_NAME,
+                metadata=self._collection_metadata(compressor),
+            )
+
+            model_dimensions = 0
+            with span("rebuild", chunks=total, compression=compressor.signature):
+                for offset in range(0, total, REBUILD_BATCH_SIZE):
+                    page = self.collection.get(
+                        limit=REBUILD_BATCH_SIZE,
+                        offset=offset,
+                        include=["documents", "metadatas"],
+                    )
+                    if not page["ids"]:
+                        break
+                    vectors = np.asarray(embed(page["documents"]), dtype=np.float32)
+                    model_dimensions = vectors.shape[1]
+                    target.add(
+                        ids=page["ids"],
+                        embeddings=compressor.transform(vectors),
+                        documents=page["documents"],
+                        metadatas=page["metadatas"],
+                    )
+                    if on_progress:
+                        on_progress(min(offset + REBUILD_BATCH_SIZE, total), total)
+
+            # Projection first: a crash after the swap must find a matching file
+            compressor.save(self.db_path / COMPRESSION_FILE)
+            with self._exact_lock:
+                self.client.delete_collection(COLLECTION_NAME)
+                target.modify(name=COLLECTION_NAME)
+                self.collection = self.client.get_collection(COLLECTION_NAME)
+                self.compressor = compressor
+                # Built again for the new vector space on next use
+                self._drop_exact_index()
+
+        logger.info(f"✅ Rebuilt vector store ({total} chunks, {compressor.signature})")
+        return {
+            "chunks": total,
+            "compression": compressor.describe(),
+            "bytes_per_vector": (
+                compressor.bytes_per_vector(model_dimensions)
+                if model_dimensions
+                else None
+            ),
+        }
+
+    # ============================================
+    # EXACT SEARCH
+    # ============================================
+
+    @property
+    def exact_index(self):
+        """
+        Exact index of the store, None when it is too large
+
+        Kept whether or not exact_search is on, since filtered searches score
+        their documents' rows in it. Loaded from disk on first use and built
+        from the collection when the files are missing or out of step with it.
+        """
+        if self._exact_too_large:
+            return None
+        if self._exact_index is None:
+            with self._exact_lock:
+                if self._exact_index is None and not self._exact_too_large:
+                    self._exact_index = self._load_exact_index()
+        return self._exact_index
+
+    def configure_exact_search(self, exact_search: bool, exact_max_chunks: int):
+        """Apply exact search settings; a new size limit reloads the index"""
+        with self._exact_lock:
+            self.exact_search = exact_search
+            if exact_max_chunks != self.exact_max_chunks:
+                self.exact_max_chunks = exact_max_chunks
+                if self._exact_index is not None:
+                    # Reopened from its files on next use
+                    self._exact_index.flush()
+                self._exact_index = None
+                self._exact_too_large = False
+
+    def _load_exact_index(self):
+        from .exact_index import ExactIndex
+
+        count = self.collection.count()
+        if count > self.exact_max_chunks:
+            self._exact_too_large = True
+            return None
+
+        path = self.db_path / EXACT_INDEX_DIR
+        signature = self.compressor.signature
+        try:
+            return ExactIndex.open(path, signature, count)
+        except ValueError as e:
+            logger.info(f"Building exact index ({e})")
+
+        index = ExactIndex(path, signature, self.compressor.dtype)
+        index.destroy()
+        with span("exact_index_build", chunks=count):
+            for offset in range(0, count, REBUILD_BATCH_SIZE):
+                page = self.collection.get(
+                    limit=REBUILD_BATCH_SIZE,
+                    offset=offset,
+                    include=["embeddings", "metadatas"],
+                )
+                if not page["ids"]:
+                    break
+                chunks = [
+                    (
+                        metadata["doc_id"],
+                        metadata.get("doc_name", "unknown"),
+                        metadata.get("chunk_index", 0),
+                    )
+                    for metadata in page["metadatas"]
+                ]
+                if any(
+                    chunk_id != f"{doc_id}_chunk_{chunk_index}"
+                    for chunk_id, (doc_id, _, chunk_index) in zip(page["ids"], chunks)
+                ):
+                    logger.warning("⚠️ Unexpected chunk IDs, exact search disabled")
+                    index.destroy()
+                    self._exact_too_large = True
+                    return None
+                index.add(chunks, page["embeddings"], save=False)
+        index.save()
+
+        logger.info(f"✅ Exact index built ({index.count} chunks)")
+        return index
+
+    def _exact_add(self, index, records: List[Tuple[str, str, int, str]], embeddings):
+        """Mirror a collection write into the exact index"""
+        try:
+            index.add(
+                [
+                    (doc_id, Path(file_path).name, chunk_index)
+                    for doc_id, file_path, chunk_index, _ in records
+                ],
+                embeddings,
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Exact index out of sync, rebuilding on next use: {e}")
+            self._drop_exact_index()
+            return
+
+        if index.count > self.exact_max_chunks:
+            logger.info(
+                f"Store passed {self.exact_max_chunks} chunks, searching with Chroma"
+            )
+            self._drop_exact_index()
+            self._exact_too_large = True
+
+    def _drop_exact_index(self):
+        """Forget the exact index and remove its files"""
+        from .exact_index import ExactIndex
+
+        with self._exact_lock:
+            index = self._exact_index or ExactIndex(
+                self.db_path / EXACT_INDEX_DIR, self.compressor.signature
+            )
+            index.destroy()
+            self._exact_index = None
+            self._exact_too_large = False
+
+    def _search_exact(
+        self,
+        index,
+        query_embedding: Any,
+        top_k: int,
+        document_filter: Optional[List[str]],
+    ) -> List[Dict[str, Any]]:
+        """Top-k from the exact index, texts and names read from Chroma"""
+        with span("vector_query", filtered=bool(document_filter), exact=True):
+            hits = index.search(query_embedding, top_k, document_filter)
+            return self._hit_results(hits)
+
+    def _hit_results(self, hits: List[Tuple[str, float]]) -> List[Dict[str, Any]]:
+        """Search results for (chunk ID, distance) hits, texts read from Chroma"""
+        if not hits:
+            return []
+        found = self.collection.get(
+            ids=[chunk_id for chunk_id, _ in hits],
+            include=["documents", "metadatas"],
         )
-        print("✅ Vector store reset")
+
+        chunks = {
+            chunk_id: (text, metadata)
+            for chunk_id, text, metadata in zip(
+                found["ids"], found["documents"], found["metadatas"]
+            )
+        }
+        return [
+            {
+                "chunk_id": chunk_id,
+                "text": chunks[chunk_id][0],
+                "relevance": -distance,
+                "document": (chunks[chunk_id][1] or {}).get("doc_name", "unknown"),
+                "pages": _page_range(chunks[chunk_id][1]),
+            }
+            for chunk_id, distance in hits
+            if chunk_id in chunks
+        ]
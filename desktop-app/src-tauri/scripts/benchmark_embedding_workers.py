@@ -0,0 +1,121 @@
+"""
+Benchmark multi-process embedding against in-process encoding
+
+Embeds a fixed corpus (the repository's markdown files, chunked) in the
+current process and with the embedding worker pool at 1, 2, 4, ... workers.
+Reports texts/sec, speedup and scaling efficiency per worker count, and
+checks that every pool produces the same vectors as in-process encoding.
+Model load time is excluded: each pool is timed after it has started.
+
+Usage:
+    python scripts/benchmark_embedding_workers.py [--provider onnx] [--max-workers 8]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+EMBEDDED_DIR = Path(__file__).parent.parent / "embedded"
+REPO_ROOT = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(EMBEDDED_DIR))
+
+from agent_runtime.embedding_pool import EmbeddingWorkerPool  # noqa: E402
+from prefabs.document_processor.document_processor import (  # noqa: E402
+    DocumentProcessor,
+)
+from prefabs.embedding_generator.embedding_generator import (  # noqa: E402
+    EmbeddingGenerator,
+)
+
+MAX_DIFFERENCE = 1e-4
+
+
+def load_corpus(corpus_dir: Path, chunk_size: int, repeat: int) -> list:
+    """Chunks of every markdown/text file under corpus_dir, repeated"""
+    processor = DocumentProcessor(chunk_size=chunk_size, chunk_overlap=chunk_size // 10)
+    chunks = []
+    for path in sorted(corpus_dir.rglob("*")):
+        if path.suffix.lower() not in (".md", ".txt") or "node_modules" in path.parts:
+            continue
+        chunks.extend(processor.extract_text(str(path)))
+    # Numbered copies so the embedding cache could not serve repeats
+    return [f"{chunk} ({copy})" for copy in range(repeat) for chunk in chunks]
+
+
+def timed(encode, texts: list, runs: int) -> tuple:
+    """(embeddings, best texts/sec over runs)"""
+    best = float("inf")
+    embeddings = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        embeddings = encode(texts)
+        best = min(best, time.perf_counter() - start)
+    return embeddings, len(texts) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--corpus", type=Path, default=REPO_ROOT)
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--provider", default="local", choices=("local", "onnx"))
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--runs", type=int, default=2)
+    args = parser.parse_args()
+
+    settings = {"embedding_provider": args.provider, "embedding_cache_enabled": False}
+    texts = load_corpus(args.corpus, args.chunk_size, args.repeat)
+    if not texts:
+        raise SystemExit(f"❌ No text found under {args.corpus}")
+
+    counts = [1]
+    while counts[-1] * 2 <= args.max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != args.max_workers:
+        counts.append(args.max_workers)
+
+    print("🧪 Embedding worker pool")
+    print("=" * 60)
+    print(f"Corpus: {len(texts)} chunks, provider {args.provider}")
+    print(f"CPUs:   {os.cpu_count()} logical")
+    print()
+
+    generator = EmbeddingGenerator(settings=settings)
+    generator.batcher.encode(texts[:8])
+    reference, base_rate = timed(generator.batcher.encode, texts, args.runs)
+    print(f"{'in-process':<12}{base_rate:10.1f} texts/s")
+    print()
+    print(f"{'workers':<9}{'threads':>8}{'texts/s':>11}{'speedup':>9}{'eff.':>7}")
+
+    ok = True
+    for workers in counts:
+        pool = EmbeddingWorkerPool(settings, workers)
+        try:
+            pool.encode(texts[: pool.min_texts])
+            embeddings, rate = timed(pool.encode, texts, args.runs)
+        finally:
+            pool.shutdown()
+
+        difference = float(np.abs(embeddings - reference).max())
+        ok = ok and difference <= MAX_DIFFERENCE
+        speedup = rate / base_rate
+        print(
+            f"{workers:<9}{pool.threads:>8}{rate:>11.1f}{speedup:>8.2f}x"
+            f"{speedup / workers:>7.2f}"
+            + ("" if difference <= MAX_DIFFERENCE else f"  ❌ diff {difference:.2e}")
+        )
+
+    print("=" * 60)
+    if ok:
+        print(f"✅ Worker vectors match in-process encoding (<= {MAX_DIFFERENCE})")
+    else:
+        print("❌ Worker vectors differ from in-process encoding")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Benchmark dense, BM25 and hybrid retrieval on a synthetic corpus
+
+Builds a throwaway vector store (under a temporary home directory) from
+generated chunks. Each chunk holds a few sentences on one topic and one
+identifier (invoice number, error code or SKU); the identifiers look alike
+across chunks. Two query sets are run against it:
+
+    identifier  "Which entry mentions INV-2024-0193?"  -> the chunk holding it
+    topical     words of one chunk's sentences, shuffled -> that chunk
+
+and recall@k plus p50/p95 latency are reported for VectorStore.search
+(dense), the lexical index alone (BM25) and VectorStore.hybrid_search.
+Query embeddings are computed up front, so latency is retrieval only.
+
+--embeddings hash replaces the embedding model with hashed bags of words
+(letters only, so identifiers are invisible to it, much as they are mostly
+noise to small sentence-embedding models). It needs no model download.
+
+Usage:
+    python scripts/benchmark_hybrid_retrieval.py [--documents 200] [--k 5]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+EMBEDDED_DIR = Path(__file__).parent.parent / "embedded"
+sys.path.insert(0, str(EMBEDDED_DIR))
+
+TOPICS = {
+    "billing": "invoice payment balance customer overdue refund credit amount "
+    "account statement charge discount tax receipt",
+    "shipping": "parcel carrier delivery warehouse tracking courier pallet "
+    "freight dispatch route customs address package",
+    "hardware": "disk memory controller firmware sensor voltage fan cable "
+    "board temperature power adapter socket",
+    "software": "service deployment container request timeout cache queue "
+    "database migration release config thread log",
+    "inventory": "stock supplier shelf reorder batch quantity product catalog "
+    "count damaged return location barcode",
+}
+TEMPLATES = [
+    "The {0} was checked against the {1} before the {2} was updated.",
+    "Our team reviewed the {0} and found the {1} did not match the {2}.",
+    "A {0} issue delayed the {1}, so the {2} was flagged for review.",
+    "Please confirm the {0} and the {1} once the {2} is resolved.",
+]
+WORD = re.compile(r"[a-z]+")
+
+
+def identifier(rng: random.Random, kind: int) -> str:
+    if kind == 0:
+        return f"INV-{rng.randint(2019, 2025)}-{rng.randint(0, 9999):04d}"
+    if kind == 1:
+        words = rng.sample(
+            ["DISK", "FULL", "TIMEOUT", "AUTH", "QUOTA", "SYNC", "LOCK", "IO"], 2
+        )
+        return f"ERR_{words[0]}_{words[1]}_{rng.randint(100, 999)}"
+    letters = "".join(rng.sample("ABCDEFGHKMNPRSTUVWXZ", 3))
+    return f"SKU-{letters}-{rng.randint(0, 9999):04d}"
+
+
+def build_corpus(documents: int, chunks_per_document: int, seed: int):
+    """(records per document, identifier per chunk ID, sentences per chunk ID)"""
+    rng = random.Random(seed)
+    topics = {name: words.split() for name, words in TOPICS.items()}
+    used = set()
+    corpus = []
+    identifiers = {}
+    sentences = {}
+    for doc in range(documents):
+        topic = rng.choice(list(topics))
+        chunks = []
+        for chunk in range(chunks_per_document):
+            ident = identifier(rng, rng.randrange(3))
+            while ident in used:
+                ident = identifier(rng, rng.randrange(3))
+            used.add(ident)
+            lines = [
+                rng.choice(TEMPLATES).format(*rng.sample(topics[topic], 3))
+                for _ in range(3)
+            ]
+            chunks.append(f"{' '.join(lines)} Reference: {ident}.")
+            identifiers[(doc, chunk)] = ident
+            sentences[(doc, chunk)] = lines
+        corpus.append(chunks)
+    return corpus, identifiers, sentences
+
+
+class HashEmbeddings:
+    """Hashed bag of letter-only words, L2-normalized"""
+
+    dimensions = 384
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for word in WORD.findall(text.lower()):
+            vector[zlib.crc32(word.encode()) % self.dimensions] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def generate_embeddings(self, texts: list) -> np.ndarray:
+        return np.stack([self._embed(text) for text in texts])
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self._embed(text)
+
+
+def percentile(values: list, q: float) -> float:
+    return float(np.percentile(values, q)) * 1000 if values else 0.0
+
+
+def run(name: str, search, queries: list, k: int) -> dict:
+    hits = 0
+    latencies = []
+    for text, embedding, target in queries:
+        start = time.perf_counter()
+        results = search(text, embedding, k)
+        latencies.append(time.perf_counter() - start)
+        hits += target in [r["chunk_id"] for r in results[:k]]
+    return {
+        "name": name,
+        "recall": hits / len(queries),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--chunks-per-document", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--embeddings", default="model", choices=("model", "hash"))
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    home = tempfile.mkdtemp(prefix="hybrid_bench_")
+    os.environ["HOME"] = os.environ["USERPROFILE"] = home
+
+    from prefabs.vector_store.vector_store import VectorStore
+
+    if args.embeddings == "hash":
+        generator = HashEmbeddings()
+    else:
+        from prefabs.embedding_generator.embedding_generator import (
+            EmbeddingGenerator,
+        )
+
+        generator = EmbeddingGenerator()
+
+    corpus, identifiers, sentences = build_corpus(
+        args.documents, args.chunks_per_document, args.seed
+    )
+    total = sum(len(chunks) for chunks in corpus)
+
+    print("🧪 Hybrid retrieval")
+    print("=" * 60)
+    print(f"Corpus:     {args.documents} documents, {total} chunks")
+    print(f"Embeddings: {args.embeddings}")
+    print()
+
+    store = VectorStore(embedding_generator=generator)
+    doc_ids = []
+    start = time.perf_counter()
+    for number, chunks in enumerate(corpus):
+        embeddings = generator.generate_embeddings(chunks)
+        doc_ids.append(
+            store.add_document(f"/bench/doc_{number:04d}.txt", chunks, embeddings)
+        )
+    print(f"📥 Ingested in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(args.seed + 1)
+    keys = list(identifiers)
+    query_sets = {"identifier": [], "topical": []}
+    for doc, chunk in rng.sample(keys, min(args.queries, len(keys))):
+        target = f"{doc_ids[doc]}_chunk_{chunk}"
+        query_sets["identifier"].append(
+            (f"Which entry mentions {identifiers[(doc, chunk)]}?", target)
+        )
+        words = " ".join(sentences[(doc, chunk)]).rstrip(".").split()
+        rng.shuffle(words)
+        query_sets["topical"].append((" ".join(words[:12]), target))
+
+    methods = {
+        "vector": lambda text, embedding, k: store.search(
+            text, top_k=k, query_embedding=embedding
+        ),
+        "bm25": lambda text, embedding, k: store.lexical.search(text, k),
+        "hybrid": lambda text, embedding, k: store.hybrid_search(
+            text, top_k=k, query_embedding=embedding
+        ),
+    }
+
+    for set_name, pairs in query_sets.items():
+        queries = [
+            (text, generator.embed_query(text), target) for text, target in pairs
+        ]
+        print()
+        print(f"{set_name} queries ({len(queries)})")
+        print(f"{'method':<10}{f'recall@{args.k}':>11}{'p50 ms':>10}{'p95 ms':>10}")
+        for name, search in methods.items():
+            search(*queries[0][:2], args.k)
+            row = run(name, search, queries, args.k)
+            print(
+                f"{row['name']:<10}{row['recall']:>11.3f}"
+                f"{row['p50']:>10.2f}{row['p95']:>10.2f}"
+            )
+
+    # Deletes must leave no BM25 hits behind
+    store.delete_document(doc_ids[0])
+    stale = [
+        r
+        for chunk in range(args.chunks_per_document)
+        for r in store.lexical.search(identifiers[(0, chunk)], 5)
+        if r["chunk_id"].startswith(doc_ids[0])
+    ]
+    print()
+    print("=" * 60)
+    if stale:
+        print(f"❌ {len(stale)} BM25 hits for a deleted document")
+    else:
+        print("✅ Deleted document gone from the lexical index")
+    sys.exit(1 if stale else 0)
+
+
+if __name__ == "__main__":
+    main()
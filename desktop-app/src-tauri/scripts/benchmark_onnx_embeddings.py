@@ -0,0 +1,129 @@
+"""
+Benchmark the ONNX embedding backend against SentenceTransformer
+
+Embeds a fixed corpus (the repository's markdown files, chunked) with the
+PyTorch reference model and with the ONNX backend, then reports throughput,
+cosine similarity to the reference vectors and top-k retrieval agreement.
+Fails when the mean cosine similarity is at or below the threshold.
+
+Usage:
+    python scripts/benchmark_onnx_embeddings.py [--threads 0] [--fp32]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+EMBEDDED_DIR = Path(__file__).parent.parent / "embedded"
+REPO_ROOT = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(EMBEDDED_DIR))
+
+from prefabs.document_processor.document_processor import (  # noqa: E402
+    DocumentProcessor,
+)
+from prefabs.embedding_generator.embedding_generator import LOCAL_MODEL  # noqa: E402
+from prefabs.embedding_generator.onnx_backend import (  # noqa: E402
+    OnnxEmbeddingBackend,
+)
+
+COSINE_THRESHOLD = 0.99
+TOP_K = 10
+
+
+def load_corpus(corpus_dir: Path, chunk_size: int) -> list:
+    """Chunks of every markdown/text file under corpus_dir, in path order"""
+    processor = DocumentProcessor(chunk_size=chunk_size, chunk_overlap=chunk_size // 10)
+    chunks = []
+    for path in sorted(corpus_dir.rglob("*")):
+        if path.suffix.lower() not in (".md", ".txt") or "node_modules" in path.parts:
+            continue
+        chunks.extend(processor.extract_text(str(path)))
+    return chunks
+
+
+def timed_encode(model, texts: list, runs: int) -> tuple:
+    """(embeddings, best texts/sec over runs) after one warm-up call"""
+    model.encode(texts[:8], show_progress_bar=False)
+    best = float("inf")
+    embeddings = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        embeddings = np.asarray(model.encode(texts, show_progress_bar=False))
+        best = min(best, time.perf_counter() - start)
+    return embeddings, len(texts) / best
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def top_k(queries: np.ndarray, corpus: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ corpus.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--corpus", type=Path, default=REPO_ROOT)
+    parser.add_argument("--chunk-size", type=int, default=120)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--fp32", action="store_true", help="Skip quantization")
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    corpus = load_corpus(args.corpus, args.chunk_size)
+    if len(corpus) < TOP_K:
+        raise SystemExit(f"❌ Corpus too small: {len(corpus)} chunks")
+    # Queries: the opening words of every fifth chunk
+    queries = [" ".join(chunk.split()[:12]) for chunk in corpus[::5]]
+
+    print("🧪 ONNX vs PyTorch embeddings")
+    print("=" * 50)
+    print(f"Corpus: {len(corpus)} chunks, {len(queries)} queries")
+
+    reference = SentenceTransformer(LOCAL_MODEL)
+    onnx = OnnxEmbeddingBackend(
+        quantized=not args.fp32, threads=args.threads, batch_size=args.batch_size
+    )
+
+    ref_vectors, ref_rate = timed_encode(reference, corpus, args.runs)
+    onnx_vectors, onnx_rate = timed_encode(onnx, corpus, args.runs)
+
+    ref_vectors = normalize(ref_vectors)
+    onnx_vectors = normalize(onnx_vectors)
+    cosine = (ref_vectors * onnx_vectors).sum(axis=1)
+
+    ref_queries = normalize(reference.encode(queries, show_progress_bar=False))
+    onnx_queries = normalize(onnx.encode(queries))
+    ref_top = top_k(ref_queries, ref_vectors, TOP_K)
+    onnx_top = top_k(onnx_queries, onnx_vectors, TOP_K)
+    recall = np.mean([len(set(a) & set(b)) / TOP_K for a, b in zip(ref_top, onnx_top)])
+    top1 = np.mean(ref_top[:, 0] == onnx_top[:, 0])
+
+    print(f"Model file:        {onnx.model_file}")
+    print(f"PyTorch:           {ref_rate:8.1f} texts/s")
+    print(f"ONNX:              {onnx_rate:8.1f} texts/s ({onnx_rate / ref_rate:.2f}x)")
+    print(
+        f"Cosine vs ref:     mean {cosine.mean():.4f}, "
+        f"p1 {np.percentile(cosine, 1):.4f}, min {cosine.min():.4f}"
+    )
+    print(f"Recall@{TOP_K} vs ref:  {recall:.3f}")
+    print(f"Top-1 agreement:   {top1:.3f}")
+
+    print("=" * 50)
+    ok = cosine.mean() > COSINE_THRESHOLD
+    if ok:
+        print(f"✅ Mean cosine similarity above {COSINE_THRESHOLD}")
+    else:
+        print(f"❌ Mean cosine similarity not above {COSINE_THRESHOLD}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
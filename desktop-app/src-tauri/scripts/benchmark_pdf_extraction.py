@@ -0,0 +1,196 @@
+"""
+Benchmark streaming PDF extraction on generated documents
+
+Writes synthetic PDFs (about 200 words of text per page) of growing
+length to a temporary folder and streams each one through
+DocumentProcessor.iter_page_chunks, reporting per size:
+
+    time       wall time to extract and chunk the whole document
+    ms/page    should stay flat as the page count grows (linear time)
+    peak MB    tracemalloc peak while streaming. Pages are chunked as they
+               are read, so no document text accumulates; what grows is
+               PyPDF2's index of page objects, a few KB per page however
+               much text the pages hold
+
+Then the largest document is extracted once more with --workers worker
+processes (default: one per core, at most 4) and its chunks and page
+ranges are checked against the serial run. Worker processes only pay off
+with more than one core and pages that take real work to extract.
+
+Every page opens with a "Page N" marker, so the page range reported for
+a chunk can be checked against the text it holds.
+
+Usage:
+    python scripts/benchmark_pdf_extraction.py [--pages 1000] [--workers 4]
+"""
+
+import argparse
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+EMBEDDED_DIR = Path(__file__).parent.parent / "embedded"
+sys.path.insert(0, str(EMBEDDED_DIR))
+
+WORDS = (
+    "invoice contract delivery warehouse supplier payment schedule budget "
+    "report quarter revenue customer service account policy region audit "
+    "review project release module sensor battery network storage"
+).split()
+WORDS_PER_LINE = 10
+LINES_PER_PAGE = 20
+MARKER = re.compile(r"Page (\d+) begins")
+
+
+def page_lines(rng: random.Random, number: int) -> list:
+    lines = [f"Page {number} begins"]
+    for _ in range(LINES_PER_PAGE):
+        lines.append(" ".join(rng.choice(WORDS) for _ in range(WORDS_PER_LINE)))
+    return lines
+
+
+def write_pdf(path: Path, pages: int, seed: int = 3):
+    """Minimal PDF: a Helvetica text stream per page and a correct xref"""
+    rng = random.Random(seed)
+    first_page = 4
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for number in range(1, pages + 1):
+        text = "".join(f"({line}) Tj T* " for line in page_lines(rng, number)).encode(
+            "latin-1"
+        )
+        stream = b"BT /F1 10 Tf 12 TL 50 760 Td " + text + b"ET"
+        page_id = first_page + 2 * (number - 1)
+        kids.append(f"{page_id} 0 R")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> "
+            f"/Contents {page_id + 1} 0 R >>".encode()
+        )
+        objects.append(
+            f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream"
+        )
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(f.tell())
+            f.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+        xref = f.tell()
+        f.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+        for offset in offsets:
+            f.write(f"{offset:010d} 00000 n \n".encode())
+        f.write(
+            f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n".encode()
+        )
+
+
+def page_errors(chunks: list) -> int:
+    """Chunks whose page range does not cover the page markers they hold"""
+    errors = 0
+    for text, pages in chunks:
+        markers = [int(number) for number in MARKER.findall(text)]
+        if pages is None or any(not pages[0] <= m <= pages[1] for m in markers):
+            errors += 1
+    return errors
+
+
+def stream(processor, path: Path, trace: bool = False):
+    """(chunks, seconds, peak bytes) of one streaming pass"""
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    chunks = sum(1 for _ in processor.iter_page_chunks(str(path)))
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return chunks, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--steps", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=0)
+    args = parser.parse_args()
+
+    from agent_runtime.parallel import default_workers
+    from prefabs.document_processor.document_processor import DocumentProcessor
+
+    args.workers = args.workers or default_workers()
+
+    sizes = sorted({max(1, args.pages >> shift) for shift in range(args.steps)})
+    folder = Path(tempfile.mkdtemp(prefix="pdf_bench_"))
+
+    print("🧪 Streaming PDF extraction")
+    print("=" * 60)
+    print(f"Pages:   {', '.join(str(size) for size in sizes)}")
+    print(f"Words:   {LINES_PER_PAGE * WORDS_PER_LINE + 3} per page")
+    print(f"Workers: {args.workers} (parallel run)")
+    print()
+
+    paths = {}
+    for size in sizes:
+        paths[size] = folder / f"doc_{size}.pdf"
+        write_pdf(paths[size], size)
+
+    serial = DocumentProcessor()
+    print(
+        f"{'pages':>7}{'chunks':>8}{'time s':>9}{'ms/page':>9}{'file MB':>9}{'peak MB':>9}"
+    )
+    for size in sizes:
+        # Time and memory are measured on separate passes; tracing slows
+        # extraction down
+        chunks, elapsed, _ = stream(serial, paths[size])
+        _, _, peak = stream(serial, paths[size], trace=True)
+        print(
+            f"{size:>7}{chunks:>8}{elapsed:>9.2f}{elapsed / size * 1000:>9.2f}"
+            f"{paths[size].stat().st_size / 1e6:>9.1f}{peak / 1e6:>9.1f}"
+        )
+
+    largest = paths[sizes[-1]]
+    expected = list(serial.iter_page_chunks(str(largest)))
+    _, serial_time, _ = stream(serial, largest)
+
+    parallel = DocumentProcessor(pdf_workers=args.workers)
+    start = time.perf_counter()
+    found = list(parallel.iter_page_chunks(str(largest)))
+    parallel_time = time.perf_counter() - start
+
+    print()
+    print(f"{sizes[-1]} pages, serial:            {serial_time:.2f}s")
+    print(
+        f"{sizes[-1]} pages, {args.workers} workers:         {parallel_time:.2f}s "
+        f"({serial_time / parallel_time:.1f}x)"
+    )
+
+    errors = page_errors(expected)
+    mismatch = found != expected
+    print()
+    print("=" * 60)
+    if errors:
+        print(f"❌ {errors} chunks with a wrong page range")
+    else:
+        print(f"✅ Page ranges match the text of all {len(expected)} chunks")
+    if mismatch:
+        print("❌ Parallel extraction differs from serial")
+    else:
+        print("✅ Parallel extraction matches serial")
+    sys.exit(1 if errors or mismatch else 0)
+
+
+if __name__ == "__main__":
+    main()
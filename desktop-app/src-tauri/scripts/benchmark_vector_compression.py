@@ -0,0 +1,138 @@
+"""
+Benchmark recall against size for vector compression settings
+
+Compares every compression setting with exact float32 search over the
+model's own vectors. Reports recall@k, bytes per vector and the projected
+vector storage for a million-chunk library.
+
+Vectors come from embedding a corpus directory with the configured
+embedding provider, or from a synthetic set with an embedding-like
+spectrum when --synthetic is given (no model needed).
+
+Usage:
+    python scripts/benchmark_vector_compression.py --corpus ~/Documents
+    python scripts/benchmark_vector_compression.py --synthetic 20000
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+EMBEDDED_DIR = Path(__file__).parent.parent / "embedded"
+sys.path.insert(0, str(EMBEDDED_DIR))
+
+from prefabs.vector_store.compression import VectorCompressor  # noqa: E402
+
+TOP_K = 10
+LIBRARY_SIZE = 1_000_000
+
+
+def synthetic_vectors(count: int, dimensions: int = 384) -> np.ndarray:
+    """Unit vectors whose variance decays like real sentence embeddings"""
+    rng = np.random.default_rng(42)
+    scales = 1.0 / np.sqrt(np.arange(1, dimensions + 1))
+    vectors = rng.standard_normal((count, dimensions)).astype(np.float32) * scales
+    # Random rotation so variance is not aligned with the leading dimensions
+    rotation, _ = np.linalg.qr(rng.standard_normal((dimensions, dimensions)))
+    vectors = vectors @ rotation.astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def corpus_vectors(corpus: Path, limit: int) -> np.ndarray:
+    from prefabs.document_processor.document_processor import (
+        SUPPORTED_EXTENSIONS,
+        DocumentProcessor,
+    )
+    from prefabs.embedding_generator.embedding_generator import EmbeddingGenerator
+
+    processor = DocumentProcessor()
+    chunks = []
+    for path in sorted(corpus.rglob("*")):
+        if path.is_file() and path.suffix.lower() in SUPPORTED_EXTENSIONS:
+            try:
+                chunks.extend(processor.extract_text(str(path)))
+            except Exception as e:
+                print(f"⚠️ Skipping {path.name}: {e}")
+        if len(chunks) >= limit:
+            break
+    if not chunks:
+        raise SystemExit(f"❌ No chunks extracted from {corpus}")
+    return np.asarray(EmbeddingGenerator().generate_embeddings(chunks[:limit]))
+
+
+def exact_top_k(queries: np.ndarray, vectors: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ vectors.T
+    top = np.argpartition(-scores, k, axis=1)[:, :k]
+    return np.take_along_axis(
+        top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--corpus", type=Path)
+    source.add_argument("--synthetic", type=int)
+    parser.add_argument("--limit", type=int, default=20000, help="Max chunks")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dimensions", default="256,128,64")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        vectors = synthetic_vectors(args.synthetic)
+    else:
+        vectors = corpus_vectors(args.corpus.expanduser(), args.limit)
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    # Queries: perturbed corpus vectors, so each has near neighbours
+    rng = np.random.default_rng(7)
+    query_ids = rng.choice(len(vectors), min(args.queries, len(vectors)), False)
+    queries = vectors[query_ids] + rng.normal(0, 0.05, vectors[query_ids].shape)
+    queries = (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(
+        np.float32
+    )
+    truth = exact_top_k(queries, vectors, TOP_K)
+
+    model_dimensions = vectors.shape[1]
+    settings = [("none", None, "float32"), ("none", None, "float16")]
+    for dimensions in [int(d) for d in args.dimensions.split(",")]:
+        if dimensions < model_dimensions:
+            for mode in ("truncate", "pca"):
+                for dtype in ("float32", "float16"):
+                    settings.append((mode, dimensions, dtype))
+
+    print("📦 Vector compression: recall vs size")
+    print("=" * 72)
+    print(f"{len(vectors)} vectors x {model_dimensions} dims, {len(queries)} queries")
+    print()
+    print(
+        f"{'mode':<9}{'dims':>5}{'dtype':>9}{'bytes/vec':>11}"
+        f"{'1M chunks':>11}{f'recall@{TOP_K}':>11}{'top-1':>8}"
+    )
+
+    for mode, dimensions, dtype in settings:
+        try:
+            compressor = VectorCompressor.fit(mode, dimensions, dtype, vectors)
+        except ValueError as e:
+            print(
+                f"{mode:<9}{dimensions or model_dimensions:>5}{dtype:>9}  skipped: {e}"
+            )
+            continue
+        stored = compressor.transform(vectors)
+        found = exact_top_k(compressor.transform(queries), stored, TOP_K)
+        recall = np.mean([len(set(a) & set(b)) / TOP_K for a, b in zip(truth, found)])
+        top1 = np.mean(truth[:, 0] == found[:, 0])
+        size = compressor.bytes_per_vector(model_dimensions)
+        print(
+            f"{mode:<9}{dimensions or model_dimensions:>5}{dtype:>9}{size:>11}"
+            f"{size * LIBRARY_SIZE / 2**20:>9.0f}MB{recall:>11.3f}{top1:>8.3f}"
+        )
+
+    print("=" * 72)
+    print("Sizes count vector payload only; Chroma stores float32 on disk.")
+
+
+if __name__ == "__main__":
+    main()
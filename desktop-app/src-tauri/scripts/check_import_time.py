@@ -0,0 +1,102 @@
+"""
+Check the cold import cost of the embedded runtime
+
+Runs `python -X importtime -c "import agent_runtime.executor"` in a fresh
+interpreter and fails when the cumulative import time exceeds the budget
+or when a heavy dependency is imported eagerly.
+
+Usage:
+    python scripts/check_import_time.py [--budget-ms 250] [--runs 5]
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+EMBEDDED_DIR = Path(__file__).parent.parent / "embedded"
+
+# Cumulative import time of agent_runtime.executor (best of N runs)
+IMPORT_BUDGET_MS = 250
+
+# Must only be imported on first use, never by importing the executor
+HEAVY_MODULES = [
+    "chromadb",
+    "numpy",
+    "PyPDF2",
+    "docx",
+    "pptx",
+    "sentence_transformers",
+    "torch",
+    "openai",
+    "pandas",
+    "whisper",
+]
+
+
+def measure_import() -> tuple:
+    """Import the executor once; returns (cumulative_ms, imported module names)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import agent_runtime.executor"],
+        cwd=EMBEDDED_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        raise SystemExit("❌ Importing agent_runtime.executor failed")
+
+    cumulative_us = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        module = name.strip()
+        modules.add(module)
+        # The package import wraps the executor import, so take the largest
+        if module in ("agent_runtime", "agent_runtime.executor"):
+            cumulative_us = max(cumulative_us, int(cumulative))
+
+    return cumulative_us / 1000, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print("⏱️  Embedded runtime import time")
+    print("=" * 50)
+
+    timings = []
+    modules = set()
+    for _ in range(args.runs):
+        elapsed_ms, modules = measure_import()
+        timings.append(elapsed_ms)
+
+    best = min(timings)
+    print(f"Best of {args.runs}: {best:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"All runs: {', '.join(f'{t:.1f}' for t in timings)} ms")
+
+    ok = True
+    eager = sorted(m for m in modules if m in HEAVY_MODULES)
+    if eager:
+        print(f"❌ Heavy modules imported eagerly: {', '.join(eager)}")
+        ok = False
+
+    if best > args.budget_ms:
+        print("❌ Import time over budget")
+        ok = False
+
+    print("=" * 50)
+    if ok:
+        print("✅ Import time within budget")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
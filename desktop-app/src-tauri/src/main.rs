@@ -14,6 +14,14 @@ static INIT: Once = Once::new();
 
 fn init_python() {
     INIT.call_once(|| {
+        // Worker processes need a real Python interpreter, not this binary;
+        // pass the one pyo3 was built against (embedded/agent_runtime/parallel.py)
+        if std::env::var_os("GIGGLIAGENTS_PYTHON").is_none() {
+            if let Some(python) = option_env!("PYO3_PYTHON") {
+                std::env::set_var("GIGGLIAGENTS_PYTHON", python);
+            }
+        }
+
         pyo3::prepare_freethreaded_python();
         
         Python::with_gil(|py| {
@@ -40,45 +48,26 @@ fn init_python() {
 // ============================================
 
 fn execute_python_command(command: &str, params: Option<Value>) -> Result<String, String> {
-    println!("🔵 BACKEND CALLED: command={}", command);
-    
+    // Only failures are printed; the Python runtime logs commands itself
+    // (level-gated, see prefabs/tracing.py)
     Python::with_gil(|py| {
-        // DEBUG: Print Python path
-        let sys = py.import("sys").unwrap();
-        let path = sys.getattr("path").unwrap();
-        println!("🐍 Python sys.path: {:?}", path);
-        
-        // DEBUG: Try to import and print what happens
-        println!("🔍 Attempting to import: agent_runtime.executor");
-        
         let runtime = py.import("agent_runtime.executor")
             .map_err(|e| {
                 // Print the full Python traceback
-                println!("❌ FULL PYTHON ERROR:");
+                eprintln!("❌ Failed to import executor:");
                 e.print(py);
                 format!("Failed to import executor: {}", e)
             })?;
         
-        println!("✅ Imported executor successfully");
-        
-        let executor_class = runtime.getattr("Executor")
-            .map_err(|e| {
-                let err = format!("Failed to get Executor class: {}", e);
-                println!("❌ CLASS ERROR: {}", err);
-                err
-            })?;
-        
-        println!("✅ Got Executor class");
-        
-        let executor = executor_class.call0()
+        // Reuse the process-resident executor so warm modules survive between commands
+        let executor = runtime.getattr("get_executor")
+            .and_then(|get_executor| get_executor.call0())
             .map_err(|e| {
-                let err = format!("Failed to create executor: {}", e);
-                println!("❌ INSTANTIATION ERROR: {}", err);
+                let err = format!("Failed to get executor: {}", e);
+                eprintln!("❌ {}", err);
                 err
             })?;
         
-        println!("✅ Created executor instance");
-        
         let params_str = match params {
             Some(p) => p.to_string(),
             None => "{}".to_string()
@@ -86,13 +75,11 @@ fn execute_python_command(command: &str, params: Option<Value>) -> Result<String
         
         let result = executor.call_method1("execute", (command, params_str))
             .map_err(|e| {
-                let err = format!("Python execution error: {}", e);
-                println!("❌ EXECUTION ERROR: {}", err);
+                let err = format!("Python execution error in {}: {}", command, e);
+                eprintln!("❌ {}", err);
                 err
             })?;
         
-        println!("✅ Executed command successfully");
-        
         let json_module = py.import("json")
             .map_err(|e| format!("Failed to import json: {}", e))?;
         
@@ -101,13 +88,11 @@ fn execute_python_command(command: &str, params: Option<Value>) -> Result<String
             .and_then(|dumps| dumps.call1((result,)))
             .and_then(|s| s.extract())
             .map_err(|e| {
-                let err = format!("JSON conversion error: {}", e);
-                println!("❌ JSON ERROR: {}", err);
+                let err = format!("JSON conversion error in {}: {}", command, e);
+                eprintln!("❌ {}", err);
                 err
             })?;
         
-        println!("✅ Result: {}", json_str);
-        
         Ok(json_str)
     })
 }
@@ -140,6 +125,46 @@ async fn upload_document(file_path: String) -> Result<String, String> {
     execute_python_command("process_document", Some(params))
 }
 
+#[tauri::command]
+async fn upload_documents(file_paths: Vec<String>) -> Result<String, String> {
+    let params = serde_json::json!({
+        "file_paths": file_paths
+    });
+    execute_python_command("process_documents", Some(params))
+}
+
+#[tauri::command]
+async fn upload_directory(directory: String, recursive: Option<bool>) -> Result<String, String> {
+    let params = serde_json::json!({
+        "directory": directory,
+        "recursive": recursive.unwrap_or(true)
+    });
+    execute_python_command("process_directory", Some(params))
+}
+
+#[tauri::command]
+async fn watch_folder(directory: String, recursive: Option<bool>) -> Result<String, String> {
+    let params = serde_json::json!({
+        "directory": directory,
+        "recursive": recursive.unwrap_or(true)
+    });
+    execute_python_command("watch_folder", Some(params))
+}
+
+#[tauri::command]
+fn unwatch_folder(directory: String, remove_documents: Option<bool>) -> Result<String, String> {
+    let params = serde_json::json!({
+        "directory": directory,
+        "remove_documents": remove_documents.unwrap_or(false)
+    });
+    execute_python_command("unwatch_folder", Some(params))
+}
+
+#[tauri::command]
+fn list_watched_folders() -> Result<String, String> {
+    execute_python_command("list_watched_folders", None)
+}
+
 #[tauri::command]
 fn get_documents() -> Result<String, String> {
     execute_python_command("get_all_documents", None)
@@ -232,6 +257,94 @@ fn reset_vector_store() -> Result<String, String> {
     execute_python_command("reset_vector_store", None)
 }
 
+// ============================================
+// RUNTIME
+// ============================================
+
+#[tauri::command]
+fn get_runtime_health() -> Result<String, String> {
+    execute_python_command("health", None)
+}
+
+#[tauri::command]
+fn reload_runtime() -> Result<String, String> {
+    execute_python_command("reload", None)
+}
+
+#[tauri::command]
+fn get_warmup_status() -> Result<String, String> {
+    execute_python_command("warmup_status", None)
+}
+
+#[tauri::command]
+fn get_runtime_metrics() -> Result<String, String> {
+    execute_python_command("get_runtime_metrics", None)
+}
+
+#[tauri::command]
+fn export_traces(limit: Option<i32>) -> Result<String, String> {
+    let params = serde_json::json!({
+        "limit": limit
+    });
+    execute_python_command("export_traces", Some(params))
+}
+
+#[tauri::command]
+fn execute_batch(commands: Value) -> Result<String, String> {
+    let params = serde_json::json!({
+        "commands": commands
+    });
+    execute_python_command("execute_batch", Some(params))
+}
+
+#[tauri::command]
+fn run_workflow(workflow: String, inputs: Option<Value>) -> Result<String, String> {
+    let params = serde_json::json!({
+        "workflow": workflow,
+        "inputs": inputs.unwrap_or_else(|| serde_json::json!({}))
+    });
+    execute_python_command("run_workflow", Some(params))
+}
+
+#[tauri::command]
+fn list_workflows() -> Result<String, String> {
+    execute_python_command("list_workflows", None)
+}
+
+// ============================================
+// BACKGROUND JOBS
+// ============================================
+
+#[tauri::command]
+fn submit_job(command: String, params: Option<Value>) -> Result<String, String> {
+    let params = serde_json::json!({
+        "command": command,
+        "params": params.unwrap_or_else(|| serde_json::json!({}))
+    });
+    execute_python_command("submit_job", Some(params))
+}
+
+#[tauri::command]
+fn job_status(job_id: String) -> Result<String, String> {
+    let params = serde_json::json!({
+        "job_id": job_id
+    });
+    execute_python_command("job_status", Some(params))
+}
+
+#[tauri::command]
+fn cancel_job(job_id: String) -> Result<String, String> {
+    let params = serde_json::json!({
+        "job_id": job_id
+    });
+    execute_python_command("cancel_job", Some(params))
+}
+
+#[tauri::command]
+fn list_jobs() -> Result<String, String> {
+    execute_python_command("list_jobs", None)
+}
+
 // ============================================
 // MAIN
 // ============================================
@@ -240,6 +353,13 @@ fn main() {
     // Initialize Python once
     init_python();
     
+    // Kick off model/DB preload; the Python side runs it on its own thread
+    std::thread::spawn(|| {
+        if let Err(e) = execute_python_command("warmup", None) {
+            println!("⚠️ Warm-up failed to start: {}", e);
+        }
+    });
+    
     tauri::Builder::default()
         .invoke_handler(tauri::generate_handler![
             // License
@@ -248,6 +368,11 @@ fn main() {
             
             // Documents
             upload_document,
+            upload_documents,
+            upload_directory,
+            watch_folder,
+            unwatch_folder,
+            list_watched_folders,
             get_documents,
             delete_document,
             get_document_stats,
@@ -267,6 +392,22 @@ fn main() {
             // Vector Store
             get_vector_stats,
             reset_vector_store,
+            
+            // Runtime
+            get_runtime_health,
+            reload_runtime,
+            get_warmup_status,
+            get_runtime_metrics,
+            export_traces,
+            execute_batch,
+            run_workflow,
+            list_workflows,
+            
+            // Background jobs
+            submit_job,
+            job_status,
+            cancel_job,
+            list_jobs,
         ])
         .run(tauri::generate_context!())
         .expect("error while running tauri application");
@@ -0,0 +1,63 @@
+"""
+Run the embedded runtime's tests against a throwaway home directory
+
+Settings, the vector store and every cache live under ~/.giggliagents, and
+their paths are fixed when the modules are imported, so HOME is replaced
+before any test module imports them.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+HOME = tempfile.mkdtemp(prefix="embedded_tests_")
+os.environ["HOME"] = os.environ["USERPROFILE"] = HOME
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "embedded"))
+
+from agent_runtime.executor import SETTINGS_PATH, Executor  # noqa: E402
+from prefabs.embedding_generator.embedding_generator import (  # noqa: E402
+    EmbeddingGenerator,
+)
+
+# Short debounce and poll interval, so watched-folder tests settle quickly
+TEST_SETTINGS = {"watch_debounce_seconds": 0.1, "watch_poll_seconds": 0.1}
+
+
+class HashEmbeddingGenerator(EmbeddingGenerator):
+    """Hashed bags of words in place of the model, so tests need no download"""
+
+    dimensions = 64
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for word in text.lower().split():
+            vector[zlib.crc32(word.encode()) % self.dimensions] += 1.0
+        return vector / max(np.linalg.norm(vector), 1.0)
+
+    def generate_embeddings(self, texts: list) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+        return np.stack([self._embed(text) for text in texts])
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self._embed(text)
+
+
+@pytest.fixture
+def executor():
+    """Executor on an empty vector store, with hashed embeddings"""
+    SETTINGS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    SETTINGS_PATH.write_text(json.dumps(TEST_SETTINGS))
+    executor = Executor()
+    executor._embedding_generator = HashEmbeddingGenerator()
+    executor.vector_store.reset()
+    yield executor
+    for directory in list(executor._watchers):
+        executor.execute("unwatch_folder", {"directory": directory})
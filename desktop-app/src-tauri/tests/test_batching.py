@@ -0,0 +1,56 @@
+import numpy as np
+
+from prefabs.embedding_generator.batching import TokenBudgetBatcher, pad_ids
+
+
+class WordModel:
+    """One token per word; records what reaches the model"""
+
+    def __init__(self):
+        self.tokenize_calls = 0
+        self.lengths = []
+
+    def tokenize(self, texts):
+        self.tokenize_calls += 1
+        return [[len(word) for word in text.split()] for text in texts]
+
+    def encode_ids(self, batch):
+        input_ids, mask = pad_ids(batch, 101, 102, 0)
+        self.lengths.extend(mask.sum(axis=1).tolist())
+        vectors = np.stack([np.bincount(ids, minlength=8)[:8] for ids in input_ids])
+        vectors = vectors.astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_texts_are_tokenized_once_and_windows_fit_the_model():
+    model = WordModel()
+    batcher = TokenBudgetBatcher(model.tokenize, model.encode_ids, max_seq_length=10)
+    texts = ["a bb ccc", "dddd " * 30, "e"]
+
+    embeddings = batcher.encode(texts)
+
+    assert model.tokenize_calls == 1
+    assert max(model.lengths) <= 10
+    assert batcher.stats["split"] == 1
+    assert batcher.stats["windows"] == 2 + 4
+    assert embeddings.shape[0] == 3
+    assert np.allclose(np.linalg.norm(embeddings, axis=1), 1.0)
+
+
+def test_truncated_texts_are_cut_to_the_window_and_counted():
+    model = WordModel()
+    batcher = TokenBudgetBatcher(
+        model.tokenize, model.encode_ids, max_seq_length=10, split_long=False
+    )
+
+    batcher.encode(["dddd " * 30, "e"])
+
+    assert sorted(model.lengths) == [3, 10]
+    assert batcher.stats["truncated"] == 1
+
+
+def test_pad_ids_wraps_and_pads_every_sequence():
+    input_ids, mask = pad_ids([[5, 6, 7], [8]], 101, 102, 0)
+
+    assert input_ids.tolist() == [[101, 5, 6, 7, 102], [101, 8, 102, 0, 0]]
+    assert mask.tolist() == [[1, 1, 1, 1, 1], [1, 1, 1, 0, 0]]
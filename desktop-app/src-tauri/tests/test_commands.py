@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from agent_runtime.commands import COMMANDS, CommandError, CommandSpec, Param
+from agent_runtime.metrics import LatencyHistogram, RuntimeMetrics
+
+
+def test_params_are_checked_and_coerced():
+    spec = CommandSpec(
+        "example",
+        None,
+        {
+            "path": Param(str, required=True),
+            "top_k": Param(int, default=5),
+            "filters": Param(list, default=[]),
+            "flag": Param(bool, default=False),
+        },
+    )
+
+    bound = spec.bind({"path": "a.txt", "top_k": "3", "flag": "yes", "extra": 1})
+    assert bound == {
+        "path": "a.txt",
+        "top_k": 3,
+        "filters": [],
+        "flag": True,
+        "extra": 1,
+    }
+    assert spec.bind({"path": "a", "filters": '["x"]'})["filters"] == ["x"]
+    assert spec.bind({"path": "a"})["filters"] is not spec.schema["filters"].default
+    with pytest.raises(CommandError, match="path required"):
+        spec.bind({"top_k": 1})
+    with pytest.raises(CommandError, match="Invalid top_k"):
+        spec.bind({"path": "a", "top_k": "many"})
+
+
+def test_every_handler_is_reachable(executor):
+    # Shadowed or defined twice in the old if/elif chain
+    assert {"get_document_stats", "reset_vector_store", "delete_document"} <= set(
+        COMMANDS
+    )
+    assert executor.execute("get_document_stats", {}).get("error") is None
+    assert executor.execute("not_a_command", {}) == {
+        "error": "Unknown command: not_a_command"
+    }
+
+
+def test_histogram_percentiles_stay_within_one_percent():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(mean=8, sigma=1.5, size=20_000).astype(int)
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+
+    for pct in (50, 95, 99):
+        exact = np.percentile(values, pct, method="inverted_cdf")
+        assert abs(histogram.percentile(pct) - exact) <= 0.01 * exact + 1
+    assert (histogram.min, histogram.max) == (values.min(), values.max())
+
+
+def test_dispatch_records_latency_per_command(executor):
+    executor.metrics.reset()
+    for _ in range(3):
+        executor.execute("health", {})
+    executor.execute("job_status", {})
+
+    commands = executor.execute("get_runtime_metrics", {"reset": True})["commands"]
+    assert commands["health"]["count"] == 3
+    assert commands["health"]["p50_ms"] <= commands["health"]["max_ms"]
+    assert commands["job_status"]["errors"] == 1
+    assert RuntimeMetrics().snapshot() == {}
+    assert set(executor.metrics.snapshot()) <= {"get_runtime_metrics"}
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from prefabs.base_module import ModuleExecutionError
+from prefabs.document_processor.document_processor import (
+    DocumentProcessor,
+    _extract_pdf_range,
+)
+
+
+@pytest.mark.parametrize("chunk_size, chunk_overlap", [(50, 50), (50, 80), (0, 0)])
+def test_rejects_chunking_that_does_not_advance(chunk_size, chunk_overlap):
+    with pytest.raises(ValueError):
+        DocumentProcessor(chunk_size, chunk_overlap)
+
+
+def test_extract_text_rejects_bad_overrides(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("one two three four five")
+    processor = DocumentProcessor(chunk_size=3, chunk_overlap=1)
+
+    with pytest.raises(ModuleExecutionError, match="chunk_overlap"):
+        processor.execute(
+            "extract_text", {"file_path": str(path), "chunk_overlap": 3}, {}
+        )
+
+
+def test_streamed_chunks_match_extract_text(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("\n".join(f"line {n} of the notes" for n in range(40)))
+    processor = DocumentProcessor(chunk_size=7, chunk_overlap=2)
+
+    assert list(processor.iter_chunks(str(path))) == processor.extract_text(str(path))
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+def test_pdf_worker_closes_the_file(tmp_path):
+    PyPDF2 = pytest.importorskip("PyPDF2")
+    path = tmp_path / "blank.pdf"
+    writer = PyPDF2.PdfWriter()
+    for _ in range(3):
+        writer.add_blank_page(width=200, height=200)
+    with open(path, "wb") as f:
+        writer.write(f)
+
+    assert _extract_pdf_range(str(path), 0, 3) == ["", "", ""]
+
+    open_files = {
+        os.path.realpath(f"/proc/self/fd/{fd}") for fd in os.listdir("/proc/self/fd")
+    }
+    assert str(path.resolve()) not in open_files
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from prefabs.embedding_generator.embedding_generator import EmbeddingGenerator
+
+
+class CountingGenerator(EmbeddingGenerator):
+    """Counts texts that miss the cache and reach the model"""
+
+    def __init__(self, settings):
+        super().__init__(settings=settings)
+        self.encoded = 0
+
+    def _encode(self, texts):
+        self.encoded += len(texts)
+        return np.ones((len(texts), 8), dtype=np.float32)
+
+
+@pytest.mark.parametrize(
+    "settings, changed",
+    [
+        ({"embedding_provider": "local"}, {"embed_split_long": False}),
+        ({"embedding_provider": "onnx"}, {"onnx_quantized": False}),
+        ({"embedding_provider": "onnx"}, {"embed_split_long": False}),
+    ],
+)
+def test_settings_that_change_vectors_miss_the_cache(settings, changed, request):
+    texts = [f"{request.node.name} chunk {n}" for n in range(3)]
+
+    first = CountingGenerator(settings)
+    first.generate_embeddings(texts)
+    again = CountingGenerator(settings)
+    again.generate_embeddings(texts)
+    other = CountingGenerator({**settings, **changed})
+    other.generate_embeddings(texts)
+
+    assert (first.encoded, again.encoded, other.encoded) == (3, 0, 3)
@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+import pytest
+
+from prefabs.vector_store import exact_index
+from prefabs.vector_store.exact_index import DIRTY_FILE, META_FILE, ExactIndex
+
+
+def add_document(index, doc_id, vectors):
+    index.add(
+        [(doc_id, f"{doc_id}.txt", n) for n in range(len(vectors))],
+        vectors,
+    )
+
+
+def test_writes_append_in_place_and_save_once(tmp_path, monkeypatch):
+    saves = []
+    monkeypatch.setattr(ExactIndex, "save", lambda self: saves.append(self.count))
+    rng = np.random.default_rng(0)
+    index = ExactIndex(tmp_path, "plain")
+
+    for doc in range(50):
+        add_document(index, f"doc{doc}", rng.random((20, 8), dtype=np.float32))
+
+    assert saves == []
+    assert (tmp_path / DIRTY_FILE).exists()
+    assert not (tmp_path / META_FILE).exists()
+    index._cancel_save()
+
+
+def test_unsaved_index_is_rejected_until_flushed(tmp_path):
+    rng = np.random.default_rng(1)
+    vectors = rng.random((30, 8), dtype=np.float32)
+    index = ExactIndex(tmp_path, "plain")
+    add_document(index, "a", vectors[:20])
+    add_document(index, "b", vectors[20:])
+    index.remove_chunks("a", [3, 4])
+
+    with pytest.raises(ValueError):
+        ExactIndex.open(tmp_path, "plain", 28)
+
+    index.flush()
+    reopened = ExactIndex.open(tmp_path, "plain", 28)
+    query = vectors[7]
+    assert reopened.search(query, 5) == index.search(query, 5)
+    assert reopened.search(query, 3, ["b.txt"]) == index.search(query, 3, ["b.txt"])
+
+
+def test_pending_writes_are_saved_after_a_delay(tmp_path, monkeypatch):
+    monkeypatch.setattr(exact_index, "SAVE_DELAY", 0.05)
+    index = ExactIndex(tmp_path, "plain")
+    add_document(index, "a", np.eye(4, dtype=np.float32))
+
+    deadline = time.monotonic() + 5
+    while (tmp_path / DIRTY_FILE).exists() and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+    assert ExactIndex.open(tmp_path, "plain", 4).count == 4
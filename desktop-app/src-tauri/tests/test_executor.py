@@ -0,0 +1,116 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from agent_runtime.executor import SETTINGS_PATH
+from prefabs.embedding_generator.embedding_generator import (
+    EmbeddingGenerator,
+    shared_model_key,
+)
+
+
+def test_commands_from_many_threads_are_all_counted(executor):
+    before = executor.commands_executed
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: executor.execute("health", {}), range(400)))
+
+    assert executor.commands_executed - before == 400
+    assert executor.execute("health", {})["commands_executed"] == before + 401
+
+
+def write_settings(**settings):
+    from conftest import TEST_SETTINGS
+
+    SETTINGS_PATH.write_text(json.dumps({**TEST_SETTINGS, **settings}))
+
+
+def test_reload_closes_the_replaced_embedding_model(executor):
+    write_settings(embedding_provider="openai", openai_api_key="test")
+    executor._embedding_generator = EmbeddingGenerator()
+    backend = executor.embedding_generator.model
+    client, pool = backend.client, backend.pool
+
+    write_settings(embedding_provider="local")
+    assert "embedding_generator" in executor.reload()["reloaded"]
+
+    assert client.is_closed()
+    assert pool._shutdown
+
+
+def test_reload_releases_the_shared_model_it_replaces(executor):
+    from prefabs.embedding_generator import embedding_generator
+
+    class Model:
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    write_settings(embedding_provider="onnx", onnx_threads=2)
+    executor._embedding_generator = EmbeddingGenerator()
+    old_key = shared_model_key(executor._embedding_generator.settings)
+    old_model = embedding_generator.shared_model(*old_key, Model)
+
+    write_settings(embedding_provider="onnx", onnx_threads=4)
+    executor.reload()
+
+    assert old_model.closed
+    assert old_key not in embedding_generator._models
+
+
+def test_warmup_encodes_with_the_local_model_for_claude(executor, monkeypatch):
+    class Batcher:
+        encoded = []
+
+        def encode(self, texts):
+            self.encoded.append(texts)
+
+    write_settings(embedding_provider="claude")
+    generator = EmbeddingGenerator()
+    generator._model, generator._batcher = object(), Batcher()
+    executor._embedding_generator = generator
+    release = threading.Event()
+    monkeypatch.setattr(executor, "_restore_watched_folders", release.wait)
+
+    executor.warmup()
+    running = executor.warmup_status()
+    assert executor.execute("health", {})["warmup"] == "running"
+    release.set()
+    executor._warmup_thread.join(10)
+
+    assert Batcher.encoded == [["warmup"]]
+    assert running["state"] == "running"
+    assert all(stage["status"] in ("running", "done") for stage in running["stages"])
+    status = executor.warmup_status()
+    assert status["ready"]
+    assert [stage["status"] for stage in status["stages"]] == ["done"] * 6
+
+
+def test_execute_batch_runs_commands_in_order(executor, tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("pallet freight customs route")
+
+    results = executor.execute(
+        "execute_batch",
+        {
+            "commands": [
+                {"command": "get_vector_stats"},
+                {"command": "process_document", "params": {"file_path": str(path)}},
+                {"command": "get_vector_stats"},
+                {"command": "execute_batch", "params": {"commands": []}},
+                {"params": {}},
+            ]
+        },
+    )["results"]
+
+    assert [entry["command"] for entry in results] == [
+        "get_vector_stats",
+        "process_document",
+        "get_vector_stats",
+        "execute_batch",
+        None,
+    ]
+    before, added, after = (entry["result"] for entry in results[:3])
+    assert "error" not in added
+    assert after["total_documents"] == before["total_documents"] + 1
+    assert "error" in results[3]["result"] and "error" in results[4]["result"]
@@ -0,0 +1,54 @@
+import shutil
+import time
+from pathlib import Path
+
+
+def wait_for(condition, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return
+        time.sleep(0.05)
+    raise AssertionError("timed out")
+
+
+def stored_paths(executor, folder: Path) -> set:
+    return {
+        Path(path).name for _, path in executor.vector_store.registry.under(str(folder))
+    }
+
+
+def test_deleting_one_of_two_identical_files_keeps_the_other(executor, tmp_path):
+    folder = tmp_path / "docs"
+    folder.mkdir()
+    (folder / "a.txt").write_text("quarterly invoice zebracorn report " * 40)
+    shutil.copy(folder / "a.txt", folder / "b.txt")
+    (folder / "other.txt").write_text("unrelated shipping notes " * 40)
+
+    result = executor.execute("watch_folder", {"directory": str(folder)})
+    assert result["success"]
+    wait_for(lambda: stored_paths(executor, folder) == {"a.txt", "b.txt", "other.txt"})
+
+    (folder / "a.txt").unlink()
+    wait_for(lambda: stored_paths(executor, folder) == {"b.txt", "other.txt"})
+    hits = executor.vector_store.lexical.search("zebracorn", 5)
+    assert {hit["document"] for hit in hits} == {"b.txt"}
+
+    (folder / "b.txt").unlink()
+    wait_for(lambda: stored_paths(executor, folder) == {"other.txt"})
+    assert executor.vector_store.lexical.search("zebracorn", 5) == []
+
+
+def test_copy_into_watched_folder_is_indexed_under_its_own_path(executor, tmp_path):
+    folder = tmp_path / "docs"
+    folder.mkdir()
+    (folder / "a.txt").write_text("warehouse pallet audit " * 40)
+
+    executor.execute("watch_folder", {"directory": str(folder)})
+    wait_for(lambda: stored_paths(executor, folder) == {"a.txt"})
+
+    shutil.copy(folder / "a.txt", folder / "copy.txt")
+    wait_for(lambda: stored_paths(executor, folder) == {"a.txt", "copy.txt"})
+
+    (folder / "a.txt").unlink()
+    wait_for(lambda: stored_paths(executor, folder) == {"copy.txt"})
@@ -0,0 +1,66 @@
+import threading
+import time
+
+from agent_runtime.jobs import JobManager, check_cancelled, report_progress
+
+
+def wait_finished(job, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert job.finished
+    return job
+
+
+def test_jobs_report_results_and_failures():
+    def runner(command, params):
+        if command == "fail":
+            return {"error": "bad input"}
+        report_progress(0.5, "halfway")
+        return {"echo": params}
+
+    jobs = JobManager(runner)
+    done = wait_finished(jobs.submit("echo", {"value": 1}))
+    failed = wait_finished(jobs.submit("fail", {}))
+
+    assert done.to_dict()["result"] == {"echo": {"value": 1}}
+    assert (done.state, done.progress) == ("completed", 1.0)
+    assert (failed.state, failed.error) == ("failed", "bad input")
+    assert [job.job_id for job in jobs.list()] == [done.job_id, failed.job_id]
+    assert jobs.active_count() == 0
+
+
+def test_cancel_stops_running_job_and_skips_queued_one():
+    started = threading.Event()
+    ran = []
+
+    def runner(command, params):
+        ran.append(command)
+        started.set()
+        while True:
+            check_cancelled()
+            time.sleep(0.01)
+
+    jobs = JobManager(runner, max_workers=1)
+    running = jobs.submit("long", {})
+    queued = jobs.submit("next", {})
+    assert started.wait(10)
+
+    assert jobs.cancel(queued.job_id).state == "cancelled"
+    jobs.cancel(running.job_id)
+
+    assert wait_finished(running).state == "cancelled"
+    assert wait_finished(queued).state == "cancelled"
+    assert ran == ["long"]
+
+
+def test_executor_runs_commands_as_jobs(executor):
+    submitted = executor.execute("submit_job", {"command": "health"})
+    job = executor.jobs.get(submitted["job_id"])
+    wait_finished(job)
+
+    status = executor.execute("job_status", {"job_id": job.job_id})
+    assert status["state"] == "completed"
+    assert status["result"]["status"] == "ok"
+    assert "error" in executor.execute("submit_job", {"command": "list_jobs"})
+    assert "error" in executor.execute("job_status", {"job_id": "missing"})
@@ -0,0 +1,45 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPT = Path(__file__).parent.parent / "scripts" / "check_import_time.py"
+
+
+def load_check_script():
+    spec = importlib.util.spec_from_file_location("check_import_time", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_importing_the_executor_loads_no_heavy_module():
+    check = load_check_script()
+    _, modules = check.measure_import()
+
+    assert "agent_runtime.executor" in modules
+    assert not modules & set(check.HEAVY_MODULES)
+
+
+def test_light_commands_leave_heavy_modules_unloaded(tmp_path):
+    check = load_check_script()
+    code = (
+        "import json, sys\n"
+        "from agent_runtime.executor import Executor\n"
+        "executor = Executor()\n"
+        "executor.execute('get_ai_settings', {})\n"
+        "executor.execute('health', {})\n"
+        f"print(json.dumps(sorted(set(sys.modules) & set({check.HEAVY_MODULES!r}))))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=check.EMBEDDED_DIR,
+        env={**os.environ, "HOME": str(tmp_path), "USERPROFILE": str(tmp_path)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert json.loads(result.stdout.splitlines()[-1]) == []
@@ -0,0 +1,47 @@
+from prefabs.vector_store.lexical_index import LexicalIndex
+
+
+def assert_in_sync(index: LexicalIndex):
+    """FTS5 raises when the full-text index differs from the chunks table"""
+    index._conn.execute(
+        "INSERT INTO chunks_fts(chunks_fts, rank) VALUES ('integrity-check', 1)"
+    )
+
+
+def test_readding_a_chunk_replaces_its_indexed_text(tmp_path):
+    index = LexicalIndex(tmp_path / "index.sqlite3")
+    index.add([("doc_chunk_0", "doc", "a.txt", "stale wording here")])
+    index.add([("doc_chunk_0", "doc", "a.txt", "fresh wording here")])
+
+    assert index.search("stale", 5) == []
+    assert [hit["chunk_id"] for hit in index.search("fresh", 5)] == ["doc_chunk_0"]
+    assert index.count() == 1
+    assert_in_sync(index)
+
+
+def test_removed_chunks_leave_no_matches(tmp_path):
+    index = LexicalIndex(tmp_path / "index.sqlite3")
+    index.add(
+        [
+            ("doc_chunk_0", "doc", "a.txt", "invoice INV-2024-0193"),
+            ("doc_chunk_1", "doc", "a.txt", "invoice INV-2024-0194"),
+        ]
+    )
+    index.remove_chunks(["doc_chunk_0"])
+
+    assert index.search("INV-2024-0193", 5) == []
+    assert len(index.search("invoice", 5)) == 1
+    assert_in_sync(index)
+
+
+def test_drifted_index_is_rebuilt_on_open(tmp_path):
+    path = tmp_path / "index.sqlite3"
+    index = LexicalIndex(path)
+    index._conn.execute("PRAGMA recursive_triggers=OFF")
+    index.add([("doc_chunk_0", "doc", "a.txt", "stale wording")])
+    index.add([("doc_chunk_0", "doc", "a.txt", "fresh wording")])
+    index._conn.execute("PRAGMA user_version = 0")
+    index._conn.commit()
+    index.close()
+
+    assert_in_sync(LexicalIndex(path))
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from prefabs.embedding_generator import onnx_backend
+from prefabs.embedding_generator.embedding_generator import (
+    LOCAL_MODEL,
+    EmbeddingGenerator,
+    shared_model_key,
+)
+
+TEXTS = [
+    "Invoices are due thirty days after delivery.",
+    "The pallet left the warehouse on the customs route.",
+    "Quarterly audit of the general ledger",
+    "x",
+    " ".join(["freight"] * 400),
+]
+
+
+@pytest.mark.parametrize(
+    "machine, export",
+    [
+        ("x86_64", "onnx/model_quint8_avx2.onnx"),
+        ("AMD64", "onnx/model_quint8_avx2.onnx"),
+        ("arm64", "onnx/model_qint8_arm64.onnx"),
+        ("aarch64", "onnx/model_qint8_arm64.onnx"),
+    ],
+)
+def test_quantized_export_matches_the_cpu(monkeypatch, machine, export):
+    monkeypatch.setattr(onnx_backend.platform, "machine", lambda: machine)
+    assert onnx_backend.quantized_model_file() == export
+
+
+def test_onnx_settings_select_their_own_model_and_cache_entries():
+    onnx = EmbeddingGenerator({"embedding_provider": "onnx", "onnx_threads": 2})
+    fp32 = EmbeddingGenerator({"embedding_provider": "onnx", "onnx_quantized": False})
+    local = EmbeddingGenerator({"embedding_provider": "local"})
+
+    keys = {shared_model_key(g.settings) for g in (onnx, fp32, local)}
+    assert len(keys) == 3
+    assert onnx.model_name == local.model_name == LOCAL_MODEL
+    assert len({g.cache_variant for g in (onnx, fp32, local)}) == 3
+
+
+@pytest.fixture(scope="module")
+def reference():
+    """Vectors of TEXTS from the PyTorch model the backend replaces"""
+    pytest.importorskip("onnxruntime")
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+    model = sentence_transformers.SentenceTransformer(LOCAL_MODEL)
+    return model.encode(TEXTS, normalize_embeddings=True)
+
+
+@pytest.mark.parametrize("quantized", [True, False])
+def test_vectors_match_sentence_transformers(reference, quantized):
+    backend = onnx_backend.OnnxEmbeddingBackend(quantized=quantized, batch_size=2)
+
+    vectors = backend.encode(TEXTS)
+    from_ids = backend.encode_ids(backend.tokenize(TEXTS[:3]))
+
+    assert vectors.shape == reference.shape
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+    assert (vectors * reference).sum(axis=1).min() > 0.99
+    assert (from_ids * reference[:3]).sum(axis=1).min() > 0.99
@@ -0,0 +1,158 @@
+"""
+OpenAI embedding backend against a local stub of the /v1/embeddings API
+"""
+
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+from prefabs.embedding_generator.openai_backend import (
+    MAX_TOKENS_PER_INPUT,
+    OpenAIEmbeddingBackend,
+)
+
+DIMENSION = 8
+
+
+def fake_embedding(text: str) -> list:
+    """Deterministic unit vector derived from the text"""
+    digest = hashlib.sha256(text.encode()).digest()
+    vector = np.array([byte + 1 for byte in digest[:DIMENSION]], dtype=np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class StubState:
+    def __init__(self, rate_limited: int = 0, latency: float = 0.0):
+        self.rate_limited = rate_limited
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.inputs = []
+
+
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length))
+
+            with state.lock:
+                state.requests += 1
+                throttle = state.throttled < state.rate_limited
+                if throttle:
+                    state.throttled += 1
+                else:
+                    state.in_flight += 1
+                    state.max_in_flight = max(state.max_in_flight, state.in_flight)
+
+            if throttle:
+                self._send(
+                    429,
+                    {"error": {"message": "Rate limit", "type": "rate_limit"}},
+                    {"Retry-After": "0.05"},
+                )
+                return
+
+            try:
+                time.sleep(state.latency)
+                inputs = body["input"]
+                # Every word is at least one token
+                if any(len(text.split()) > MAX_TOKENS_PER_INPUT for text in inputs):
+                    self._send(
+                        400,
+                        {"error": {"message": "Too many tokens", "type": "invalid"}},
+                    )
+                    return
+                with state.lock:
+                    state.inputs.append(inputs)
+                # Items reversed; clients must order them by index
+                data = [
+                    {"object": "embedding", "index": i, "embedding": fake_embedding(t)}
+                    for i, t in enumerate(inputs)
+                ][::-1]
+                self._send(
+                    200,
+                    {
+                        "object": "list",
+                        "data": data,
+                        "model": body["model"],
+                        "usage": {"prompt_tokens": 0, "total_tokens": 0},
+                    },
+                )
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+
+        def _send(self, status: int, payload: dict, headers: dict = None):
+            raw = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(raw)
+
+    return Handler
+
+
+@pytest.fixture
+def stub():
+    """(state, base_url) of a stub server that 429s its first 3 requests"""
+    state = StubState(rate_limited=3, latency=0.01)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield state, f"http://127.0.0.1:{server.server_port}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+def test_batches_in_order_and_retries_rate_limits(stub):
+    state, base_url = stub
+    backend = OpenAIEmbeddingBackend(
+        api_key="test", base_url=base_url, max_concurrency=4, max_batch_tokens=2000
+    )
+    texts = [f"chunk {i} " + "lorem ipsum " * (i % 50) for i in range(500)]
+
+    embeddings = backend.embed(texts)
+
+    assert np.allclose(embeddings, [fake_embedding(text) for text in texts])
+    assert backend.retries == state.throttled == 3
+    assert backend.requests_sent == state.requests
+    assert 1 < len(state.inputs) < len(texts)
+    assert state.max_in_flight <= 4
+
+
+@pytest.mark.parametrize("split_long", [True, False])
+def test_texts_over_the_token_limit_are_cut(stub, split_long):
+    state, base_url = stub
+    backend = OpenAIEmbeddingBackend(
+        api_key="test", base_url=base_url, split_long=split_long
+    )
+    long_text = " ".join(f"word{n}" for n in range(MAX_TOKENS_PER_INPUT + 500))
+    texts = ["short one", long_text, "short two"]
+
+    embeddings = backend.embed(texts)
+
+    assert np.allclose(
+        embeddings[[0, 2]], [fake_embedding(texts[0]), fake_embedding(texts[2])]
+    )
+    assert np.isclose(np.linalg.norm(embeddings[1]), 1.0)
+    sent = sum(len(inputs) for inputs in state.inputs)
+    if split_long:
+        assert sent > len(texts)
+        assert backend.texts_split == 1
+    else:
+        assert sent == len(texts)
+        assert backend.texts_truncated == 1
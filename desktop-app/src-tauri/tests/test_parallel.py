@@ -0,0 +1,40 @@
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from agent_runtime import parallel
+
+
+@pytest.fixture
+def embedded(monkeypatch):
+    """Look like the desktop app: sys.executable is the app binary"""
+    monkeypatch.setattr(sys, "executable", "/opt/giggliagents/giggliagents")
+    parallel.worker_python.cache_clear()
+    yield
+    parallel.worker_python.cache_clear()
+
+
+def test_embedded_app_starts_workers_on_a_real_interpreter(embedded):
+    python = parallel.worker_python()
+    assert python is not None and python != sys.executable
+
+    pool = parallel.make_pool(2)
+    try:
+        assert isinstance(pool, ProcessPoolExecutor)
+        assert list(pool.map(abs, [-1, -2])) == [1, 2]
+    finally:
+        pool.shutdown()
+
+
+def test_embedded_app_falls_back_to_threads(embedded, monkeypatch):
+    monkeypatch.setattr(sys, "base_prefix", "/nonexistent")
+    monkeypatch.setattr(sys, "base_exec_prefix", "/nonexistent")
+    monkeypatch.delenv(parallel.PYTHON_ENV, raising=False)
+
+    assert not parallel.processes_available()
+    pool = parallel.make_pool(2)
+    try:
+        assert not isinstance(pool, ProcessPoolExecutor)
+    finally:
+        pool.shutdown()
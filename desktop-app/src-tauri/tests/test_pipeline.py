@@ -0,0 +1,92 @@
+import json
+
+import pytest
+from conftest import TEST_SETTINGS, HashEmbeddingGenerator
+
+from agent_runtime.executor import SETTINGS_PATH
+from agent_runtime.pipeline import BulkIngest
+
+
+def bulk_ingest(executor, **options):
+    return BulkIngest(
+        executor.document_processor,
+        executor.embedding_generator,
+        executor.vector_store,
+        use_processes=False,
+        **options,
+    )
+
+
+def test_document_that_now_has_no_text_loses_its_chunks(executor, tmp_path):
+    store = executor.vector_store
+    path = tmp_path / "notes.txt"
+    path.write_text("pallet freight customs route " * 400)
+    (added,) = bulk_ingest(executor).run([str(path)])["documents"]
+    assert added["chunks_added"] > 1
+
+    path.write_text("   \n")
+    result = bulk_ingest(executor).run([str(path)])
+
+    assert result["failed"] == [{"file_path": str(path), "error": "no text"}]
+    assert store.collection.get(where={"doc_id": added["doc_id"]})["ids"] == []
+    assert store.search("customs") == []
+    assert store.lexical.count() == 0
+
+
+def write_folder(root, count=6):
+    words = "pallet freight customs route invoice ledger audit quarter".split()
+    for number in range(count):
+        text = " ".join(words[(number + n) % len(words)] for n in range(900))
+        (root / f"doc{number}.txt").write_text(text)
+    (root / ".hidden").mkdir()
+    (root / ".hidden" / "skipped.txt").write_text("hidden")
+    (root / "data.bin").write_bytes(b"not a document")
+
+
+def test_process_directory_batches_every_document(executor, tmp_path):
+    SETTINGS_PATH.write_text(
+        json.dumps({**TEST_SETTINGS, "ingest_use_processes": False})
+    )
+    write_folder(tmp_path)
+    (tmp_path / "broken.pdf").write_bytes(b"%PDF-1.4 truncated")
+    store = executor.vector_store
+
+    result = executor.execute("process_directory", {"directory": str(tmp_path)})
+
+    assert result["documents_count"] == 6
+    assert [f["file_path"] for f in result["failed"]] == [str(tmp_path / "broken.pdf")]
+    assert result["chunks_count"] == store.collection.count()
+    assert result["chunks_count"] == sum(d["chunks_added"] for d in result["documents"])
+    assert result["docs_per_second"] > 0 and result["chunks_per_second"] > 0
+    # Chunks of several documents share each write
+    assert store.write_stats["calls"] < result["documents_count"]
+
+    again = executor.execute("process_directory", {"directory": str(tmp_path)})
+    assert (again["unchanged_count"], again["chunks_count"]) == (6, 0)
+
+
+def test_failed_batch_removes_the_whole_run(executor, tmp_path):
+    class FailingEmbedder(HashEmbeddingGenerator):
+        calls = 0
+
+        def generate_embeddings(self, texts):
+            FailingEmbedder.calls += 1
+            if FailingEmbedder.calls == 2:
+                raise RuntimeError("embedding backend down")
+            return super().generate_embeddings(texts)
+
+    write_folder(tmp_path)
+    store = executor.vector_store
+    ingest = BulkIngest(
+        executor.document_processor,
+        FailingEmbedder(),
+        store,
+        batch_size=4,
+        use_processes=False,
+    )
+
+    with pytest.raises(RuntimeError):
+        ingest.run(sorted(str(path) for path in tmp_path.glob("*.txt")))
+
+    assert store.collection.count() == 0
+    assert store.registry.totals() == (0, 0)
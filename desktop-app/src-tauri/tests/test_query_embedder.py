@@ -0,0 +1,77 @@
+import threading
+import time
+
+import numpy as np
+
+from conftest import HashEmbeddingGenerator
+from prefabs.embedding_generator import embedding_generator
+from prefabs.embedding_generator.embedding_generator import (
+    EmbeddingGenerator,
+    normalize_query,
+    shared_model,
+)
+
+
+class CountingEmbedder(EmbeddingGenerator):
+    def __init__(self, **settings):
+        super().__init__(settings)
+        self.encoded = []
+
+    def generate_embeddings(self, texts):
+        self.encoded.extend(texts)
+        return np.ones((len(texts), 4), dtype=np.float32) * len(self.encoded)
+
+
+def test_repeat_and_near_repeat_questions_skip_encoding():
+    embedder = CountingEmbedder(query_cache_size=2)
+
+    first = embedder.embed_query("What is the customs route?")
+    assert embedder.embed_query("what is the  customs route") is first
+    embedder.embed_query("invoice ledger")
+    embedder.embed_query("audit quarter")
+    embedder.embed_query("What is the customs route?")
+
+    assert normalize_query(" Route?! ") == "route"
+    assert embedder.encoded == [
+        "What is the customs route?",
+        "invoice ledger",
+        "audit quarter",
+        "What is the customs route?",
+    ]
+    assert (embedder.query_hits, embedder.query_misses) == (1, 4)
+
+
+def test_models_load_once_per_provider_and_name(monkeypatch):
+    monkeypatch.setattr(embedding_generator, "_models", {})
+    loads = []
+
+    def loader():
+        loads.append(threading.get_ident())
+        time.sleep(0.05)
+        return object()
+
+    models = []
+    threads = [
+        threading.Thread(
+            target=lambda: models.append(shared_model("local", "mini", loader))
+        )
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert len(loads) == 1
+    assert all(model is models[0] for model in models)
+    assert shared_model("onnx", "mini", object) is not models[0]
+
+
+def test_search_and_questions_share_the_executor_embedder(executor):
+    generator = executor.embedding_generator
+    assert isinstance(generator, HashEmbeddingGenerator)
+    assert executor.vector_store.embedding_generator is generator
+    assert executor.rag_chain.embedding_generator is generator
+
+    executor.vector_store.search("customs route")
+    assert executor.vector_store.embedding_generator is generator
@@ -0,0 +1,100 @@
+import logging
+
+import pytest
+
+from prefabs import tracing
+from prefabs.tracing import (
+    clear_traces,
+    configure_logging,
+    configure_tracing,
+    export_chrome_trace,
+    recent_traces,
+    span,
+    start_trace,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_traces():
+    clear_traces()
+    yield
+    configure_tracing(enabled=True, buffer_size=tracing.DEFAULT_BUFFER_SIZE)
+    clear_traces()
+
+
+def test_spans_nest_under_the_command_trace():
+    with start_trace("answer_question"):
+        with span("retrieve", top_k=5) as stage:
+            with span("vector_query"):
+                pass
+            stage.set(results=3)
+        with pytest.raises(RuntimeError):
+            with span("generate"):
+                raise RuntimeError("model offline")
+
+    (trace,) = recent_traces()
+    assert trace["name"] == "answer_question"
+    assert [(s["name"], s["depth"]) for s in trace["stages"]] == [
+        ("retrieve", 1),
+        ("vector_query", 2),
+        ("generate", 1),
+    ]
+    assert trace["stages"][0]["results"] == 3
+    assert trace["stages"][2]["error"] == "model offline"
+
+
+def test_spans_outside_a_trace_or_when_disabled_record_nothing():
+    with span("embed") as stage:
+        stage.set(texts=1)
+    configure_tracing(enabled=False)
+    with start_trace("search"):
+        with span("vector_query"):
+            pass
+
+    assert recent_traces() == []
+
+
+def test_ring_buffer_keeps_the_newest_traces():
+    configure_tracing(buffer_size=3)
+    for number in range(5):
+        with start_trace(f"command{number}"):
+            pass
+
+    assert [t["name"] for t in recent_traces()] == ["command4", "command3", "command2"]
+
+
+def test_export_is_chrome_trace_events():
+    with start_trace("process_document"):
+        with span("extract", pages=2):
+            pass
+
+    events = export_chrome_trace()["traceEvents"]
+    assert [event["name"] for event in events] == ["process_document", "extract"]
+    root, extract = events
+    assert all(event["ph"] == "X" for event in events)
+    assert root["ts"] <= extract["ts"]
+    assert extract["ts"] + extract["dur"] <= root["ts"] + root["dur"]
+    assert extract["args"]["pages"] == 2
+    assert extract["args"]["trace_id"] == root["args"]["trace_id"]
+
+
+def test_executor_commands_are_traced(executor, tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("pallet freight customs route")
+    executor.execute("process_document", {"file_path": str(path)})
+
+    (trace,) = executor.execute("get_recent_traces", {"limit": 1})["traces"]
+    assert trace["name"] == "process_document"
+    assert {"extract_chunk", "store"} <= {stage["name"] for stage in trace["stages"]}
+
+
+def test_debug_lines_are_gated_by_level():
+    logger = logging.getLogger("prefabs.vector_store")
+    try:
+        configure_logging("INFO")
+        assert not logger.isEnabledFor(logging.DEBUG)
+        assert logger.isEnabledFor(logging.INFO)
+        configure_logging("DEBUG")
+        assert logger.isEnabledFor(logging.DEBUG)
+    finally:
+        configure_logging("INFO")
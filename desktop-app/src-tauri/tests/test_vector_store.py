@@ -0,0 +1,148 @@
+import threading
+
+import pytest
+
+from conftest import HashEmbeddingGenerator
+
+
+class GatedEmbeddingGenerator(HashEmbeddingGenerator):
+    """Blocks in generate_embeddings until released"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def generate_embeddings(self, texts: list):
+        self.started.set()
+        assert self.release.wait(10)
+        return super().generate_embeddings(texts)
+
+
+def ingest(store, path, text):
+    path.write_text(text)
+    chunks = [text]
+    return store.ingest_document(
+        str(path), chunks, HashEmbeddingGenerator().generate_embeddings(chunks)
+    )
+
+
+def test_writes_during_rebuild_land_in_new_collection(executor, tmp_path):
+    store = executor.vector_store
+    ingest(store, tmp_path / "first.txt", "pallet freight customs route")
+
+    gated = GatedEmbeddingGenerator()
+    store.embedding_generator = gated
+    rebuild = threading.Thread(target=store.rebuild)
+    rebuild.start()
+    assert gated.started.wait(10)
+
+    # Started while the rebuild copies chunks, so it has to wait for the swap
+    added = {}
+    writer = threading.Thread(
+        target=lambda: added.update(
+            ingest(store, tmp_path / "second.txt", "invoice ledger audit quarter")
+        )
+    )
+    writer.start()
+    writer.join(0.5)
+    blocked = writer.is_alive()
+
+    gated.release.set()
+    rebuild.join(10)
+    writer.join(10)
+    assert blocked
+
+    stored = store.collection.get(where={"doc_id": added["doc_id"]}, include=[])
+    assert len(stored["ids"]) == 1
+    assert store.registry.totals() == (2, store.collection.count())
+
+
+def test_new_documents_are_registered_with_the_planned_fingerprint(
+    executor, tmp_path, monkeypatch
+):
+    from prefabs.vector_store import document_registry
+
+    def no_hashing(path):
+        raise AssertionError(f"{path} hashed again")
+
+    store = executor.vector_store
+    path = tmp_path / "notes.txt"
+    path.write_text("pallet freight customs route")
+    sync = store.begin_document(str(path))
+    monkeypatch.setattr(document_registry, "file_fingerprint", no_hashing)
+
+    chunks = [path.read_text()]
+    embeddings = HashEmbeddingGenerator().generate_embeddings(chunks)
+    store.add_document_stream(str(path), [(chunks, embeddings)], sync)
+
+    (stored,) = store.registry.find(str(path))
+    assert (stored["size_bytes"], stored["content_hash"]) == (
+        sync.size,
+        sync.content_hash,
+    )
+
+
+def test_filtered_search_is_exact_with_exact_search_off(
+    executor, tmp_path, monkeypatch
+):
+    store = executor.vector_store
+    store.configure_exact_search(False, store.exact_max_chunks)
+    embedder = HashEmbeddingGenerator()
+    words = "pallet freight customs route invoice ledger audit quarter".split()
+    documents = {
+        name: [" ".join(words[(n + shift) % 8 : (n + shift) % 8 + 3]) for n in range(6)]
+        for name, shift in (("ops.txt", 0), ("finance.txt", 4))
+    }
+    for name, chunks in documents.items():
+        (tmp_path / name).write_text("\n".join(chunks))
+        store.add_document(
+            str(tmp_path / name), chunks, embedder.generate_embeddings(chunks)
+        )
+
+    query = embedder.embed_query("customs route audit")
+    vectors = embedder.generate_embeddings(documents["ops.txt"])
+    distances = ((vectors - query) ** 2).sum(axis=1)
+    expected = sorted(set(documents["ops.txt"][i] for i in distances.argsort()[:3]))
+
+    def search():
+        results = store.search("", 3, ["ops.txt"], query_embedding=query)
+        assert {result["document"] for result in results} == {"ops.txt"}
+        return results
+
+    searched = []
+    search_exact = store._search_exact
+    monkeypatch.setattr(
+        store,
+        "_search_exact",
+        lambda *args: searched.append(args) or search_exact(*args),
+    )
+    from_index = search()
+    assert len(searched) == 1
+    assert sorted({result["text"] for result in from_index}) == expected
+
+    # Past the exact index's limit, the documents' vectors come from Chroma
+    store.configure_exact_search(False, 1)
+    from_chroma = search()
+    assert len(searched) == 1
+    assert [r["chunk_id"] for r in from_chroma] == [r["chunk_id"] for r in from_index]
+
+
+def test_failed_exact_index_write_rolls_back_the_batch(executor, monkeypatch):
+    store = executor.vector_store
+    embedder = HashEmbeddingGenerator()
+    texts = ["pallet freight", "customs route", "invoice ledger"]
+    records = [("doc", "/tmp/doc.txt", n, text) for n, text in enumerate(texts)]
+    assert store.exact_index is not None
+    vectors_before = store.get_stats()["writes"]["vectors"]
+
+    def fail(*args):
+        raise RuntimeError("exact index write failed")
+
+    monkeypatch.setattr(store, "_exact_add", fail)
+    with pytest.raises(RuntimeError):
+        store.add_chunk_batch(records, embedder.generate_embeddings(texts))
+
+    assert store.collection.count() == 0
+    assert store.lexical.count() == 0
+    assert store._exact_index is None
+    assert store.get_stats()["writes"]["vectors"] == vectors_before
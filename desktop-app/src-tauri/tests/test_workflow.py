@@ -0,0 +1,117 @@
+def test_process_document_workflow_is_idempotent(executor, tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("pallet freight customs route " * 300)
+    inputs = {"file_path": str(path)}
+
+    first = executor.execute(
+        "run_workflow", {"workflow": "process_document", "inputs": inputs}
+    )
+    second = executor.execute(
+        "run_workflow", {"workflow": "process_document", "inputs": inputs}
+    )
+
+    stored = first["output"]
+    assert stored["chunks_added"] == stored["chunks_count"] > 0
+    assert second["output"]["unchanged"]
+    assert second["output"]["doc_id"] == stored["doc_id"]
+    assert executor.vector_store.registry.under(str(path)) == [
+        (stored["doc_id"], str(path))
+    ]
+
+
+def test_process_document_workflow_updates_changed_file(executor, tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("pallet freight customs route " * 300)
+    inputs = {"file_path": str(path)}
+    first = executor.execute(
+        "run_workflow", {"workflow": "process_document", "inputs": inputs}
+    )
+
+    path.write_text("pallet freight customs route " * 300 + "late addendum")
+    second = executor.execute(
+        "run_workflow", {"workflow": "process_document", "inputs": inputs}
+    )
+
+    stored = second["output"]
+    assert stored["doc_id"] == first["output"]["doc_id"]
+    assert stored["chunks_reused"] > 0
+    assert executor.vector_store.get_stats()["total_documents"] == 1
+
+
+def test_unchanged_file_is_not_embedded_again(executor, tmp_path, monkeypatch):
+    path = tmp_path / "notes.txt"
+    path.write_text("pallet freight customs route " * 300)
+    inputs = {"file_path": str(path)}
+    executor.execute("run_workflow", {"workflow": "process_document", "inputs": inputs})
+
+    generator = executor.embedding_generator
+    embedded = []
+    original = generator.generate_embeddings
+    monkeypatch.setattr(
+        generator,
+        "generate_embeddings",
+        lambda texts: embedded.extend(texts) or original(texts),
+    )
+    again = executor.execute(
+        "run_workflow", {"workflow": "process_document", "inputs": inputs}
+    )
+
+    assert again["output"]["unchanged"]
+    assert embedded == []
+
+
+def test_process_document_plans_while_extracting(executor):
+    (workflow,) = [
+        workflow
+        for workflow in executor.execute("list_workflows", {})["workflows"]
+        if workflow["name"] == "process_document"
+    ]
+    depends_on = {step["id"]: step["depends_on"] for step in workflow["steps"]}
+
+    assert depends_on["plan"] == depends_on["extract"] == []
+
+
+def test_independent_steps_run_at_the_same_time(tmp_path):
+    import threading
+
+    from agent_runtime.workflow import WorkflowRunner
+
+    config = tmp_path / "workflows.g"
+    config.write_text(
+        """
+workflows:
+  fan_out:
+    steps:
+      - {id: left, module: m, action: meet}
+      - {id: right, module: m, action: meet, depends_on: []}
+      - id: join
+        module: m
+        action: join
+        inputs: {a: $steps.left.met, b: $steps.right.met}
+"""
+    )
+    barrier = threading.Barrier(2)
+
+    class Module:
+        def execute(self, action, params, context):
+            if action == "meet":
+                # Only returns when the other branch is running too
+                barrier.wait(timeout=5)
+                return {"met": True}
+            return {"both": params["a"] and params["b"]}
+
+    runner = WorkflowRunner(lambda module: Module(), config_paths=[config])
+
+    assert runner.run("fan_out", {}) == {"both": True}
+
+
+def test_step_cache_is_bounded_by_size(tmp_path, monkeypatch):
+    from agent_runtime import workflow
+
+    monkeypatch.setattr(workflow, "STEP_CACHE_MAX_BYTES", 10_000)
+    runner = workflow.WorkflowRunner(lambda module: None, config_paths=[])
+    for n in range(10):
+        runner._cache_put(str(n), {"chunks": ["x" * 3000]})
+
+    assert runner._cache_bytes <= 10_000
+    assert list(runner._cache) == ["7", "8", "9"]
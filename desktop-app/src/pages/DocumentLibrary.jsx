@@ -16,15 +16,16 @@ const loadDocuments = async () => {
   try {
     setLoading(true);
     
-    // Get vector store stats
-    const statsResult = await invoke('get_vector_stats');
-    const statsData = JSON.parse(statsResult);
+    // Stats and documents in one round trip (both read from the document registry)
+    const batchResult = await invoke('execute_batch', {
+      commands: [
+        { command: 'get_vector_stats' },
+        { command: 'get_documents' }
+      ]
+    });
+    const [statsData, docsData] = JSON.parse(batchResult).results.map(r => r.result);
     setStats(statsData);
     
-    // Get documents
-    const docsResult = await invoke('get_documents');
-    const docsData = JSON.parse(docsResult);
-    
     console.log('📚 Documents loaded:', docsData);
     
     // Transform to display format